@@ -0,0 +1,53 @@
+"""
+JWT authentication resolving the user from account.cache and rejecting
+tokens revoked in account.revocation
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_cached_user
+from .revocation import is_revoked
+
+REVOKED_MESSAGE = "توکن باطل شده است"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without a database query per request for warm users,
+    rejecting tokens on the revocation list
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_revoked(validated_token):
+            raise InvalidToken(REVOKED_MESSAGE)
+        return validated_token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_FIELD not in ("id", "pk"):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
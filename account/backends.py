@@ -0,0 +1,30 @@
+"""
+Authentication backend serving users and permission sets from account.cache
+"""
+from django.contrib.auth.backends import ModelBackend
+
+from .cache import get_cached_permissions, get_cached_user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose user lookups and permission sets are cached"""
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    def _get_permissions(self, user_obj, obj, from_name):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        perm_cache_name = f"_{from_name}_perm_cache"
+        if not hasattr(user_obj, perm_cache_name):
+            perms = get_cached_permissions(
+                user_obj.pk,
+                from_name,
+                lambda: super(CachedModelBackend, self)._get_permissions(
+                    user_obj, obj, from_name
+                ),
+            )
+            setattr(user_obj, perm_cache_name, perms)
+        return getattr(user_obj, perm_cache_name)
@@ -0,0 +1,113 @@
+"""
+Two-tier cache of users and their permission sets
+
+Authenticated requests resolve their user through ``get_cached_user``: a
+small in-process map answers for USER_CACHE_LOCAL_TTL seconds, then Redis
+for USER_CACHE_TTL seconds, and only then the database. Permission sets
+are cached the same way by ``account.backends.CachedModelBackend``.
+
+Entries are dropped from Redis and the local map when a user is saved or
+deleted, or when their groups or permissions change (see account.signals),
+once immediately and once more after the transaction commits. Other
+processes drop their local copy when its short TTL runs out, so keep
+USER_CACHE_LOCAL_TTL to a few seconds.
+"""
+import pickle
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+PERMISSION_KINDS = ("user", "group")
+
+_local = {}
+_lock = threading.Lock()
+
+
+def user_key(user_id):
+    return f"account:user:{user_id}"
+
+
+def permissions_key(user_id, kind):
+    return f"account:permissions:{user_id}:{kind}"
+
+
+def _local_get(key):
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        _local.pop(key, None)
+        return None
+    return value
+
+
+def _local_set(key, value):
+    with _lock:
+        if len(_local) >= settings.USER_CACHE_LOCAL_SIZE:
+            _local.clear()
+        _local[key] = (time.monotonic() + settings.USER_CACHE_LOCAL_TTL, value)
+
+
+def _get(key, load):
+    value = _local_get(key)
+    if value is not None:
+        return value
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        if value is None:
+            return None
+        cache.set(key, value, timeout=settings.USER_CACHE_TTL)
+    _local_set(key, value)
+    return value
+
+
+def get_cached_user(user_id):
+    """Return a fresh copy of the user with the given pk, or None"""
+
+    def load():
+        user = get_user_model().objects.filter(pk=user_id).first()
+        return pickle.dumps(user) if user is not None else None
+
+    # Both tiers hold the pickled row so every request gets its own instance
+    data = _get(user_key(user_id), load)
+    return pickle.loads(data) if data is not None else None
+
+
+def get_cached_permissions(user_id, kind, load):
+    """Return the cached ``kind`` permission set of a user, calling ``load`` on a miss"""
+    return set(_get(permissions_key(user_id, kind), lambda: frozenset(load())))
+
+
+def _delete(user_ids):
+    keys = [user_key(user_id) for user_id in user_ids]
+    keys += [
+        permissions_key(user_id, kind)
+        for user_id in user_ids
+        for kind in PERMISSION_KINDS
+    ]
+    with _lock:
+        for key in keys:
+            _local.pop(key, None)
+    cache.delete_many(keys)
+
+
+def invalidate_users(user_ids):
+    """Drop cached users and permission sets now and again after commit"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    _delete(user_ids)
+    # A concurrent request may have cached the old row before the commit
+    transaction.on_commit(lambda: _delete(user_ids))
+
+
+def clear_local():
+    """Empty this process's in-memory tier"""
+    with _lock:
+        _local.clear()
@@ -0,0 +1,226 @@
+"""
+JWT revocation list
+
+Revoked tokens are kept in Redis by ``jti`` in the sorted set
+``account:revoked:jtis``, scored by their expiry. "Logout everywhere"
+stores a cut-off per user in ``account:revoked:users``: every token of the
+user issued at or before that second is revoked. Entries are purged once
+the tokens they cover have expired.
+
+Each process mirrors both sets in an in-memory Bloom filter, rebuilt from
+Redis every JWT_REVOCATION_REFRESH seconds and kept current in between by
+the ``account:revocations`` pub/sub channel. A token the filter has never
+seen, which is nearly every token, is accepted without a network call;
+a filter hit is confirmed against Redis. If Redis cannot be reached the
+filter built last stays in use, and filter hits count as revoked.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+JTIS_KEY = "account:revoked:jtis"
+USERS_KEY = "account:revoked:users"
+CHANNEL = "account:revocations"
+
+# Items received while a rebuild reads Redis are replayed into the new filter
+REPLAY_WINDOW = 10
+
+
+class BloomFilter:
+    """Fixed size Bloom filter using double hashing over one blake2b digest"""
+
+    def __init__(self, size, hashes):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray((size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        step = int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+_lock = threading.Lock()
+_bloom = None
+_built_at = 0.0
+_recent = []
+_listener_pid = None
+
+
+def _connection():
+    return get_redis_connection("default")
+
+
+def _new_filter():
+    return BloomFilter(
+        settings.JWT_REVOCATION_BLOOM_SIZE, settings.JWT_REVOCATION_BLOOM_HASHES
+    )
+
+
+def jti_item(jti):
+    return f"jti:{jti}"
+
+
+def user_item(user_id):
+    return f"user:{user_id}"
+
+
+def _add(item):
+    global _bloom
+    with _lock:
+        if _bloom is None:
+            _bloom = _new_filter()
+        _bloom.add(item)
+        _recent.append((time.monotonic(), item))
+
+
+def _rebuild():
+    global _bloom, _built_at, _recent
+    started = time.monotonic()
+    now = time.time()
+    refresh_lifetime = api_settings.REFRESH_TOKEN_LIFETIME.total_seconds()
+    try:
+        pipe = _connection().pipeline(transaction=False)
+        pipe.zremrangebyscore(JTIS_KEY, "-inf", now)
+        pipe.zremrangebyscore(USERS_KEY, "-inf", now - refresh_lifetime)
+        pipe.zrange(JTIS_KEY, 0, -1)
+        pipe.zrange(USERS_KEY, 0, -1)
+        _, _, jtis, users = pipe.execute()
+    except Exception:
+        logger.warning("Could not rebuild the JWT revocation filter", exc_info=True)
+        with _lock:
+            # Keep the current filter and retry after the next interval
+            _built_at = started
+            if _bloom is None:
+                _bloom = _new_filter()
+        return
+
+    bloom = _new_filter()
+    for jti in jtis:
+        bloom.add(jti_item(jti.decode()))
+    for user_id in users:
+        bloom.add(user_item(user_id.decode()))
+    with _lock:
+        _recent = [(at, item) for at, item in _recent if at >= started - REPLAY_WINDOW]
+        for _, item in _recent:
+            bloom.add(item)
+        _bloom = bloom
+        _built_at = started
+
+
+def _handle_message(message):
+    _add(message["data"].decode())
+
+
+def _listen():
+    global _built_at
+    while True:
+        try:
+            pubsub = _connection().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            # Revocations published while unsubscribed come in with a rebuild
+            _built_at = 0.0
+            for message in pubsub.listen():
+                _handle_message(message)
+        except Exception:
+            logger.warning("JWT revocation listener disconnected", exc_info=True)
+            time.sleep(1)
+
+
+def _ensure_listener():
+    global _listener_pid
+    if not settings.JWT_REVOCATION_PUBSUB or _listener_pid == os.getpid():
+        return
+    with _lock:
+        if _listener_pid == os.getpid():
+            return
+        _listener_pid = os.getpid()
+    threading.Thread(target=_listen, name="jwt-revocations", daemon=True).start()
+
+
+def current_filter():
+    """This process's filter, rebuilt from Redis when it is too old"""
+    _ensure_listener()
+    if _bloom is None or time.monotonic() - _built_at > settings.JWT_REVOCATION_REFRESH:
+        _rebuild()
+    return _bloom
+
+
+def is_revoked(token):
+    """Whether a validated token was revoked by jti or by a user cut-off"""
+    bloom = current_filter()
+    jti = token.get(api_settings.JTI_CLAIM)
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+
+    checks = []
+    if jti and jti_item(jti) in bloom:
+        checks.append((JTIS_KEY, jti))
+    if user_id is not None and user_item(user_id) in bloom:
+        checks.append((USERS_KEY, user_id))
+    if not checks:
+        return False
+
+    try:
+        pipe = _connection().pipeline(transaction=False)
+        for key, member in checks:
+            pipe.zscore(key, member)
+        scores = pipe.execute()
+    except Exception:
+        logger.warning("Could not confirm a JWT revocation", exc_info=True)
+        return True
+
+    for (key, _), score in zip(checks, scores):
+        if score is None:
+            continue
+        if key == JTIS_KEY or token.get("iat", 0) <= score:
+            return True
+    return False
+
+
+def _store(key, member, score, item, **options):
+    pipe = _connection().pipeline(transaction=False)
+    pipe.zadd(key, {member: score}, **options)
+    pipe.publish(CHANNEL, item)
+    added, _ = pipe.execute()
+    _add(item)
+    return added
+
+
+def revoke_token(token):
+    """
+    Revoke a token until it expires. Returns False when it was already
+    revoked, so a refresh token can only be rotated once.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    return bool(_store(JTIS_KEY, jti, token["exp"], jti_item(jti), nx=True))
+
+
+def revoke_user(user_id):
+    """Revoke every token of a user issued up to now"""
+    _store(USERS_KEY, user_id, int(time.time()), user_item(user_id))
+
+
+def reset():
+    """Forget this process's filter; the next check rebuilds it"""
+    global _bloom, _built_at, _recent
+    with _lock:
+        _bloom, _built_at, _recent = None, 0.0, []
@@ -0,0 +1,10 @@
+"""
+OpenAPI extensions for the account authentication classes
+"""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the stock JWT bearer scheme"""
+
+    target_class = "account.authentication.CachedJWTAuthentication"
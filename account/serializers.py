@@ -5,9 +5,23 @@ from datetime import datetime
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from random import randint
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.serializers import (
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 
-from monitoring.models.observability import CodeLog
-from notifications import KavenegarSMS
+from monitoring.sms import queue_sms
+
+from .authentication import REVOKED_MESSAGE
+from .cache import get_cached_user
+from .revocation import is_revoked, revoke_token
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -70,14 +84,8 @@ class AuthenticationSerializer(serializers.Serializer):
 
         user.save()
 
-        # Send Otp Code
-        try:
-            kavenegar = KavenegarSMS()
-            kavenegar.register(user.phone, otp)
-            kavenegar.send()
-        except Exception as e:
-            CodeLog.log_error("account - serializers.py", "def create", str(e))
-            print(f"THIS IS THE CODE: {otp}")
+        # Send Otp Code through the background SMS pipeline
+        queue_sms(user.phone, "otp", {"token": otp}, purpose="otp")
 
         return user
 
@@ -113,3 +121,63 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs["user"] = user
         return attrs
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that honours the revocation list and, with ROTATE_REFRESH_TOKENS,
+    revokes the used refresh token so it can only be rotated once
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_revoked(refresh):
+            raise InvalidToken(REVOKED_MESSAGE)
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            user = get_cached_user(user_id)
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(
+                    self.error_messages["no_active_account"], "no_active_account"
+                )
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # Revoking first makes concurrent reuse of one refresh token fail
+            if not revoke_token(refresh):
+                raise InvalidToken(REVOKED_MESSAGE)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class RevocableTokenVerifySerializer(TokenVerifySerializer):
+    """Verify that also rejects revoked tokens"""
+
+    def validate(self, attrs):
+        if is_revoked(UntypedToken(attrs["token"])):
+            raise InvalidToken(REVOKED_MESSAGE)
+        return super().validate(attrs)
+
+
+class LogoutSerializer(serializers.Serializer):
+    """Logout Serializer"""
+
+    refresh = serializers.CharField(
+        required=False, help_text="توکن تازه‌سازی این نشست برای ابطال"
+    )
+
+    def validate_refresh(self, value):
+        try:
+            refresh = TokenRefreshSerializer.token_class(value)
+        except TokenError:
+            raise serializers.ValidationError("توکن نامعتبر است")
+        user_id = refresh.get(api_settings.USER_ID_CLAIM)
+        if str(user_id) != str(self.context["request"].user.pk):
+            raise serializers.ValidationError("توکن متعلق به این کاربر نیست")
+        return refresh
@@ -6,11 +6,11 @@ from django.db import transaction
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from common import throttling
 from monitoring.models.observability import CodeLog
-from notifications import KavenegarSMS
+from monitoring.sms import queue_sms
 
 
-@transaction.atomic
 def generate_otp(phone: str):
     """Register User Service"""
     otp = randint(100000, 999999)
@@ -18,18 +18,19 @@ def generate_otp(phone: str):
     cache.set(f"otp_{phone}", otp, timeout=60)  # store for 1 minutes
 
     if not settings.DEBUG:
-        sms = KavenegarSMS()
-        sms.register(
-            receptor=phone,
-            code=otp,
-        )
-        sms.send()
+        # Sent by the SMS worker; the request does not wait on the provider
+        queue_sms(phone, "otp", {"token": otp}, purpose="otp")
 
     return otp
 
 
 def verify_otp(phone, otp_input):
     key = f"otp_{phone}"
+    if throttling.consume("otp-verify", {"phone": phone}):
+        # Too many guesses burn the code; a new one has to be requested
+        cache.delete(key)
+        return False
+
     stored_otp = cache.get(key)
 
     if stored_otp and str(stored_otp) == str(otp_input):
@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 # from wallet.models.wallet import Wallet
 
+from .cache import invalidate_users
 from .models import User
 
 
@@ -14,3 +16,53 @@ from .models import User
 #         wallet.charge(50000)
 #         if not instance.is_staff:
 #             Rancher.objects.get_or_create(user=instance)
+
+
+def users_of_groups(group_ids):
+    return User.objects.filter(groups__in=group_ids).values_list("pk", flat=True)
+
+
+@receiver(post_save, sender=User, dispatch_uid="user_cache_save")
+@receiver(post_delete, sender=User, dispatch_uid="user_cache_delete")
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Drop the cached user after any change, including password changes"""
+    invalidate_users([instance.pk])
+
+
+@receiver(pre_delete, sender=Group, dispatch_uid="user_cache_group_delete")
+def invalidate_group_members(sender, instance, **kwargs):
+    invalidate_users(users_of_groups([instance.pk]))
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid="user_cache_groups")
+@receiver(
+    m2m_changed,
+    sender=User.user_permissions.through,
+    dispatch_uid="user_cache_user_permissions",
+)
+def invalidate_user_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached permissions when a user's groups or permissions change"""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_users([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        invalidate_users(pk_set)
+    elif action == "pre_clear":
+        # The related users are only known before a reverse clear
+        invalidate_users(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver(
+    m2m_changed,
+    sender=Group.permissions.through,
+    dispatch_uid="user_cache_group_permissions",
+)
+def invalidate_group_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached permissions of every member of a changed group"""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_users(users_of_groups([instance.pk]))
+    elif action in ("post_add", "post_remove"):
+        invalidate_users(users_of_groups(pk_set))
+    elif action == "pre_clear":
+        invalidate_users(users_of_groups(instance.group_set.values("pk")))
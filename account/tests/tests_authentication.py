@@ -0,0 +1,137 @@
+"""
+Tests Cached User Resolution
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from account.backends import CachedModelBackend
+from account.cache import clear_local, get_cached_user, invalidate_users
+
+ME_USER_URL = reverse("account:me")
+
+
+class CachedUserTestMixin:
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            phone="09151498722", password="123456"
+        )
+        self.addCleanup(clear_local)
+        self.addCleanup(lambda: invalidate_users([self.user.pk]))
+
+
+class CachedJWTAuthenticationTest(CachedUserTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_warm_user_saves_a_query(self):
+        """
+        Test that an authenticated read costs one query less once cached.
+        """
+        with CaptureQueriesContext(connection) as cold:
+            res = self.client.get(ME_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as warm:
+            res = self.client.get(ME_USER_URL)
+        self.assertEqual(res.data["phone"], self.user.phone)
+        self.assertEqual(len(warm), len(cold) - 1)
+        self.assertFalse(
+            [q for q in warm if q["sql"].startswith('SELECT "account_user"."id"')]
+        )
+
+    def test_redis_tier_serves_other_processes(self):
+        """
+        Test that an empty local tier falls back to Redis, not the database.
+        """
+        get_cached_user(self.user.pk)
+        clear_local()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_user(self.user.pk), self.user)
+
+    def test_save_invalidates(self):
+        """
+        Test that profile changes are visible on the next request.
+        """
+        self.client.get(ME_USER_URL)
+
+        self.user.fullName = "نام جدید"
+        self.user.save()
+
+        res = self.client.get(ME_USER_URL)
+        self.assertEqual(res.data["fullName"], "نام جدید")
+
+    def test_deactivated_user_is_rejected(self):
+        """
+        Test that a cached user loses access once deactivated.
+        """
+        self.client.get(ME_USER_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_uses_the_stored_row(self):
+        """
+        Test that updating the profile does not write back a cached copy.
+        """
+        self.client.get(ME_USER_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(email="a@b.ir")
+
+        res = self.client.patch(ME_USER_URL, {"fullName": "نام جدید"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "a@b.ir")
+        self.assertEqual(self.user.fullName, "نام جدید")
+
+
+class CachedModelBackendTest(CachedUserTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = CachedModelBackend()
+        self.permission = Permission.objects.get(codename="view_user")
+        self.group = Group.objects.create(name="داوران")
+
+    def perms(self):
+        return self.backend.get_all_permissions(self.backend.get_user(self.user.pk))
+
+    def test_permissions_are_cached(self):
+        """
+        Test that warm permission sets cost no query.
+        """
+        self.user.user_permissions.add(self.permission)
+        self.assertEqual(self.perms(), {"account.view_user"})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.perms(), {"account.view_user"})
+
+    def test_group_changes_invalidate(self):
+        """
+        Test that membership and group permission changes are picked up.
+        """
+        self.assertEqual(self.perms(), set())
+
+        self.group.user_set.add(self.user)
+        self.group.permissions.add(self.permission)
+        self.assertEqual(self.perms(), {"account.view_user"})
+
+        self.group.permissions.clear()
+        self.assertEqual(self.perms(), set())
+
+        self.group.permissions.add(self.permission)
+        self.group.user_set.clear()
+        self.assertEqual(self.perms(), set())
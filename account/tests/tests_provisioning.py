@@ -0,0 +1,106 @@
+"""
+Tests Bulk User Provisioning Command
+"""
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from account.cache import clear_local, get_cached_user
+
+User = get_user_model()
+
+FAST_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+    "django.contrib.auth.hashers.UnsaltedMD5PasswordHasher",
+]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ProvisionUsersTest(TestCase):
+    def setUp(self):
+        self.addCleanup(clear_local)
+
+    def provision(self, content, *args, **options):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, "w", encoding="utf-8") as csv_file:
+            csv_file.write(content)
+        out, err = StringIO(), StringIO()
+        call_command("provision_users", path, *args, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_users_with_hashes_from_the_pool(self):
+        """
+        Test that new users are created with passwords hashed by the workers.
+        """
+        out, err = self.provision(
+            "phone,password,full_name,is_staff\n"
+            "09120000001,secret1,داور یک,yes\n"
+            "09120000002,secret2,داور دو,no\n"
+            "12345,secret3,نامعتبر,no\n",
+            workers=2,
+        )
+
+        self.assertIn("ایجاد شده: 2", out)
+        self.assertIn("نامعتبر: 1", out)
+        self.assertIn("سطر 4", err)
+        first = User.objects.get(phone="09120000001")
+        self.assertTrue(first.check_password("secret1"))
+        self.assertTrue(first.is_staff)
+        self.assertEqual(first.fullName, "داور یک")
+        self.assertFalse(User.objects.get(phone="09120000002").is_staff)
+
+    def test_existing_users_are_upserted(self):
+        """
+        Test that existing users are updated but keep their password.
+        """
+        user = User.objects.create_user(phone="09120000001", password="old")
+        get_cached_user(user.pk)
+
+        out, _ = self.provision(
+            "phone,password,full_name\n09120000001,new,نام جدید\n", workers=1
+        )
+
+        self.assertIn("به‌روزرسانی شده: 1", out)
+        user.refresh_from_db()
+        self.assertEqual(user.fullName, "نام جدید")
+        self.assertTrue(user.check_password("old"))
+        self.assertEqual(get_cached_user(user.pk).fullName, "نام جدید")
+
+        self.provision(
+            "phone,password\n09120000001,new\n", "--reset-passwords", workers=1
+        )
+        user.refresh_from_db()
+        self.assertTrue(user.check_password("new"))
+        self.assertEqual(user.fullName, "نام جدید")
+
+    def test_legacy_hashes_are_upgraded(self):
+        """
+        Test that matching legacy hashes are rehashed with the current hasher.
+        """
+        User.objects.create(
+            phone="09120000001", password=make_password("same", hasher="unsalted_md5")
+        )
+        User.objects.create(
+            phone="09120000002",
+            password=make_password("other", hasher="unsalted_md5"),
+        )
+
+        out, _ = self.provision(
+            "phone,password\n09120000001,same\n09120000002,wrong\n",
+            "--rehash-legacy",
+            workers=2,
+        )
+
+        self.assertIn("رمز ارتقا یافته: 1", out)
+        self.assertTrue(
+            User.objects.get(phone="09120000001").password.startswith("md5$")
+        )
+        self.assertFalse(
+            User.objects.get(phone="09120000002").password.startswith("md5$")
+        )
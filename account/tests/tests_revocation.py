@@ -0,0 +1,140 @@
+"""
+Tests JWT Revocation
+"""
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from account import revocation
+from account.cache import clear_local
+
+ME_USER_URL = reverse("account:me")
+LOGOUT_URL = reverse("account:logout")
+LOGOUT_EVERYWHERE_URL = reverse("account:logout-everywhere")
+REFRESH_URL = reverse("account:refresh")
+VERIFY_URL = reverse("account:verify")
+
+
+def clear_revocations():
+    get_redis_connection("default").delete(revocation.JTIS_KEY, revocation.USERS_KEY)
+    revocation.reset()
+
+
+class RevocationTest(TestCase):
+    def setUp(self):
+        clear_revocations()
+        self.addCleanup(clear_revocations)
+        self.addCleanup(clear_local)
+        self.user = get_user_model().objects.create_user(
+            phone="09151498722", password="123456"
+        )
+        self.client = APIClient()
+
+    def authenticate(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        return refresh
+
+    def test_bloom_filter(self):
+        """
+        Test that the Bloom filter finds what was added.
+        """
+        bloom = revocation.BloomFilter(1024, 3)
+        bloom.add("jti:a")
+
+        self.assertIn("jti:a", bloom)
+        self.assertNotIn("jti:b", bloom)
+
+    def test_logout_revokes_access_and_refresh(self):
+        """
+        Test that after logout neither token of the session is accepted.
+        """
+        refresh = self.authenticate()
+
+        res = self.client.post(LOGOUT_URL, {"refresh": str(refresh)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(ME_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = APIClient().post(REFRESH_URL, {"refresh": str(refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = APIClient().post(VERIFY_URL, {"token": str(refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_rejects_foreign_refresh_token(self):
+        """
+        Test that a user cannot revoke another user's refresh token.
+        """
+        other = get_user_model().objects.create_user(phone="09151498723")
+        self.authenticate()
+
+        res = self.client.post(
+            LOGOUT_URL, {"refresh": str(RefreshToken.for_user(other))}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_logout_everywhere_revokes_earlier_tokens(self):
+        """
+        Test that every token issued before logout-everywhere is rejected.
+        """
+        other_session = RefreshToken.for_user(self.user)
+        self.authenticate()
+
+        res = self.client.post(LOGOUT_EVERYWHERE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertTrue(revocation.is_revoked(other_session))
+        self.assertTrue(revocation.is_revoked(other_session.access_token))
+        later = RefreshToken.for_user(self.user)
+        later["iat"] = int(time.time()) + 1
+        self.assertFalse(revocation.is_revoked(later))
+
+    def test_refresh_rotates_once(self):
+        """
+        Test that a refresh token is replaced and cannot be reused.
+        """
+        refresh = RefreshToken.for_user(self.user)
+
+        res = self.client.post(REFRESH_URL, {"refresh": str(refresh)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("access", res.data)
+        self.assertNotEqual(res.data["refresh"], str(refresh))
+
+        res = self.client.post(REFRESH_URL, {"refresh": str(refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unrevoked_token_needs_no_redis_call(self):
+        """
+        Test that a token missing from the filter is checked in memory.
+        """
+        token = RefreshToken.for_user(self.user)
+        revocation.current_filter()
+
+        with mock.patch.object(revocation, "_connection") as connection:
+            self.assertFalse(revocation.is_revoked(token))
+
+        connection.assert_not_called()
+
+    def test_revocations_reach_other_processes(self):
+        """
+        Test that a published revocation and a rebuild update the filter.
+        """
+        token = RefreshToken.for_user(self.user)
+        get_redis_connection("default").zadd(
+            revocation.JTIS_KEY, {token["jti"]: token["exp"]}
+        )
+        revocation.current_filter()
+        self.assertTrue(revocation.is_revoked(token))
+
+        revocation.reset()
+        revocation._handle_message({"data": b"jti:published"})
+        self.assertIn("jti:published", revocation.current_filter())
+        self.assertTrue(revocation.is_revoked(token))
@@ -0,0 +1,123 @@
+"""
+Tests Throttling Of Public Endpoints
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from account.services import verify_otp
+from common.throttling import consume, parse_rate
+
+LOGIN_URL = reverse("account:login")
+
+
+def clear_throttles():
+    redis = get_redis_connection("default")
+    keys = list(redis.scan_iter("throttle:*"))
+    if keys:
+        redis.delete(*keys)
+
+
+@override_settings(
+    THROTTLE_ENABLED=True,
+    THROTTLE_POLICIES={
+        "login": [{"key": "ip", "rate": "10/m"}, {"key": "phone", "rate": "2/m"}],
+        "otp-verify": [{"key": "phone", "rate": "2/10m"}],
+        "bucket": [
+            {"key": "ip", "algorithm": "token_bucket", "rate": "1/s", "burst": 2}
+        ],
+    },
+)
+class ThrottlingTest(TestCase):
+    def setUp(self):
+        clear_throttles()
+        self.addCleanup(clear_throttles)
+        self.client = APIClient()
+        get_user_model().objects.create_user(phone="09151498722", password="123456")
+
+    def login(self, phone="09151498722"):
+        return self.client.post(LOGIN_URL, {"phone": phone, "password": "wrong"})
+
+    def test_parse_rate(self):
+        """
+        Test that rates accept a period multiplier.
+        """
+        self.assertEqual(parse_rate("5/m"), (5, 60))
+        self.assertEqual(parse_rate("5/10m"), (5, 600))
+
+    def test_login_is_throttled_by_phone(self):
+        """
+        Test that repeated logins for one phone get 429 with Retry-After.
+        """
+        self.assertEqual(self.login().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.login().status_code, status.HTTP_400_BAD_REQUEST)
+
+        with mock.patch.object(
+            get_user_model(), "check_password"
+        ) as check_password, CaptureQueriesContext(connection) as queries:
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertTrue(0 < int(res["Retry-After"]) <= 60)
+        check_password.assert_not_called()
+        self.assertFalse([q for q in queries if "account_user" in q["sql"]])
+
+        # Another phone from the same address is still allowed
+        self.assertEqual(
+            self.login("09151498723").status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_rejected_requests_are_not_counted(self):
+        """
+        Test that a rejection does not use up the other limits.
+        """
+        for _ in range(5):
+            self.login()
+
+        self.assertEqual(
+            get_redis_connection("default").zcard("throttle:login:ip:127.0.0.1"), 2
+        )
+
+    def test_token_bucket_refills(self):
+        """
+        Test that a token bucket allows a burst and then its refill rate.
+        """
+        identifiers = {"ip": "10.0.0.1"}
+        with mock.patch("common.throttling.time.time", return_value=1000.0):
+            self.assertEqual(consume("bucket", identifiers), 0)
+            self.assertEqual(consume("bucket", identifiers), 0)
+            self.assertEqual(consume("bucket", identifiers), 1)
+
+        with mock.patch("common.throttling.time.time", return_value=1000.5):
+            self.assertEqual(consume("bucket", identifiers), 0.5)
+
+        with mock.patch("common.throttling.time.time", return_value=1001.0):
+            self.assertEqual(consume("bucket", identifiers), 0)
+
+    def test_otp_guessing_burns_the_code(self):
+        """
+        Test that too many OTP guesses reject even the right code.
+        """
+        cache.set("otp_09151498722", 123456, timeout=60)
+
+        self.assertFalse(verify_otp("09151498722", 111111))
+        self.assertFalse(verify_otp("09151498722", 222222))
+        self.assertFalse(verify_otp("09151498722", 123456))
+
+        self.assertIsNone(cache.get("otp_09151498722"))
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled_throttling_allows_everything(self):
+        """
+        Test that throttling can be switched off.
+        """
+        for _ in range(5):
+            self.assertEqual(self.login().status_code, status.HTTP_400_BAD_REQUEST)
@@ -22,7 +22,13 @@ urlpatterns = [
     path("register/", views.RegisterView.as_view(), name="register"),
     path("login/", views.LoginView.as_view(), name="login"),
     path("me/", views.UserView.as_view(), name="me"),
-    # JWT token management
+    path("logout/", views.LogoutView.as_view(), name="logout"),
+    path(
+        "logout-everywhere/",
+        views.LogoutEverywhereView.as_view(),
+        name="logout-everywhere",
+    ),
+    # JWT token management (refresh rotates and revokes the used token)
     path("refresh/", TokenRefreshView.as_view(), name="refresh"),
     path("verify/", TokenVerifyView.as_view(), name="verify"),
 ]
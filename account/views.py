@@ -3,15 +3,18 @@ Account Module Views
 """
 from rest_framework import status, serializers
 from drf_spectacular.utils import extend_schema
-from rest_framework_simplejwt import authentication
+from account.authentication import CachedJWTAuthentication
+from common.throttling import ScopedRedisThrottle
 from django.contrib.auth import get_user_model, authenticate
 from rest_framework import generics, permissions, views
 from django.contrib.auth.hashers import make_password
 
 from rest_framework.response import Response
 from account.serializers import (
+    LogoutSerializer,
     UserSerializer,
 )
+from account.revocation import revoke_token, revoke_user
 from monitoring.models.observability import CodeLog
 
 from . import services
@@ -23,6 +26,8 @@ class RegisterView(views.APIView):
     """User Registration View"""
 
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedRedisThrottle]
+    throttle_scope = "register"
 
     class RegisterSerializer(serializers.Serializer):
         full_name = serializers.CharField(
@@ -142,6 +147,8 @@ class LoginView(views.APIView):
     """User Login View"""
 
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedRedisThrottle]
+    throttle_scope = "login"
 
     class LoginSerializer(serializers.Serializer):
         phone = serializers.CharField(
@@ -265,10 +272,65 @@ class LoginView(views.APIView):
 class UserView(generics.RetrieveUpdateAPIView):
     """Retrieve Or Update APIView for User"""
 
-    authentication_classes = [authentication.JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserSerializer
 
     def get_object(self):
         """Retrieve The Authorized User"""
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # Updates start from the stored row, not a possibly cached copy
+        return get_user_model().objects.get(pk=self.request.user.pk)
+
+
+class LogoutView(views.APIView):
+    """Revoke The Current Access Token And Optionally Its Refresh Token"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        request=LogoutSerializer,
+        summary="خروج کاربر",
+        description="ابطال توکن دسترسی فعلی و در صورت ارسال، توکن تازه‌سازی همین نشست",
+        tags=["Authentication"],
+        responses={
+            200: {"type": "object", "properties": {"message": {"type": "string"}}}
+        },
+    )
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        revoke_token(request.auth)
+        refresh = serializer.validated_data.get("refresh")
+        if refresh is not None:
+            revoke_token(refresh)
+
+        return Response(
+            {"message": "خروج با موفقیت انجام شد"}, status=status.HTTP_200_OK
+        )
+
+
+class LogoutEverywhereView(views.APIView):
+    """Revoke Every Token Issued To The User"""
+
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        request=None,
+        summary="خروج از همه دستگاه‌ها",
+        description="ابطال همه توکن‌های دسترسی و تازه‌سازی صادر شده برای کاربر تا این لحظه",
+        tags=["Authentication"],
+        responses={
+            200: {"type": "object", "properties": {"message": {"type": "string"}}}
+        },
+    )
+    def post(self, request):
+        revoke_user(request.user.pk)
+        return Response(
+            {"message": "خروج از همه دستگاه‌ها با موفقیت انجام شد"},
+            status=status.HTTP_200_OK,
+        )
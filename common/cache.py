@@ -1,5 +1,48 @@
+"""
+Caching toolkit on top of the default cache
+
+``@cached`` stores a function's result under a key built from its
+namespace, the current versions of the namespace and its tags, and its
+arguments. Bumping a version with ``invalidate`` makes every key built on
+it unreachable in O(1); the orphaned entries simply expire. QuerySets are
+evaluated and cached as lists.
+
+Entries are recomputed before they expire with a probability that grows as
+expiry nears (XFetch, scaled by how long the last computation took), and
+only by the caller holding a short Redis lock: the others keep serving the
+current value, or wait for the new one on a cold miss, instead of
+stampeding the database. TTLs are shortened by a random jitter so entries
+written together do not expire together. Lookups are counted per namespace
+in monitoring.metrics.
+
+    @cached(key="{province_id}", ttl=3600, tags=["province"])
+    def city_list(province_id):
+        return City.objects.filter(province_id=province_id).order_by("name")
+
+    invalidate("province")  # drops city_list entries for every province
+"""
+import functools
+import hashlib
+import inspect
+import math
+import random
+import time
+
+from django.conf import settings
 from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
 from django.utils.timezone import timedelta
+from redis.exceptions import LockError
+
+from monitoring.metrics import CACHED_REQUESTS
+
+VERSION_KEY = "cache:version:{}"
+# How long a recomputation may hold the lock, and how long others wait for it
+LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+# XFetch aggressiveness; 1.0 is the value from the paper
+EARLY_EXPIRATION_BETA = 1.0
 
 
 def set_cache(*, key: str, value, lock_minute: int):
@@ -8,3 +51,137 @@ def set_cache(*, key: str, value, lock_minute: int):
 
     # Set the ads in cache
     cache.set(key, value, timeout=lock_duration.total_seconds())
+
+
+def get_versions(names):
+    """Current versions of ``names``, starting unknown ones"""
+    keys = {VERSION_KEY.format(name): name for name in names}
+    found = cache.get_many(keys)
+    versions = {}
+    for key, name in keys.items():
+        version = found.get(key)
+        if version is None:
+            # Not 1: an evicted counter must not resurrect its old entries
+            version = time.time_ns() // 1000
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        versions[name] = version
+    return versions
+
+
+def _bump(names):
+    for name in names:
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns() // 1000, timeout=None)
+
+
+def invalidate(*names):
+    """
+    Drop every entry of the given namespaces or tags, now and again when the
+    current transaction commits, so a result computed from data that was
+    about to change is not kept either.
+    """
+    _bump(names)
+    transaction.on_commit(lambda: _bump(names))
+
+
+def jittered(ttl):
+    """``ttl`` shortened by up to CACHE_TTL_JITTER of itself"""
+    return max(1, round(ttl * (1 - random.uniform(0, settings.CACHE_TTL_JITTER))))
+
+
+def should_recompute(expires_at, delta, beta=EARLY_EXPIRATION_BETA):
+    """XFetch: recompute early with a probability rising towards expiry"""
+    return time.time() - delta * beta * math.log(1 - random.random()) >= expires_at
+
+
+def build_key(namespace, tags, key, func, args, kwargs):
+    versions = get_versions([namespace, *tags])
+    version = ".".join(str(versions[name]) for name in [namespace, *tags])
+    if callable(key):
+        suffix = key(*args, **kwargs)
+    elif key is not None:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        suffix = key.format(**bound.arguments)
+    else:
+        suffix = hashlib.sha1(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+    return f"cache:{namespace}:{version}:{suffix}"
+
+
+def _compute(func, args, kwargs, ttl, cache_key):
+    started = time.monotonic()
+    value = func(*args, **kwargs)
+    if isinstance(value, QuerySet):
+        value = list(value)
+    delta = time.monotonic() - started
+    timeout = jittered(ttl)
+    cache.set(cache_key, (value, time.time() + timeout, delta), timeout=timeout)
+    return value
+
+
+def cached(key=None, ttl=300, tags=(), namespace=None):
+    """
+    Cache a function's result for ``ttl`` seconds.
+
+    ``key`` is a format string over the function's arguments, a callable
+    taking the same arguments, or None to hash them. The wrapper gets
+    ``invalidate()`` dropping all its entries and the original function as
+    ``uncached``.
+    """
+    tags = tuple(tags)
+
+    def decorator(func):
+        name = namespace or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.CACHED_ENABLED:
+                return func(*args, **kwargs)
+
+            cache_key = build_key(name, tags, key, func, args, kwargs)
+            entry = cache.get(cache_key)
+            if entry is not None:
+                value, expires_at, delta = entry
+                if not should_recompute(expires_at, delta):
+                    CACHED_REQUESTS.labels(namespace=name, result="hit").inc()
+                    return value
+
+            lock = cache.lock(f"{cache_key}:lock", timeout=LOCK_TIMEOUT)
+            if lock.acquire(blocking=False):
+                try:
+                    CACHED_REQUESTS.labels(
+                        namespace=name, result="miss" if entry is None else "early"
+                    ).inc()
+                    return _compute(func, args, kwargs, ttl, cache_key)
+                finally:
+                    try:
+                        lock.release()
+                    except LockError:
+                        # Expired while computing; someone else may hold it now
+                        pass
+
+            if entry is not None:
+                # Another caller is refreshing it; this one is still valid
+                CACHED_REQUESTS.labels(namespace=name, result="hit").inc()
+                return entry[0]
+
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(WAIT_INTERVAL)
+                entry = cache.get(cache_key)
+                if entry is not None:
+                    CACHED_REQUESTS.labels(namespace=name, result="wait").inc()
+                    return entry[0]
+            CACHED_REQUESTS.labels(namespace=name, result="miss").inc()
+            return _compute(func, args, kwargs, ttl, cache_key)
+
+        wrapper.invalidate = lambda: invalidate(name)
+        wrapper.uncached = func
+        wrapper.namespace = name
+        return wrapper
+
+    return decorator
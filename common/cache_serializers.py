@@ -0,0 +1,68 @@
+"""
+Compact serialization and compression for the Redis cache
+
+``MsgpackSerializer`` stores cached payloads (dicts, lists, strings,
+numbers, bytes) as msgpack, which is smaller and faster than pickle and
+does not tie entries to the code that wrote them. Anything msgpack cannot
+represent, such as sets, dates or model instances, is pickled inside an
+extension type, and entries written by the pickle serializer are still
+read, so the switch needs no cache flush.
+
+The compressors only compress values longer than COMPRESS_MIN_LENGTH bytes
+of the cache OPTIONS; django-redis reads uncompressed values as they are.
+``python manage.py benchmark_cache`` compares the combinations on the
+project's own payloads.
+"""
+import pickle
+
+import msgpack
+from django_redis.compressors import zlib
+from django_redis.serializers.base import BaseSerializer
+
+EXT_PICKLE = 1
+DEFAULT_MIN_LENGTH = 512
+
+
+def _default(value):
+    return msgpack.ExtType(EXT_PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _ext_hook(code, data):
+    if code == EXT_PICKLE:
+        return pickle.loads(data)
+    return msgpack.ExtType(code, data)
+
+
+class MsgpackSerializer(BaseSerializer):
+    def dumps(self, value):
+        return msgpack.packb(value, default=_default, use_bin_type=True)
+
+    def loads(self, value):
+        try:
+            return msgpack.unpackb(
+                value, ext_hook=_ext_hook, raw=False, strict_map_key=False
+            )
+        except ValueError:
+            # Written by the pickle serializer before the switch
+            return pickle.loads(value)
+
+
+class ThresholdMixin:
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = options.get("COMPRESS_MIN_LENGTH", DEFAULT_MIN_LENGTH)
+
+
+class ZlibCompressor(ThresholdMixin, zlib.ZlibCompressor):
+    pass
+
+
+try:
+    from django_redis.compressors import lz4
+
+    class Lz4Compressor(ThresholdMixin, lz4.Lz4Compressor):
+        pass
+
+except ImportError:
+    # lz4 is optional: pip install lz4 to use it
+    Lz4Compressor = None
@@ -0,0 +1,120 @@
+"""
+PostgreSQL backend with an optional psycopg connection pool
+
+Django 4.2 has no built-in pool, so with ``OPTIONS["pool"]`` set this
+backend checks connections out of a ``psycopg_pool.ConnectionPool`` (one
+per alias and process) and hands them back instead of closing them.
+Without it the backend behaves exactly like the stock one, with persistent
+connections governed by CONN_MAX_AGE and CONN_HEALTH_CHECKS. Either way the
+time spent obtaining a connection is recorded in monitoring.metrics.
+"""
+import os
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+from psycopg import IsolationLevel
+
+from monitoring.metrics import DB_CONNECTION_WAIT
+
+_lock = threading.Lock()
+_pools = {}
+
+
+def get_pool(alias, conn_params, options):
+    """The pool of ``alias`` in this process, created on first use"""
+    key = (alias, os.getpid())
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _lock:
+        if key not in _pools:
+            from psycopg_pool import ConnectionPool
+
+            _pools[key] = ConnectionPool(
+                kwargs=conn_params,
+                min_size=options.get("min_size", 1),
+                max_size=options.get("max_size"),
+                timeout=options.get("timeout", 30),
+                check=ConnectionPool.check_connection
+                if options.get("check", True)
+                else None,
+                name=f"{alias}-{os.getpid()}",
+                open=True,
+            )
+        return _pools[key]
+
+
+def close_pools():
+    """Close every pool opened by this process"""
+    with _lock:
+        for key in [key for key in _pools if key[1] == os.getpid()]:
+            _pools.pop(key).close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool_options(self):
+        options = self.settings_dict["OPTIONS"].get("pool")
+        if options is True:
+            return {}
+        return options or None
+
+    @property
+    def uses_pool(self):
+        return self.pool_options is not None
+
+    def get_connection_params(self):
+        if self.uses_pool and self.settings_dict["CONN_MAX_AGE"]:
+            raise ImproperlyConfigured(
+                "Pooled connections are returned after every request; "
+                "set CONN_MAX_AGE to 0 when OPTIONS['pool'] is used."
+            )
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict["OPTIONS"]
+        set_isolation_level = False
+        try:
+            isolation_level_value = options["isolation_level"]
+        except KeyError:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            try:
+                self.isolation_level = IsolationLevel(isolation_level_value)
+                set_isolation_level = True
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f"Invalid transaction isolation level {isolation_level_value} "
+                    f"specified. Use one of the psycopg.IsolationLevel values."
+                )
+
+        started = time.perf_counter()
+        if self.uses_pool:
+            source = "pool"
+            pool = get_pool(self.alias, conn_params, self.pool_options)
+            connection = pool.getconn()
+        else:
+            source = "connect"
+            connection = self.Database.connect(**conn_params)
+        DB_CONNECTION_WAIT.labels(alias=self.alias, source=source).observe(
+            time.perf_counter() - started
+        )
+
+        if set_isolation_level:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None or not self.uses_pool:
+            return super()._close()
+        pool = _pools.get((self.alias, os.getpid()))
+        if pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            # The pool rolls back an open transaction and discards broken
+            # connections before lending them again
+            pool.putconn(self.connection)
@@ -0,0 +1,103 @@
+"""
+Routing of safe requests' reads to read replicas
+
+``ReplicaRoutingMiddleware`` lets reads of GET/HEAD/OPTIONS requests go to
+one of DATABASE_REPLICAS; everything else (writes, other requests, Celery
+tasks, management commands) stays on the primary. Reads stay on the primary:
+
+- for select_for_update() and after a write in the same request,
+- for DB_REPLICA_STICKY_SECONDS after a client's unsafe request, tracked
+  with the STICKY_COOKIE cookie, so users see their own writes despite
+  replication lag,
+- in views that opt out with ``use_replica = False`` or ``@primary_db``.
+"""
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_COOKIE = "db_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_replica_allowed = contextvars.ContextVar("replica_allowed", default=False)
+
+
+@contextmanager
+def use_replicas(allowed=True):
+    """Allow (or forbid) reads from replicas in this block"""
+    token = _replica_allowed.set(allowed)
+    try:
+        yield
+    finally:
+        _replica_allowed.reset(token)
+
+
+def primary_db(view):
+    """Keep every read of a function view on the primary"""
+    view.use_replica = False
+    return view
+
+
+def view_uses_replica(view_func):
+    view = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    return getattr(view or view_func, "use_replica", True)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not _replica_allowed.get():
+            return None
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # What was just written is not on the replicas yet
+        _replica_allowed.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with use_replicas(False):
+            response = self.get_response(request)
+
+        if request.method not in SAFE_METHODS and settings.DATABASE_REPLICAS:
+            sticky = settings.DB_REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time()) + sticky),
+                max_age=sticky,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and settings.DATABASE_REPLICAS
+            and not self.is_sticky(request)
+            and view_uses_replica(view_func)
+        ):
+            _replica_allowed.set(True)
+
+    def is_sticky(self, request):
+        try:
+            return int(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
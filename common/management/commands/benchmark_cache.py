@@ -0,0 +1,141 @@
+"""
+Management command comparing cache serializers and compressors
+
+Encodes the payloads the project actually caches (reference data lists,
+statistics, cached users and permission sets, content rows) with every
+serializer/compressor combination and reports the encoded size, the memory
+Redis reports for the key, and encode, decode and GET latency.
+"""
+import pickle
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django_redis import get_redis_connection
+from django_redis.compressors.identity import IdentityCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.json import JSONSerializer
+from django_redis.serializers.pickle import PickleSerializer
+
+from common import cache_serializers
+from content.models import News
+from festival.services import site_statistics
+from province.models import Province
+from province.services import city_list, province_list
+
+BENCHMARK_KEY = "benchmark:cache"
+
+
+def cached_entry(value):
+    """A payload wrapped the way common.cache.cached stores it"""
+    return (value, time.time() + 300, 0.01)
+
+
+class Command(BaseCommand):
+    help = "مقایسه حجم و سرعت روش‌های سریال‌سازی و فشرده‌سازی کش"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=200,
+            help="تعداد تکرار هر اندازه‌گیری (پیش‌فرض: 200)",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=50,
+            help="تعداد ردیف‌های محتوا در بار آزمایشی (پیش‌فرض: 50)",
+        )
+
+    def payloads(self, rows):
+        user = get_user_model().objects.order_by("pk").first()
+        province = (
+            Province.objects.annotate(cities=Count("city"))
+            .order_by("-cities")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        permissions = {
+            f"{app_label}.{codename}"
+            for app_label, codename in Permission.objects.values_list(
+                "content_type__app_label", "codename"
+            )[:100]
+        }
+        return {
+            "province_list": cached_entry(province_list.uncached()),
+            "city_list": cached_entry(city_list.uncached(province or 0)),
+            "site_statistics": cached_entry(site_statistics.uncached()),
+            "account_user": pickle.dumps(user) if user is not None else b"",
+            "account_permissions": permissions,
+            "news_instances": cached_entry(list(News.objects.all()[:rows])),
+            "news_rows": cached_entry(list(News.objects.values()[:rows])),
+        }
+
+    def codecs(self, options):
+        compressors = {
+            "none": IdentityCompressor(options),
+            "zlib": cache_serializers.ZlibCompressor(options),
+        }
+        if cache_serializers.Lz4Compressor is not None:
+            compressors["lz4"] = cache_serializers.Lz4Compressor(options)
+        serializers = {
+            "pickle": PickleSerializer(options),
+            "json": JSONSerializer(options),
+            "msgpack": cache_serializers.MsgpackSerializer(options),
+        }
+        for serializer_name, serializer in serializers.items():
+            for compressor_name, compressor in compressors.items():
+                yield f"{serializer_name}+{compressor_name}", serializer, compressor
+
+    def timed(self, func, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            samples.append(time.perf_counter() - started)
+        return result, statistics.median(samples) * 1e6
+
+    def handle(self, *args, **options):
+        redis = get_redis_connection("default")
+        repeat = max(1, options["repeat"])
+        cache_options = settings.CACHES["default"]["OPTIONS"]
+
+        for name, payload in self.payloads(options["rows"]).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(
+                f"{'روش':<16}{'بایت':>10}{'حافظه ردیس':>12}"
+                f"{'رمزگذاری µs':>14}{'رمزگشایی µs':>14}{'GET µs':>10}"
+            )
+            for label, serializer, compressor in self.codecs(cache_options):
+                try:
+                    encoded, encode_us = self.timed(
+                        lambda: compressor.compress(serializer.dumps(payload)), repeat
+                    )
+                except TypeError:
+                    self.stdout.write(f"{label:<16}{'پشتیبانی نمی‌شود':>10}")
+                    continue
+
+                def decode():
+                    try:
+                        data = compressor.decompress(encoded)
+                    except CompressorError:
+                        data = encoded
+                    return serializer.loads(data)
+
+                _, decode_us = self.timed(decode, repeat)
+                redis.set(BENCHMARK_KEY, encoded)
+                try:
+                    memory = redis.memory_usage(BENCHMARK_KEY)
+                    _, get_us = self.timed(lambda: redis.get(BENCHMARK_KEY), repeat)
+                finally:
+                    redis.delete(BENCHMARK_KEY)
+
+                self.stdout.write(
+                    f"{label:<16}{len(encoded):>10}{memory:>12}"
+                    f"{encode_us:>14.1f}{decode_us:>14.1f}{get_us:>10.1f}"
+                )
@@ -0,0 +1,136 @@
+"""
+Management command comparing the orjson renderer and parser with DRF's
+
+Builds representative festival payloads in memory (a page of registrations
+rendered by FestivalRegistrationListSerializer with nested categories, and
+a content list) and times rendering and parsing them with DRF's
+JSONRenderer/JSONParser and with config.renderers/config.parsers.
+"""
+import io
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config.parsers import ORJSONParser
+from config.renderers import ORJSONRenderer
+from festival.models import (
+    FestivalFormat,
+    FestivalRegistration,
+    FestivalSpecialSection,
+    FestivalTopic,
+)
+from festival.serializers import FestivalRegistrationListSerializer
+from province.models import City, Province
+
+DESCRIPTION = "جشنواره رسانه‌ای ابوذر برای معرفی و تقدیر از فعالان رسانه‌ای " * 3
+
+
+def registration_page(rows):
+    """A page of the registration list as the API serializes it"""
+    province = Province(pk=1, name="خوزستان")
+    city = City(pk=1, name="اهواز", province=province)
+    festival_format = FestivalFormat(
+        pk=1, code="report", name="گزارش", description=DESCRIPTION
+    )
+    topic = FestivalTopic(
+        pk=1, code="resistance", name="مقاومت", description=DESCRIPTION
+    )
+    section = FestivalSpecialSection(
+        pk=1, code="youth", name="بخش ویژه جوانان", description=DESCRIPTION
+    )
+    now = timezone.now()
+    registrations = [
+        FestivalRegistration(
+            pk=index,
+            full_name=f"شرکت‌کننده شماره {index}",
+            media_name="خبرگزاری ابوذر",
+            festival_format=festival_format,
+            festival_topic=topic,
+            special_section=section,
+            province=province,
+            city=city,
+            user=get_user_model()(phone=f"0912{index:07d}"),
+            created_at=now - timedelta(minutes=index),
+        )
+        for index in range(1, rows + 1)
+    ]
+    return {
+        "count": rows,
+        "next": None,
+        "previous": None,
+        "results": FestivalRegistrationListSerializer(registrations, many=True).data,
+    }
+
+
+def content_list(rows):
+    """A content list in the shape of NewsListSerializer"""
+    today = date.today()
+    return [
+        {
+            "id": index,
+            "title": f"برگزاری آیین اختتامیه یازدهمین جشنواره رسانه‌ای ابوذر {index}",
+            "publish_date": (today - timedelta(days=index)).isoformat(),
+            "tags": ["جشنواره", "ابوذر", "رسانه"],
+            "image": f"https://abozar.example/media/news/{index}.jpg",
+            "view_count": index * 17,
+        }
+        for index in range(1, rows + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = "مقایسه سرعت رندر و تجزیه JSON با orjson و JSONRenderer"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=500,
+            help="تعداد ردیف‌های هر بار آزمایشی (پیش‌فرض: 500)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="تعداد تکرار هر اندازه‌گیری (پیش‌فرض: 50)",
+        )
+
+    def timed(self, func, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples) * 1000
+
+    def handle(self, *args, **options):
+        rows, repeat = max(1, options["rows"]), max(1, options["repeat"])
+        payloads = {
+            "registrations": registration_page(rows),
+            "content": content_list(rows),
+        }
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            if ORJSONParser().parse(io.BytesIO(body)) != JSONParser().parse(
+                io.BytesIO(body)
+            ):
+                self.stderr.write(f"{name}: خروجی دو تجزیه‌گر یکسان نیست")
+
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"{name}: {rows} ردیف، {len(body)} بایت")
+            )
+            for label, renderer, parser in (
+                ("JSONRenderer", JSONRenderer(), JSONParser()),
+                ("ORJSONRenderer", ORJSONRenderer(), ORJSONParser()),
+            ):
+                render_ms = self.timed(lambda: renderer.render(data), repeat)
+                parse_ms = self.timed(lambda: parser.parse(io.BytesIO(body)), repeat)
+                self.stdout.write(
+                    f"{label:<16} رندر: {render_ms:.2f}ms  تجزیه: {parse_ms:.2f}ms"
+                )
@@ -0,0 +1,117 @@
+"""
+OpenAPI schema generated once and served from disk
+
+The schema is written at deploy time with
+``python manage.py spectacular --file swagger-schema.yml`` (see
+docker-compose.yml) and common.tests fails when the committed file no
+longer matches the code. ``SchemaView`` serves API_SCHEMA_FILE as YAML or
+JSON with an ETag; when the file is missing the schema is generated once
+per process and kept in memory.
+
+``SchemaSwaggerView`` points Swagger UI at ``?v=<schema hash>``, which is
+cached as immutable, while the plain URL is cached for API_SCHEMA_MAX_AGE
+seconds and revalidated with If-None-Match.
+"""
+import hashlib
+import json
+import logging
+import threading
+
+import yaml
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views import View
+from drf_spectacular.plumbing import set_query_parameters
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.views import SpectacularSwaggerView
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+CONTENT_TYPES = {
+    "yaml": f"{OpenApiYamlRenderer.media_type}; charset=utf-8",
+    "json": f"{OpenApiJsonRenderer.media_type}; charset=utf-8",
+}
+
+_lock = threading.Lock()
+_documents = {}
+
+
+def generate_schema():
+    """Render the schema as YAML exactly like the ``spectacular`` command"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+        urlconf=None, api_version=None, patterns=None
+    )
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiYamlRenderer().render(schema, renderer_context={})
+
+
+def _load_yaml():
+    path = settings.API_SCHEMA_FILE
+    if path:
+        try:
+            with open(path, "rb") as schema_file:
+                return schema_file.read()
+        except OSError:
+            logger.warning("API schema file %s is missing; generating it", path)
+    return generate_schema()
+
+
+def get_document(fmt="yaml"):
+    """(body, version) of the schema in ``fmt``, loaded once per process"""
+    document = _documents.get(fmt)
+    if document is not None:
+        return document
+    with _lock:
+        if "yaml" not in _documents:
+            body = _load_yaml()
+            _documents["yaml"] = (body, hashlib.sha256(body).hexdigest()[:32])
+        if fmt == "json" and "json" not in _documents:
+            body = OpenApiJsonRenderer().render(
+                yaml.safe_load(_documents["yaml"][0]), renderer_context={}
+            )
+            _documents["json"] = (body, hashlib.sha256(body).hexdigest()[:32])
+        return _documents[fmt]
+
+
+def reset():
+    """Forget the loaded documents; the next request reads them again"""
+    with _lock:
+        _documents.clear()
+
+
+class SchemaView(View):
+    """Serve the precomputed schema with an ETag and cache headers"""
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.GET.get("format")
+        if fmt not in CONTENT_TYPES:
+            accept = request.headers.get("Accept", "")
+            fmt = "json" if "json" in accept else "yaml"
+        body, version = get_document(fmt)
+
+        etag = f'"{version}"'
+        if request.GET.get("v") == get_document()[1]:
+            cache_control = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        else:
+            cache_control = f"public, max-age={settings.API_SCHEMA_MAX_AGE}"
+
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=CONTENT_TYPES[fmt])
+        response["ETag"] = etag
+        response["Cache-Control"] = cache_control
+        response["Vary"] = "Accept"
+        return response
+
+
+class SchemaSwaggerView(SpectacularSwaggerView):
+    """Swagger UI loading the schema from its versioned, immutable URL"""
+
+    def _get_schema_url(self, request):
+        return set_query_parameters(
+            url=super()._get_schema_url(request), v=get_document()[1]
+        )
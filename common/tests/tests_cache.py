@@ -0,0 +1,146 @@
+"""
+Tests Caching Toolkit
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from common import cache as toolkit
+from common.cache import cached, invalidate
+from province.models import Province
+
+PROVINCE_LIST_URL = reverse("festival:province-list")
+
+calls = []
+
+
+@cached(key="{number}", ttl=60, tags=["test-tag"], namespace="test-square")
+def square(number):
+    calls.append(number)
+    return number * number
+
+
+@cached(ttl=60, namespace="test-provinces")
+def provinces():
+    calls.append("provinces")
+    return Province.objects.order_by("name")
+
+
+@override_settings(CACHED_ENABLED=True)
+class CachedTest(TestCase):
+    def setUp(self):
+        calls.clear()
+        invalidate("test-square", "test-tag", "test-provinces", "province")
+
+    def test_results_are_cached_per_argument(self):
+        """
+        Test that a result is computed once per distinct argument.
+        """
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(4), 16)
+
+        self.assertEqual(calls, [3, 4])
+
+    def test_querysets_are_cached_as_lists(self):
+        """
+        Test that a returned queryset is evaluated and cached as a list.
+        """
+        Province.objects.create(name="تهران", slug="tehran")
+
+        first = provinces()
+        with self.assertNumQueries(0):
+            second = provinces()
+
+        self.assertIsInstance(first, list)
+        self.assertEqual([province.name for province in second], ["تهران"])
+
+    def test_namespace_and_tag_invalidation(self):
+        """
+        Test that bumping the namespace or a tag drops all of its entries.
+        """
+        square(3)
+        square.invalidate()
+        square(3)
+        invalidate("test-tag")
+        square(3)
+
+        self.assertEqual(calls, [3, 3, 3])
+
+    def test_early_recomputation_is_single_flight(self):
+        """
+        Test that a value due for early recomputation is refreshed by the
+        lock holder only, the others keep serving it.
+        """
+        square(3)
+        with mock.patch.object(toolkit, "should_recompute", return_value=True):
+            square(3)
+            self.assertEqual(calls, [3, 3])
+
+            key = toolkit.build_key(
+                "test-square", ("test-tag",), "{number}", square.uncached, (3,), {}
+            )
+            lock = cache.lock(f"{key}:lock", timeout=5)
+            lock.acquire()
+            self.addCleanup(lock.release)
+            self.assertEqual(square(3), 9)
+
+        self.assertEqual(calls, [3, 3])
+
+    def test_cold_miss_waits_for_the_lock_holder(self):
+        """
+        Test that without a value a caller waits for the lock, then computes.
+        """
+        key = toolkit.build_key(
+            "test-square", ("test-tag",), "{number}", square.uncached, (5,), {}
+        )
+        lock = cache.lock(f"{key}:lock", timeout=5)
+        lock.acquire()
+        self.addCleanup(lock.release)
+
+        with mock.patch.object(toolkit, "LOCK_TIMEOUT", 0.1):
+            self.assertEqual(square(5), 25)
+
+        self.assertEqual(calls, [5])
+
+    @override_settings(CACHE_TTL_JITTER=0.2)
+    def test_ttl_jitter(self):
+        """
+        Test that TTLs are shortened by at most the configured jitter.
+        """
+        ttls = {toolkit.jittered(100) for _ in range(200)}
+
+        self.assertTrue(all(80 <= ttl <= 100 for ttl in ttls))
+        self.assertGreater(len(ttls), 1)
+
+    def test_hits_and_misses_are_counted_per_namespace(self):
+        """
+        Test that lookups are counted under the function's namespace.
+        """
+        labels = {"namespace": "test-square", "result": "hit"}
+        before = REGISTRY.get_sample_value("cache_namespace_requests_total", labels)
+
+        square(6)
+        square(6)
+
+        after = REGISTRY.get_sample_value("cache_namespace_requests_total", labels)
+        self.assertEqual(after, (before or 0) + 1)
+
+    def test_province_list_is_invalidated_on_change(self):
+        """
+        Test that the cached province list follows changes to provinces.
+        """
+        Province.objects.create(name="تهران", slug="tehran")
+        self.client.get(PROVINCE_LIST_URL)
+
+        with self.assertNumQueries(1):
+            # Only the tracing span is written
+            res = self.client.get(PROVINCE_LIST_URL)
+        self.assertEqual([p["name"] for p in res.data], ["تهران"])
+
+        Province.objects.create(name="اصفهان", slug="isfahan")
+        res = self.client.get(PROVINCE_LIST_URL)
+        self.assertEqual([p["name"] for p in res.data], ["اصفهان", "تهران"])
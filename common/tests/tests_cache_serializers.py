@@ -0,0 +1,84 @@
+"""
+Tests Cache Serialization And Compression
+"""
+import datetime
+import pickle
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from common.cache_serializers import MsgpackSerializer, ZlibCompressor
+from province.models import Province
+
+
+class MsgpackSerializerTest(TestCase):
+    def setUp(self):
+        self.serializer = MsgpackSerializer({})
+
+    def roundtrip(self, value):
+        return self.serializer.loads(self.serializer.dumps(value))
+
+    def test_plain_payloads_round_trip(self):
+        """
+        Test that dicts, lists, text and bytes come back unchanged.
+        """
+        payload = {"name": "تهران", "ids": [1, 2], "raw": b"\x00\x01", 3: None}
+
+        self.assertEqual(self.roundtrip(payload), payload)
+        self.assertLess(len(self.serializer.dumps(payload)), len(pickle.dumps(payload)))
+
+    def test_other_types_are_pickled_inside(self):
+        """
+        Test that sets, dates and model instances survive the round trip.
+        """
+        province = Province.objects.create(name="تهران", slug="tehran")
+        payload = [{"perm.a"}, datetime.date(2024, 1, 1), province]
+
+        value = self.roundtrip(payload)
+
+        self.assertEqual(value[:2], payload[:2])
+        self.assertEqual(value[2].pk, province.pk)
+
+    def test_pickled_entries_are_still_read(self):
+        """
+        Test that values written by the pickle serializer can be read.
+        """
+        payload = {"registered_users_count": 3}
+
+        self.assertEqual(self.serializer.loads(pickle.dumps(payload)), payload)
+
+    def test_cache_round_trip(self):
+        """
+        Test that the configured cache stores and returns payloads.
+        """
+        payload = ([{"id": 1, "name": "تهران" * 200}], 1.5, 0.01)
+        cache.set("serializer-test", payload)
+        self.addCleanup(cache.delete, "serializer-test")
+
+        self.assertEqual(cache.get("serializer-test"), list(payload))
+
+
+class ZlibCompressorTest(TestCase):
+    def test_only_large_values_are_compressed(self):
+        """
+        Test that values under the threshold are stored as they are.
+        """
+        compressor = ZlibCompressor({"COMPRESS_MIN_LENGTH": 100})
+
+        self.assertEqual(compressor.compress(b"x" * 50), b"x" * 50)
+        compressed = compressor.compress(b"x" * 1000)
+        self.assertLess(len(compressed), 100)
+        self.assertEqual(compressor.decompress(compressed), b"x" * 1000)
+
+    def test_benchmark_command(self):
+        """
+        Test that the benchmark reports every combination for each payload.
+        """
+        out = StringIO()
+
+        call_command("benchmark_cache", repeat=1, stdout=out)
+
+        self.assertIn("province_list", out.getvalue())
+        self.assertIn("msgpack+zlib", out.getvalue())
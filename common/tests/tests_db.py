@@ -0,0 +1,81 @@
+"""
+Tests PostgreSQL Backend With Connection Pool
+"""
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from prometheus_client import REGISTRY
+
+from common.db.postgresql import base
+
+
+def wrapper(**options):
+    return base.DatabaseWrapper(
+        {
+            "ENGINE": "common.db.postgresql",
+            "NAME": "event_abozar",
+            "USER": "postgres",
+            "PASSWORD": "",
+            "HOST": "localhost",
+            "PORT": "",
+            "OPTIONS": options,
+            "CONN_MAX_AGE": 0,
+            "CONN_HEALTH_CHECKS": True,
+            "AUTOCOMMIT": True,
+            "ATOMIC_REQUESTS": False,
+            "TIME_ZONE": None,
+            "TEST": {},
+        },
+        alias="pooled",
+    )
+
+
+class PooledBackendTest(SimpleTestCase):
+    def test_pool_option_is_not_a_connection_parameter(self):
+        """
+        Test that the pool settings are not passed to psycopg.connect.
+        """
+        db = wrapper(pool={"max_size": 4})
+
+        params = db.get_connection_params()
+
+        self.assertTrue(db.uses_pool)
+        self.assertNotIn("pool", params)
+        self.assertEqual(params["dbname"], "event_abozar")
+        self.assertIsNone(params["prepare_threshold"])
+
+    def test_pool_requires_non_persistent_connections(self):
+        """
+        Test that a pool combined with CONN_MAX_AGE is rejected.
+        """
+        db = wrapper(pool=True)
+        db.settings_dict["CONN_MAX_AGE"] = 60
+
+        with self.assertRaises(ImproperlyConfigured):
+            db.get_connection_params()
+
+    def test_connections_are_borrowed_and_returned(self):
+        """
+        Test that a pooled connection is taken from and given back to the pool.
+        """
+        db = wrapper(pool=True)
+        pool = mock.Mock()
+        labels = {"alias": "pooled", "source": "pool"}
+        before = REGISTRY.get_sample_value(
+            "django_db_connection_wait_seconds_count", labels
+        )
+
+        with mock.patch.object(base, "get_pool", return_value=pool):
+            connection = db.get_new_connection({})
+        db.connection = connection
+        with mock.patch.dict(base._pools, {("pooled", base.os.getpid()): pool}):
+            db._close()
+
+        pool.getconn.assert_called_once_with()
+        pool.putconn.assert_called_once_with(connection)
+        connection.close.assert_not_called()
+        after = REGISTRY.get_sample_value(
+            "django_db_connection_wait_seconds_count", labels
+        )
+        self.assertEqual(after, (before or 0) + 1)
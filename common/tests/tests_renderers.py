@@ -0,0 +1,103 @@
+"""
+Tests orjson Renderer And Parser
+"""
+import datetime
+import decimal
+import io
+import uuid
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from common.management.commands.benchmark_renderer import registration_page
+from config.parsers import ORJSONParser
+from config.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def assertRendersLikeDRF(self, build, accepted_media_type=None):
+        # Built twice: generators are consumed by rendering
+        self.assertEqual(
+            ORJSONRenderer().render(build(), accepted_media_type),
+            JSONRenderer().render(build(), accepted_media_type),
+        )
+
+    def test_festival_payload_is_unchanged(self):
+        """
+        Test that a registration page renders to the same bytes as before.
+        """
+        page = registration_page(3)
+
+        self.assertRendersLikeDRF(lambda: page)
+
+    def test_special_types_are_unchanged(self):
+        """
+        Test that decimals, lazy strings, dates and other types render as before.
+        """
+        self.assertRendersLikeDRF(
+            lambda: {
+                "amount": decimal.Decimal("12.50"),
+                "label": _("استان"),
+                "utc": datetime.datetime(
+                    2024, 1, 1, 8, 30, tzinfo=datetime.timezone.utc
+                ),
+                "tehran": datetime.datetime(
+                    2024, 1, 1, 12, 0, 0, 1500, tzinfo=ZoneInfo("Asia/Tehran")
+                ),
+                "day": datetime.date(2024, 1, 1),
+                "time": datetime.time(9, 15),
+                "duration": datetime.timedelta(minutes=90),
+                "id": uuid.UUID(int=1),
+                1: (value for value in "ab"),
+            }
+        )
+
+    def test_line_separators_are_escaped(self):
+        """
+        Test that U+2028 and U+2029 are escaped like JSONRenderer does.
+        """
+        self.assertRendersLikeDRF(lambda: {"text": "یک\u2028دو\u2029"})
+
+    def test_indent_is_honoured(self):
+        """
+        Test that an indent requested by the client is applied.
+        """
+        self.assertRendersLikeDRF(lambda: {"a": [1]}, "application/json; indent=4")
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def parse(self, body):
+        return ORJSONParser().parse(io.BytesIO(body))
+
+    def test_parses_like_drf(self):
+        """
+        Test that a body parses to the same data as with JSONParser.
+        """
+        body = '{"full_name": "علی", "ids": [1, 2.5, null]}'.encode()
+
+        self.assertEqual(self.parse(body), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid_json_is_a_parse_error(self):
+        """
+        Test that malformed bodies and NaN are rejected.
+        """
+        for body in (b"{", b'{"value": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(body)
+
+    def test_benchmark_command(self):
+        """
+        Test that the benchmark times both renderers.
+        """
+        out = StringIO()
+
+        call_command("benchmark_renderer", rows=5, repeat=1, stdout=out)
+
+        self.assertIn("ORJSONRenderer", out.getvalue())
+        self.assertIn("registrations", out.getvalue())
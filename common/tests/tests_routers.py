@@ -0,0 +1,76 @@
+"""
+Tests Read Replica Routing
+"""
+import time
+
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from common.db.routers import STICKY_COOKIE, use_replicas
+from province.models import Province
+
+PROVINCE_LIST_URL = reverse("festival:province-list")
+SEARCH_URL = reverse("festival:registration-search")
+CONTACT_US_URL = reverse("info:contact-us-create")
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRoutingTest(TestCase):
+    databases = {"default", "replica1"}
+
+    def setUp(self):
+        # Only on the replica, so it shows which database answered
+        Province.objects.using("replica1").create(name="فقط در رپلیکا")
+
+    def province_names(self):
+        res = self.client.get(PROVINCE_LIST_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [province["name"] for province in res.data]
+
+    def test_safe_requests_read_from_replica(self):
+        """
+        Test that a GET request reads from the replica.
+        """
+        self.assertEqual(self.province_names(), ["فقط در رپلیکا"])
+
+    def test_reads_stay_on_primary_outside_requests(self):
+        """
+        Test that code outside a request, e.g. a task, reads the primary.
+        """
+        self.assertFalse(Province.objects.exists())
+
+    def test_write_makes_the_client_sticky(self):
+        """
+        Test that after an unsafe request the client reads from the primary.
+        """
+        res = self.client.post(CONTACT_US_URL, {})
+
+        self.assertIn(STICKY_COOKIE, res.cookies)
+        self.assertEqual(self.province_names(), [])
+
+        self.client.cookies[STICKY_COOKIE] = str(int(time.time()) - 1)
+        self.assertEqual(self.province_names(), ["فقط در رپلیکا"])
+
+    def test_reads_after_a_write_use_the_primary(self):
+        """
+        Test that a write sends later reads of the same request to the primary.
+        """
+        with use_replicas():
+            self.assertEqual(Province.objects.count(), 1)
+            Province.objects.create(name="تهران")
+            self.assertEqual(
+                list(Province.objects.values_list("name", flat=True)), ["تهران"]
+            )
+
+    def test_view_can_opt_out(self):
+        """
+        Test that a view with use_replica = False reads from the primary.
+        """
+        with CaptureQueriesContext(connections["replica1"]) as queries:
+            res = self.client.get(SEARCH_URL, {"phone": "09151498722"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 0)
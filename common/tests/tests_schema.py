@@ -0,0 +1,105 @@
+"""
+Tests Precomputed OpenAPI Schema
+"""
+import json
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from common import schema
+
+SCHEMA_URL = reverse("api-schema")
+SWAGGER_URL = reverse("swagger-ui")
+
+
+class SchemaDriftTest(SimpleTestCase):
+    def test_committed_schema_is_current(self):
+        """
+        Test that swagger-schema.yml matches the code; regenerate it with
+        python manage.py spectacular --file swagger-schema.yml
+        """
+        with open(settings.API_SCHEMA_FILE, "rb") as schema_file:
+            committed = schema_file.read()
+
+        self.assertTrue(
+            committed == schema.generate_schema(),
+            "swagger-schema.yml is out of date; run "
+            "`python manage.py spectacular --file swagger-schema.yml`",
+        )
+
+    def test_generation_runs_no_view_queries(self):
+        """
+        Test that generating the schema never evaluates a view's cached data.
+        """
+        with mock.patch(
+            "festival.views.festival_registration.province_list"
+        ) as province_list:
+            schema.generate_schema()
+
+        province_list.assert_not_called()
+
+
+class SchemaViewTest(TestCase):
+    def setUp(self):
+        schema.reset()
+        self.addCleanup(schema.reset)
+
+    def test_schema_is_served_from_the_file(self):
+        """
+        Test that the schema is read from disk, not regenerated.
+        """
+        with mock.patch.object(schema, "generate_schema") as generate:
+            res = self.client.get(SCHEMA_URL)
+
+        generate.assert_not_called()
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("application/vnd.oai.openapi"))
+        self.assertIn(b"openapi: 3.0.3", res.content)
+        self.assertIn("max-age=3600", res["Cache-Control"])
+
+    def test_etag_revalidation(self):
+        """
+        Test that a matching If-None-Match gets 304 without a body.
+        """
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_json_format(self):
+        """
+        Test that JSON is served when asked for.
+        """
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT="application/json")
+
+        self.assertEqual(json.loads(res.content)["openapi"], "3.0.3")
+
+    def test_swagger_ui_uses_the_immutable_url(self):
+        """
+        Test that Swagger UI loads the versioned schema URL.
+        """
+        _, version = schema.get_document()
+
+        res = self.client.get(SWAGGER_URL)
+        self.assertEqual(res.data["schema_url"], f"{SCHEMA_URL}?v={version}")
+
+        res = self.client.get(SCHEMA_URL, {"v": version})
+        self.assertIn("immutable", res["Cache-Control"])
+
+    @override_settings(API_SCHEMA_FILE="")
+    def test_missing_file_generates_once(self):
+        """
+        Test that without a file the schema is generated once per process.
+        """
+        with mock.patch.object(
+            schema, "generate_schema", return_value=b"openapi: 3.0.3\n"
+        ) as generate:
+            self.client.get(SCHEMA_URL)
+            res = self.client.get(SCHEMA_URL)
+
+        generate.assert_called_once()
+        self.assertEqual(res.content, b"openapi: 3.0.3\n")
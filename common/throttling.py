@@ -0,0 +1,174 @@
+"""
+Redis throttling for public endpoints
+
+Each scope in THROTTLE_POLICIES is a list of limits. A limit is keyed by
+the client "ip", the submitted "phone" or "national_id", and is either a
+sliding window log ("sliding": at most N requests in any period) or a
+token bucket ("token_bucket": refilled at N per period, up to ``burst``).
+
+All limits of a scope are checked and recorded by a single Lua script, so
+a request costs one Redis round trip whether it is let through or
+rejected, and nothing is recorded unless every limit allows it. Views opt
+in with ``throttle_classes = [ScopedRedisThrottle]`` and a
+``throttle_scope``; DRF answers rejections with 429 and Retry-After. When
+Redis is unavailable requests are let through.
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from rest_framework.throttling import BaseThrottle
+
+from monitoring.metrics import THROTTLE_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS: one per limit. ARGV: now (ms), a unique member, then for every
+# limit its algorithm, request count, period (ms) and burst.
+# Returns 0 when allowed, otherwise the milliseconds to wait.
+CONSUME = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local buckets = {}
+for i, key in ipairs(KEYS) do
+    local base = 2 + (i - 1) * 4
+    local limit = tonumber(ARGV[base + 2])
+    local period = tonumber(ARGV[base + 3])
+    if ARGV[base + 1] == 'sliding' then
+        redis.call('ZREMRANGEBYSCORE', key, '-inf', now - period)
+        if redis.call('ZCARD', key) >= limit then
+            local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+            wait = math.max(wait, tonumber(oldest[2]) + period - now)
+        end
+    else
+        local burst = tonumber(ARGV[base + 4])
+        local state = redis.call('HMGET', key, 'tokens', 'ts')
+        local tokens = tonumber(state[1]) or burst
+        local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+        tokens = math.min(burst, tokens + elapsed * limit / period)
+        buckets[i] = tokens
+        if tokens < 1 then
+            wait = math.max(wait, (1 - tokens) * period / limit)
+        end
+    end
+end
+if wait > 0 then
+    return math.max(1, math.ceil(wait))
+end
+for i, key in ipairs(KEYS) do
+    local base = 2 + (i - 1) * 4
+    local limit = tonumber(ARGV[base + 2])
+    local period = tonumber(ARGV[base + 3])
+    if ARGV[base + 1] == 'sliding' then
+        redis.call('ZADD', key, now, ARGV[2])
+        redis.call('PEXPIRE', key, period)
+    else
+        local burst = tonumber(ARGV[base + 4])
+        redis.call('HSET', key, 'tokens', buckets[i] - 1, 'ts', now)
+        redis.call('PEXPIRE', key, math.ceil(burst * period / limit))
+    end
+end
+return 0
+"""
+
+_consume_script = None
+
+
+def parse_rate(rate):
+    """Parse "5/m" or "5/10m" into (requests, period in seconds)"""
+    count, period = rate.split("/")
+    multiplier, unit = period[:-1] or "1", period[-1]
+    return int(count), int(multiplier) * PERIODS[unit]
+
+
+def client_ip(request):
+    """Client address, as forwarded by the reverse proxy when present"""
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR")
+
+
+def _submitted(name):
+    def identify(request):
+        value = None
+        if hasattr(request.data, "get"):
+            value = request.data.get(name)
+        value = value or request.query_params.get(name)
+        return str(value).strip() if value else None
+
+    return identify
+
+
+IDENTIFIERS = {
+    "ip": client_ip,
+    "phone": _submitted("phone"),
+    "national_id": _submitted("national_id"),
+}
+
+
+def throttle_key(scope, kind, value):
+    return f"throttle:{scope}:{kind}:{value}"
+
+
+def consume(scope, identifiers):
+    """
+    Count one request of ``scope`` against the limits whose identifier is
+    in ``identifiers``. Returns 0 when allowed, otherwise the seconds to wait.
+    """
+    global _consume_script
+    if not settings.THROTTLE_ENABLED:
+        return 0
+
+    keys, args = [], []
+    for policy in settings.THROTTLE_POLICIES.get(scope, []):
+        value = identifiers.get(policy["key"])
+        if not value:
+            continue
+        count, period = parse_rate(policy["rate"])
+        keys.append(throttle_key(scope, policy["key"], value))
+        args += [
+            policy.get("algorithm", "sliding"),
+            count,
+            period * 1000,
+            policy.get("burst", count),
+        ]
+    if not keys:
+        return 0
+
+    try:
+        if _consume_script is None:
+            _consume_script = get_redis_connection("default").register_script(CONSUME)
+        wait = _consume_script(
+            keys=keys, args=[int(time.time() * 1000), uuid.uuid4().hex, *args]
+        )
+    except Exception:
+        logger.warning("Throttling skipped for %s", scope, exc_info=True)
+        return 0
+
+    if wait:
+        THROTTLE_REJECTIONS.labels(scope=scope).inc()
+    return wait / 1000
+
+
+class ScopedRedisThrottle(BaseThrottle):
+    """Apply the THROTTLE_POLICIES entry named by the view's ``throttle_scope``"""
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        policies = settings.THROTTLE_POLICIES.get(scope)
+        if not settings.THROTTLE_ENABLED or not policies:
+            return True
+
+        identifiers = {
+            policy["key"]: IDENTIFIERS[policy["key"]](request) for policy in policies
+        }
+        self.wait_seconds = consume(scope, identifiers)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
@@ -3,13 +3,37 @@ from __future__ import absolute_import, unicode_literals
 import os
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 from django.conf import settings
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+# Pool processes write their metric samples here, see start_metrics_server
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
 
 app = Celery("config")
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    # Workers expose no Django view, so they serve their own /metrics
+    port = settings.METRICS_WORKER_PORT
+    if port:
+        from monitoring.metrics import start_worker_metrics_server
+
+        start_worker_metrics_server(port)
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    # Drop live gauges of a pool process that is gone
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,26 @@
+"""
+JSON parser built on orjson
+
+Bodies that orjson rejects are parsed again by DRF's JSONParser, so error
+messages and the handling of non-UTF-8 charsets stay the same.
+"""
+import io
+
+import orjson
+from rest_framework.parsers import JSONParser
+
+from config.renderers import ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        body = stream.read()
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if encoding.lower().replace("-", "") == "utf8":
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
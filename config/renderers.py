@@ -0,0 +1,45 @@
+"""
+JSON renderer built on orjson
+
+Renders the same documents as DRF's JSONRenderer, several times faster on
+large Persian payloads: UTF-8 text is written as is (UNICODE_JSON), UTC
+datetimes end in "Z", and anything orjson does not know natively (Decimal,
+lazy translations, timedelta, generators, ...) goes through DRF's own
+encoder. Indented output and documents orjson cannot encode, such as
+integers beyond 64 bits, are rendered by JSONRenderer itself.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+_encoder = JSONEncoder()
+
+
+def default(value):
+    """DRF's handling of types orjson cannot serialize"""
+    return _encoder.default(value)
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
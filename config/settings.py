@@ -11,8 +11,10 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
+from celery.schedules import crontab
 from decouple import Csv, config
 from dotenv import load_dotenv
 from dj_database_url import parse as db_url
@@ -85,6 +87,11 @@ CSRF_TRUSTED_ORIGINS = config("CSRF_TRUSTED_ORIGINS", cast=Csv())
 CORS_ALLOW_ALL_ORIGINS = True
 
 MIDDLEWARE = [
+    "monitoring.middleware.RequestIDMiddleware",
+    "monitoring.middleware.MetricsMiddleware",
+    "monitoring.middleware.RequestContextMiddleware",
+    "monitoring.middleware.StackSamplerMiddleware",
+    "monitoring.middleware.SQLProfilerMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -93,10 +100,23 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "common.db.routers.ReplicaRoutingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
 
+# Optional bearer token required to scrape /metrics
+METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN")
+
+# Without a token, outside DEBUG /metrics only answers these networks
+METRICS_ALLOWED_NETWORKS = config(
+    "METRICS_ALLOWED_NETWORKS", default="127.0.0.1/32,::1/128", cast=Csv()
+)
+
+# Port on which each Celery worker serves its own metrics (0 disables);
+# scrape celery_worker:<port> and celery_sms_worker:<port>
+METRICS_WORKER_PORT = config("METRICS_WORKER_PORT", default=0, cast=int)
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -127,8 +147,43 @@ DATABASES = {
     )
 }
 
+# Connection reuse. By default every worker keeps its connection for
+# DB_CONN_MAX_AGE seconds and pings it before reusing it in a new request.
+# DB_POOL=True checks connections out of a per-process psycopg pool
+# (common.db.postgresql) instead, returning them after every request; size
+# it so that workers * DB_POOL_MAX_SIZE stays under max_connections.
+# DB_PGBOUNCER=True is for a pgbouncer in transaction mode: connections are
+# not kept (pgbouncer pools them) and server-side cursors are disabled.
+# Prepared statements are already off by default, as pgbouncer requires.
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=60, cast=int)
+DB_CONN_HEALTH_CHECKS = config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool)
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+DB_POOL_MIN_SIZE = config("DB_POOL_MIN_SIZE", default=2, cast=int)
+DB_POOL_MAX_SIZE = config("DB_POOL_MAX_SIZE", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=10, cast=float)
+DB_PGBOUNCER = config("DB_PGBOUNCER", default=False, cast=bool)
+
+DATABASES["default"].update(
+    CONN_MAX_AGE=DB_CONN_MAX_AGE, CONN_HEALTH_CHECKS=DB_CONN_HEALTH_CHECKS
+)
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"]["ENGINE"] = "common.db.postgresql"
+    if DB_POOL:
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+            "check": DB_CONN_HEALTH_CHECKS,
+        }
+    if DB_PGBOUNCER:
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
 AUTH_USER_MODEL = "account.User"
 
+AUTHENTICATION_BACKENDS = ["account.backends.CachedModelBackend"]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -179,6 +234,77 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Log exports are kept outside MEDIA_ROOT so they are never publicly served
+MONITORING_EXPORT_ROOT = os.getenv(
+    "MONITORING_EXPORT_ROOT", default=os.path.join(BASE_DIR, "exports")
+)
+
+# Cold archive of old CodeLog rows (monitoring.archive), also kept private
+MONITORING_ARCHIVE_ROOT = os.getenv(
+    "MONITORING_ARCHIVE_ROOT", default=os.path.join(BASE_DIR, "archive")
+)
+LOG_ARCHIVE_AFTER_DAYS = config("LOG_ARCHIVE_AFTER_DAYS", default=90, cast=int)
+
+# Retention (monitoring.retention): CodeLog levels purged after N days (other
+# levels go to the archive), contact messages kept for a year, and how the
+# purge is paced
+CODELOG_RETENTION_DAYS = {"DEBUG": 7, "INFO": 30, "PERFORMANCE": 30}
+CONTACT_US_RETENTION_DAYS = config("CONTACT_US_RETENTION_DAYS", default=365, cast=int)
+
+# Observability rows purged after N days: trace spans, SQL statistics not
+# seen since, stack profiles, and resolved issues that did not recur
+TRACE_SPAN_RETENTION_DAYS = config("TRACE_SPAN_RETENTION_DAYS", default=7, cast=int)
+QUERY_STATISTIC_RETENTION_DAYS = config(
+    "QUERY_STATISTIC_RETENTION_DAYS", default=30, cast=int
+)
+REQUEST_PROFILE_RETENTION_DAYS = config(
+    "REQUEST_PROFILE_RETENTION_DAYS", default=30, cast=int
+)
+RESOLVED_ISSUE_RETENTION_DAYS = config(
+    "RESOLVED_ISSUE_RETENTION_DAYS", default=90, cast=int
+)
+RETENTION_BATCH_SIZE = config("RETENTION_BATCH_SIZE", default=1000, cast=int)
+RETENTION_BATCH_SLEEP = config("RETENTION_BATCH_SLEEP", default=0.2, cast=float)
+
+# CodeLog payloads (monitoring.payloads): strings and collections in a log
+# context are truncated to these limits, values of keys containing any of the
+# redaction markers are masked, and contexts or tracebacks above the
+# threshold (bytes) are stored zlib-compressed
+LOG_PAYLOAD_MAX_STRING = config("LOG_PAYLOAD_MAX_STRING", default=1024, cast=int)
+LOG_PAYLOAD_MAX_ITEMS = config("LOG_PAYLOAD_MAX_ITEMS", default=50, cast=int)
+LOG_PAYLOAD_MAX_DEPTH = config("LOG_PAYLOAD_MAX_DEPTH", default=5, cast=int)
+LOG_PAYLOAD_COMPRESS_THRESHOLD = config(
+    "LOG_PAYLOAD_COMPRESS_THRESHOLD", default=2048, cast=int
+)
+LOG_PAYLOAD_REDACT_KEYS = (
+    "password",
+    "passwd",
+    "secret",
+    "token",
+    "authorization",
+    "cookie",
+    "otp",
+    "api_key",
+    "apikey",
+    "csrf",
+    "session",
+)
+
+# Notification fan-out (monitoring.fanout): rows created per bulk insert,
+# notifications per delivery task, SMS delivery tasks allowed per worker and
+# second, the Kavenegar template used, and how long unread counters live
+NOTIFICATION_FANOUT_CHUNK_SIZE = config(
+    "NOTIFICATION_FANOUT_CHUNK_SIZE", default=1000, cast=int
+)
+NOTIFICATION_DELIVERY_BATCH_SIZE = config(
+    "NOTIFICATION_DELIVERY_BATCH_SIZE", default=50, cast=int
+)
+NOTIFICATION_SMS_RATE_LIMIT = config("NOTIFICATION_SMS_RATE_LIMIT", default="1/s")
+NOTIFICATION_SMS_TEMPLATE = config(
+    "NOTIFICATION_SMS_TEMPLATE", default="festival-notification"
+)
+NOTIFICATION_UNREAD_TTL = config("NOTIFICATION_UNREAD_TTL", default=3600, cast=int)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -187,11 +313,20 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "account.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
@@ -246,6 +381,16 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Precomputed OpenAPI schema (common.schema): generated at deploy time with
+#   python manage.py spectacular --file swagger-schema.yml
+# and served from API_SCHEMA_FILE with an ETag; the unversioned URL is
+# cached for API_SCHEMA_MAX_AGE seconds. Leave the file out to generate it
+# once per process instead
+API_SCHEMA_FILE = config(
+    "API_SCHEMA_FILE", default=str(BASE_DIR / "swagger-schema.yml")
+)
+API_SCHEMA_MAX_AGE = config("API_SCHEMA_MAX_AGE", default=3600, cast=int)
+
 CKEDITOR_UPLOAD_PATH = "uploads/"
 CKEDITOR_CONFIGS = {
     "default": {
@@ -292,6 +437,17 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
 
+CELERY_BEAT_SCHEDULE = {
+    "monitoring-archive-logs": {
+        "task": "monitoring.archive_logs",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "monitoring-retention": {
+        "task": "monitoring.run_retention",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
+
 BACK_URL = config("BACK_URL")
 
 IS_TEST = config("IS_TEST", cast=bool)
@@ -299,23 +455,260 @@ if IS_TEST:
     CELERY_TASK_ALWAYS_EAGER = True  # Executes tasks synchronously
     CELERY_TASK_EAGER_PROPAGATES = True  # Propagates exceptions
 
+# Read replicas (common.db.routers). DB_REPLICA_URLS lists database URLs of
+# replicas of MAIN_DATABASE; reads of safe requests go to them unless the
+# view sets use_replica = False, and a client that wrote something reads
+# from the primary for DB_REPLICA_STICKY_SECONDS to see its own writes.
+# Tests get a second SQLite database as "replica1", kept outside the
+# project tree, and enable routing with
+# override_settings(DATABASE_REPLICAS=["replica1"]).
+DB_REPLICA_URLS = config("DB_REPLICA_URLS", default="", cast=Csv())
+DB_REPLICA_STICKY_SECONDS = config("DB_REPLICA_STICKY_SECONDS", default=10, cast=int)
+DATABASE_REPLICAS = []
+for index, url in enumerate(DB_REPLICA_URLS, start=1):
+    replica = db_url(url)
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        **{key: replica[key] for key in ("NAME", "USER", "PASSWORD", "HOST", "PORT")},
+    }
+    DATABASE_REPLICAS.append(f"replica{index}")
+if IS_TEST and not DATABASE_REPLICAS:
+    DATABASES["replica1"] = {
+        **DATABASES["default"],
+        "NAME": os.path.join(tempfile.gettempdir(), "event_abozar_replica.sqlite3"),
+        # Data migrations read through the default alias; build from models
+        "TEST": {"MIGRATE": False},
+    }
+DATABASE_ROUTERS = ["common.db.routers.ReplicaRouter"]
+
+# SMS dispatch (monitoring.sms): messages are sent by the monitoring.send_sms
+# task on a dedicated queue; run one worker for it with
+#   celery -A config worker -Q sms --concurrency=1
+# so SMS_RATE_LIMIT is the provider throughput. SMS_PROVIDER "fake" uses an
+# offline provider with configurable latency and failure rate
+SMS_PROVIDER = "fake" if IS_TEST else config("SMS_PROVIDER", default="kavenegar")
+SMS_FAKE_LATENCY = config("SMS_FAKE_LATENCY", default=0.0, cast=float)
+SMS_FAKE_FAILURE_RATE = config("SMS_FAKE_FAILURE_RATE", default=0.0, cast=float)
+SMS_HTTP_TIMEOUT = config("SMS_HTTP_TIMEOUT", default=10.0, cast=float)
+SMS_HTTP_POOL_SIZE = config("SMS_HTTP_POOL_SIZE", default=10, cast=int)
+SMS_QUEUE = config("SMS_QUEUE", default="sms")
+SMS_RATE_LIMIT = config("SMS_RATE_LIMIT", default="5/s")
+SMS_MAX_RETRIES = config("SMS_MAX_RETRIES", default=5, cast=int)
+SMS_RETRY_BACKOFF = config("SMS_RETRY_BACKOFF", default=5, cast=int)
+SMS_RETRY_BACKOFF_MAX = config("SMS_RETRY_BACKOFF_MAX", default=300, cast=int)
+SMS_BREAKER_THRESHOLD = config("SMS_BREAKER_THRESHOLD", default=5, cast=int)
+SMS_BREAKER_RESET_TIMEOUT = config("SMS_BREAKER_RESET_TIMEOUT", default=60, cast=int)
+SMS_DELIVERY_RETENTION_DAYS = config(
+    "SMS_DELIVERY_RETENTION_DAYS", default=90, cast=int
+)
+# Deliveries still queued after this many seconds are failed by the
+# retention task and their template tokens (one-time codes) are erased
+SMS_TOKEN_MAX_AGE = config("SMS_TOKEN_MAX_AGE", default=3600, cast=int)
+CELERY_TASK_ROUTES = {"monitoring.send_sms": {"queue": SMS_QUEUE}}
+
+# Request throttling (common.throttling): every scope lists limits keyed by
+# "ip", "phone" or "national_id". "sliding" allows `rate` requests in any
+# window; "token_bucket" refills at `rate` up to `burst` requests. All
+# limits of a scope cost a single Redis round trip
+THROTTLE_ENABLED = config("THROTTLE_ENABLED", default=not IS_TEST, cast=bool)
+THROTTLE_POLICIES = {
+    "login": [
+        {"key": "ip", "rate": "30/m"},
+        {"key": "phone", "rate": "5/5m"},
+    ],
+    "register": [
+        {"key": "ip", "rate": "10/h"},
+        {"key": "phone", "rate": "3/h"},
+    ],
+    "otp-verify": [
+        {"key": "phone", "rate": "5/10m"},
+    ],
+    "festival-registration": [
+        {"key": "ip", "algorithm": "token_bucket", "rate": "20/h", "burst": 5},
+        {"key": "national_id", "rate": "10/d"},
+    ],
+    "festival-registration-search": [
+        {"key": "ip", "algorithm": "token_bucket", "rate": "30/m", "burst": 10},
+        {"key": "national_id", "rate": "10/m"},
+        {"key": "phone", "rate": "10/m"},
+    ],
+    "contact-us": [
+        {"key": "ip", "algorithm": "token_bucket", "rate": "5/h", "burst": 3},
+    ],
+}
+
+# Per-request SQL profiler: share of requests profiled and how many repeats
+# of the same statement count as a probable N+1 (0 reports every statement)
+SQL_PROFILER_SAMPLE_RATE = (
+    1.0 if IS_TEST else config("SQL_PROFILER_SAMPLE_RATE", default=0.01, cast=float)
+)
+SQL_PROFILER_N_PLUS_ONE_THRESHOLD = config(
+    "SQL_PROFILER_N_PLUS_ONE_THRESHOLD", default=10, cast=int
+)
+
+# Process-wide SQL statistics (monitoring.query_stats), flushed into
+# QueryStatistic rows every SQL_STATS_FLUSH_INTERVAL seconds
+SQL_STATS_ENABLED = config("SQL_STATS_ENABLED", default=not IS_TEST, cast=bool)
+SQL_STATS_FLUSH_INTERVAL = config("SQL_STATS_FLUSH_INTERVAL", default=60, cast=int)
+SQL_STATS_MAX_FINGERPRINTS = config(
+    "SQL_STATS_MAX_FINGERPRINTS", default=2000, cast=int
+)
+
+# Requests slower than this many seconds are logged as PERFORMANCE entries
+SLOW_REQUEST_THRESHOLD = config("SLOW_REQUEST_THRESHOLD", default=2.0, cast=float)
+
+# Opt-in sampling stack profiler (monitoring.sampler) kept for slow requests
+STACK_SAMPLER_ENABLED = config("STACK_SAMPLER_ENABLED", default=False, cast=bool)
+STACK_SAMPLER_INTERVAL = config("STACK_SAMPLER_INTERVAL", default=0.01, cast=float)
+
+# Request tracing (monitoring.tracing): share of traces stored as TraceSpan
+# rows; slow and failed traces are always kept
+TRACE_SAMPLE_RATE = (
+    1.0 if IS_TEST else config("TRACE_SAMPLE_RATE", default=0.05, cast=float)
+)
+TRACE_MAX_SPANS = config("TRACE_MAX_SPANS", default=500, cast=int)
+
+# Exception grouping (monitoring.issues): sample details kept per IssueGroup
+# and the minimum seconds between two samples of one group in a process
+ISSUE_SAMPLE_LIMIT = config("ISSUE_SAMPLE_LIMIT", default=10, cast=int)
+ISSUE_SAMPLE_INTERVAL = config("ISSUE_SAMPLE_INTERVAL", default=300, cast=int)
+
+
+# Standard logging goes to stdout for the container logs and is also
+# stored in CodeLog through monitoring.handlers, written in batches by a
+# background thread (inline under tests). Celery's INFO lines (task received,
+# succeeded) only go to stdout.
+CODELOG_HANDLER_LEVEL = config("CODELOG_HANDLER_LEVEL", default="INFO")
+CELERY_WORKER_HIJACK_ROOT_LOGGER = False
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "[%(asctime)s: %(levelname)s/%(name)s] %(message)s"},
+    },
+    "filters": {
+        "celery_warnings": {
+            "()": "monitoring.handlers.LoggerLevelFilter",
+            "logger": "celery",
+            "level": "WARNING",
+        },
+    },
+    "handlers": {
+        "stdout": {
+            "class": "logging.StreamHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "plain",
+            # Keep the test runner's output readable
+            "level": "CRITICAL" if IS_TEST else "NOTSET",
+        },
+        "codelog": {
+            "class": "monitoring.handlers.CodeLogHandler",
+            "level": CODELOG_HANDLER_LEVEL,
+            "filters": ["celery_warnings"],
+            "asynchronous": not IS_TEST,
+            "batch_size": config("CODELOG_HANDLER_BATCH_SIZE", default=200, cast=int),
+            "flush_interval": config(
+                "CODELOG_HANDLER_FLUSH_INTERVAL", default=2.0, cast=float
+            ),
+        },
+    },
+    "root": {"handlers": ["stdout", "codelog"], "level": "WARNING"},
+    "loggers": {
+        "django": {"level": "INFO"},
+        # 4xx responses are already counted by the metrics middleware
+        "django.request": {"level": "ERROR"},
+        "celery": {"level": "INFO"},
+        **{
+            app: {"level": "INFO"}
+            for app in (
+                "account",
+                "common",
+                "content",
+                "festival",
+                "info",
+                "monitoring",
+                "notifications",
+                "province",
+                "siteinfo",
+            )
+        },
+    },
+}
+
+
+# Cache payloads are msgpack (common.cache_serializers), compressed with
+# zlib above CACHE_COMPRESS_MIN_LENGTH bytes; set CACHE_COMPRESSOR to
+# common.cache_serializers.Lz4Compressor after pip install lz4, or
+# CACHE_SERIALIZER to django_redis.serializers.pickle.PickleSerializer to go
+# back. Compare them with python manage.py benchmark_cache. Every process
+# keeps up to REDIS_MAX_CONNECTIONS connections to the cache
+CACHE_SERIALIZER = config(
+    "CACHE_SERIALIZER", default="common.cache_serializers.MsgpackSerializer"
+)
+CACHE_COMPRESSOR = config(
+    "CACHE_COMPRESSOR", default="common.cache_serializers.ZlibCompressor"
+)
+CACHE_COMPRESS_MIN_LENGTH = config("CACHE_COMPRESS_MIN_LENGTH", default=512, cast=int)
+REDIS_MAX_CONNECTIONS = config("REDIS_MAX_CONNECTIONS", default=50, cast=int)
+REDIS_SOCKET_CONNECT_TIMEOUT = config(
+    "REDIS_SOCKET_CONNECT_TIMEOUT", default=2.0, cast=float
+)
+REDIS_SOCKET_TIMEOUT = config("REDIS_SOCKET_TIMEOUT", default=2.0, cast=float)
 
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "monitoring.cache_backends.InstrumentedRedisCache",
         "LOCATION": REDIS_CACHE,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SERIALIZER": CACHE_SERIALIZER,
+            "COMPRESSOR": CACHE_COMPRESSOR,
+            "COMPRESS_MIN_LENGTH": CACHE_COMPRESS_MIN_LENGTH,
+            "CONNECTION_POOL_KWARGS": {
+                "max_connections": REDIS_MAX_CONNECTIONS,
+                "retry_on_timeout": True,
+            },
+            "SOCKET_CONNECT_TIMEOUT": REDIS_SOCKET_CONNECT_TIMEOUT,
+            "SOCKET_TIMEOUT": REDIS_SOCKET_TIMEOUT,
         },
     }
 }
 
+# common.cache.cached: results are kept for their TTL minus up to
+# CACHE_TTL_JITTER of it. Off in tests, which enable it where they need it
+CACHED_ENABLED = config("CACHED_ENABLED", default=not IS_TEST, cast=bool)
+CACHE_TTL_JITTER = config("CACHE_TTL_JITTER", default=0.1, cast=float)
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
-    "ROTATE_REFRESH_TOKENS": False,
+    "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_REFRESH_SERIALIZER": "account.serializers.RevocableTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "account.serializers.RevocableTokenVerifySerializer",
 }
+
+# JWT revocation (account.revocation): revoked jtis and per-user cut-offs
+# live in Redis; every process checks tokens against an in-memory Bloom
+# filter rebuilt every JWT_REVOCATION_REFRESH seconds and updated over
+# pub/sub (JWT_REVOCATION_PUBSUB) in between. The default size keeps false
+# positives near 1% up to ~100k revoked tokens
+JWT_REVOCATION_REFRESH = config("JWT_REVOCATION_REFRESH", default=60, cast=int)
+JWT_REVOCATION_BLOOM_SIZE = config(
+    "JWT_REVOCATION_BLOOM_SIZE", default=2**20, cast=int
+)
+JWT_REVOCATION_BLOOM_HASHES = config("JWT_REVOCATION_BLOOM_HASHES", default=7, cast=int)
+JWT_REVOCATION_PUBSUB = config("JWT_REVOCATION_PUBSUB", default=not IS_TEST, cast=bool)
+
+# Cached user resolution (account.cache): authenticated requests read the
+# user and its permission sets from an in-process map for
+# USER_CACHE_LOCAL_TTL seconds, then Redis for USER_CACHE_TTL seconds.
+# Changes invalidate both tiers locally; other processes pick them up once
+# their local TTL expires. USER_CACHE_LOCAL_SIZE bounds the local map
+USER_CACHE_TTL = config("USER_CACHE_TTL", default=60, cast=int)
+USER_CACHE_LOCAL_TTL = config("USER_CACHE_LOCAL_TTL", default=5, cast=float)
+USER_CACHE_LOCAL_SIZE = config("USER_CACHE_LOCAL_SIZE", default=10000, cast=int)
@@ -1,15 +1,16 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 from django.contrib import admin
 from django.urls import path, include
 
+from common.schema import SchemaSwaggerView, SchemaView
+
 urlpatterns = [
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
+    path("api/schema/", SchemaView.as_view(), name="api-schema"),
     path(
         "api/schema/swagger-ui/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
+        SchemaSwaggerView.as_view(url_name="api-schema"),
         name="swagger-ui",
     ),
     path("admin/", admin.site.urls),
@@ -19,6 +20,8 @@ urlpatterns = [
     path("festival/", include("festival.urls")),
     path("content/", include("content.urls")),
     path("info/", include("info.urls")),
+    path("notifications/", include("monitoring.notification_urls")),
+    path("metrics", include("monitoring.urls")),
 ]
 
 if settings.DEBUG:
@@ -3,7 +3,9 @@ Festival Registration Services
 """
 from django.db import transaction
 from django.contrib.auth import get_user_model
-from festival.models import FestivalRegistration
+from common.cache import cached
+from content.models import Event, Education, News
+from festival.models import FestivalRegistration, Work
 
 User = get_user_model()
 
@@ -25,3 +27,17 @@ def create_festival_registration(phone_number, registration_data):
     registration = FestivalRegistration.objects.create(user=user, **registration_data)
 
     return registration, created
+
+
+@cached(key="site", ttl=60)
+def site_statistics():
+    """
+    Public counts of registrations, works and content, refreshed every minute
+    """
+    return {
+        "registered_users_count": FestivalRegistration.objects.count(),
+        "total_works_count": Work.objects.count(),
+        "content_count": Event.objects.count()
+        + Education.objects.count()
+        + News.objects.count(),
+    }
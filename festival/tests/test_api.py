@@ -2,9 +2,10 @@
 Festival Registration API Tests
 """
 import json
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django_redis import get_redis_connection
 from rest_framework.test import APITestCase
 from rest_framework import status
 
@@ -394,6 +395,29 @@ class FestivalRegistrationAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("error", response.data)
 
+    @override_settings(
+        THROTTLE_ENABLED=True,
+        THROTTLE_POLICIES={
+            "festival-registration": [{"key": "national_id", "rate": "1/d"}]
+        },
+    )
+    def test_create_registration_throttled_by_national_id(self):
+        """Test that repeated registrations with one national ID are throttled"""
+        redis = get_redis_connection("default")
+        key = "throttle:festival-registration:national_id:1234567890"
+        redis.delete(key)
+        self.addCleanup(redis.delete, key)
+        url = reverse("festival:registration-create")
+        data = json.dumps(self.valid_registration_data)
+
+        response = self.client.post(url, data=data, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(url, data=data, content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(FestivalRegistration.objects.count(), 1)
+
     def test_api_pagination(self):
         """Test API pagination"""
         # Create multiple registrations
@@ -9,7 +9,9 @@ from django_filters.rest_framework import DjangoFilterBackend, FilterSet
 from django_filters import CharFilter
 from rest_framework.filters import SearchFilter, OrderingFilter
 
+from common.throttling import ScopedRedisThrottle
 from festival.models import FestivalRegistration, Work
+from festival.services import site_statistics
 from content.models import Event, Education, News
 from festival.serializers import (
     FestivalRegistrationSerializer,
@@ -20,7 +22,8 @@ from festival.serializers import (
     StatisticsSerializer,
     MyStatisticsSerializer,
 )
-from province.models import Province, City
+from province.models import City, Province
+from province.services import city_list, province_list
 from province.serializers import ProvinceSerializer, CitySerializer
 
 
@@ -48,6 +51,8 @@ class FestivalRegistrationCreateView(generics.CreateAPIView):
 
     serializer_class = FestivalRegistrationCreateSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedRedisThrottle]
+    throttle_scope = "festival-registration"
 
     @extend_schema(
         summary="ثبت‌نام در جشنواره",
@@ -134,6 +139,11 @@ class FestivalRegistrationSearchView(generics.ListAPIView):
 
     serializer_class = FestivalRegistrationListSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedRedisThrottle]
+    throttle_scope = "festival-registration-search"
+    # Applicants look up a registration right after submitting it, often
+    # from another device, so read it from the primary
+    use_replica = False
 
     def get_queryset(self):
         phone = self.request.query_params.get("phone", None)
@@ -189,10 +199,16 @@ class FestivalRegistrationSearchView(generics.ListAPIView):
 class ProvinceListView(generics.ListAPIView):
     """List all provinces for form selection"""
 
-    queryset = Province.objects.all().order_by("name")
+    # For schema generation only; requests are served from province_list()
+    queryset = Province.objects.none()
     serializer_class = ProvinceSerializer
     permission_classes = [permissions.AllowAny]
 
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return self.queryset
+        return province_list()
+
     @extend_schema(
         summary="List Provinces",
         description="Get list of all provinces for dropdown selection in registration form.",
@@ -212,8 +228,7 @@ class CityListView(generics.ListAPIView):
         province_id = self.request.query_params.get("province_id")
         if province_id:
             try:
-                province_id = int(province_id)
-                return City.objects.filter(province_id=province_id).order_by("name")
+                return city_list(int(province_id))
             except (ValueError, TypeError):
                 return City.objects.none()
         return City.objects.none()
@@ -315,25 +330,7 @@ class StatisticsView(APIView):
     def get(self, request, *args, **kwargs):
         """Get system statistics"""
 
-        # Count registered users in festival
-        registered_users_count = FestivalRegistration.objects.count()
-
-        # Count total works
-        total_works_count = Work.objects.count()
-
-        # Count all content (events, education, news)
-        events_count = Event.objects.count()
-        education_count = Education.objects.count()
-        news_count = News.objects.count()
-        content_count = events_count + education_count + news_count
-
-        data = {
-            "registered_users_count": registered_users_count,
-            "total_works_count": total_works_count,
-            "content_count": content_count,
-        }
-
-        serializer = StatisticsSerializer(data)
+        serializer = StatisticsSerializer(site_statistics())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
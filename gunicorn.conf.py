@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration, loaded automatically from the project root
+
+Prepares the shared directory prometheus_client uses to aggregate metrics
+across workers and cleans up after workers that exit, including their
+database pools.
+"""
+import os
+import shutil
+
+# Set before anything imports prometheus_client: it picks the in-memory or
+# the multiprocess value class at import time, and workers inherit it
+PROMETHEUS_MULTIPROC_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/event_abozar_prometheus"
+)
+
+
+def on_starting(server):
+    """Start every master process with an empty metrics directory"""
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop live gauges of a worker that is gone"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Hand a worker's pooled database connections back to the server"""
+    from common.db.postgresql.base import close_pools
+
+    close_pools()
@@ -5,6 +5,8 @@ API views for ContactUs and other info models
 from rest_framework import generics, status
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from common.throttling import ScopedRedisThrottle
+
 from .models import ContactUs
 from .serializers import ContactUsSerializer
 
@@ -25,6 +27,8 @@ class ContactUsCreateView(generics.CreateAPIView):
 
     queryset = ContactUs.objects.all()
     serializer_class = ContactUsSerializer
+    throttle_classes = [ScopedRedisThrottle]
+    throttle_scope = "contact-us"
 
     def create(self, request, *args, **kwargs):
         """Create contact message with custom response"""
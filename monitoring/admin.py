@@ -1,7 +1,49 @@
+import json
+
 from django.contrib import admin
-from django.utils.html import format_html
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+
+from . import facets
+from .models import (
+    CodeLog,
+    IssueGroup,
+    QueryStatistic,
+    RequestProfile,
+    SmsDelivery,
+    TraceSpan,
+)
+from .paginators import ApproximateCountPaginator
+
+
+class FacetListFilter(admin.SimpleListFilter):
+    """List filter whose choices come from monitoring.facets, not the table"""
+
+    field = None
+
+    def lookups(self, request, model_admin):
+        return [(value, value) for value in facets.get_values(self.field)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.field: self.value()})
+        return queryset
+
+
+class ModuleFacetFilter(FacetListFilter):
+    title = "ماژول"
+    field = "module"
+    parameter_name = "module__exact"
+
 
-from .models import CodeLog
+class RequestMethodFacetFilter(FacetListFilter):
+    title = "روش درخواست"
+    field = "request_method"
+    parameter_name = "request_method__exact"
 
 
 @admin.register(CodeLog)
@@ -23,34 +65,42 @@ class CodeLogAdmin(admin.ModelAdmin):
     list_filter = (
         "level",
         "log_type",
-        "module",
+        ModuleFacetFilter,
         "timestamp",
         "is_resolved",
-        "exception_type",
-        "request_method",
+        RequestMethodFacetFilter,
     )
 
+    # The text fields are served by trigram indexes on UPPER(col) on
+    # PostgreSQL; users are matched separately in get_search_results so the
+    # search never joins the user table
     search_fields = (
         "module",
         "method",
         "message",
         "exception_message",
         "request_path",
-        "user__fullName",
-        "user__phone",
         "tags",
+        "=request_id",
     )
+    user_search_fields = ("fullName", "phone")
+    user_search_limit = 100
 
     ordering = ("-timestamp",)
     readonly_fields = (
         "timestamp",
         "cpu_usage",
         "memory_usage",
-        "traceback_info",
+        "traceback_display",
+        "context_display",
         "severity_score",
+        "profile_link",
+        "trace_link",
     )
     list_display_links = ("level_badge", "module")
     list_per_page = 50
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
     # Enhanced fieldsets for better organization
     fieldsets = (
@@ -73,6 +123,7 @@ class CodeLogAdmin(admin.ModelAdmin):
                     "user",
                     ("request_path", "request_method"),
                     ("ip_address", "user_agent"),
+                    ("request_id", "trace_link"),
                 ),
                 "classes": ("collapse",),
             },
@@ -82,7 +133,7 @@ class CodeLogAdmin(admin.ModelAdmin):
             {
                 "fields": (
                     ("exception_type", "exception_message"),
-                    "traceback_info",
+                    "traceback_display",
                 ),
                 "classes": ("collapse",),
             },
@@ -94,6 +145,7 @@ class CodeLogAdmin(admin.ModelAdmin):
                     ("timestamp", "duration"),
                     ("cpu_usage", "memory_usage"),
                     "severity_score",
+                    "profile_link",
                 ),
                 "classes": ("collapse",),
             },
@@ -101,7 +153,7 @@ class CodeLogAdmin(admin.ModelAdmin):
         (
             "🔧 اطلاعات تکمیلی",
             {
-                "fields": ("context",),
+                "fields": ("context_display",),
                 "classes": ("collapse",),
             },
         ),
@@ -147,10 +199,61 @@ class CodeLogAdmin(admin.ModelAdmin):
         return format_html('<span style="color: green;">✓ ندارد</span>')
 
     is_exception.short_description = "استثنا"
-    is_exception.boolean = True
+
+    def profile_link(self, obj):
+        """Link to the sampled stack profile of a slow request"""
+        profile = getattr(obj, "profile", None)
+        if profile is None:
+            return "-"
+        url = reverse("admin:monitoring_requestprofile_change", args=[profile.pk])
+        return format_html('<a href="{}">مشاهده پروفایل</a>', url)
+
+    profile_link.short_description = "پروفایل پشته"
+
+    def trace_link(self, obj):
+        """Link to the waterfall of the request this entry was logged in"""
+        if not obj.request_id:
+            return "-"
+        first_span = (
+            TraceSpan.objects.filter(trace_id=obj.request_id)
+            .order_by("start_time")
+            .first()
+        )
+        if first_span is None:
+            return "-"
+        url = reverse("admin:monitoring_tracespan_change", args=[first_span.pk])
+        return format_html('<a href="{}">مشاهده ردپا</a>', url)
+
+    trace_link.short_description = "ردپای درخواست"
+
+    def context_display(self, obj):
+        """Pretty-print the context, decompressing it when stored compressed"""
+        context = obj.full_context
+        if context is None:
+            return "-"
+        return format_html(
+            '<pre style="direction: ltr;">{}</pre>',
+            json.dumps(context, ensure_ascii=False, indent=2, default=str),
+        )
+
+    context_display.short_description = "زمینه"
+
+    def traceback_display(self, obj):
+        """Show the traceback, decompressing it when stored compressed"""
+        traceback_info = obj.full_traceback
+        if not traceback_info:
+            return "-"
+        return format_html('<pre style="direction: ltr;">{}</pre>', traceback_info)
+
+    traceback_display.short_description = "جزئیات traceback"
 
     # Custom actions
-    actions = ["mark_as_resolved", "mark_as_unresolved", "export_critical_logs"]
+    actions = [
+        "mark_as_resolved",
+        "mark_as_unresolved",
+        "export_critical_logs",
+        "export_logs_ndjson",
+    ]
 
     def mark_as_resolved(self, request, queryset):
         """Mark selected logs as resolved"""
@@ -174,6 +277,54 @@ class CodeLogAdmin(admin.ModelAdmin):
 
     export_critical_logs.short_description = "استخراج لاگ‌های بحرانی"
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Also match logs of users whose name or phone contains the search
+        term, through their ids (at most ``user_search_limit``), so each part
+        of the search stays index-friendly.
+        """
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        search_term = search_term.strip()
+        if not search_term:
+            return results, may_have_duplicates
+
+        user_query = Q()
+        for field in self.user_search_fields:
+            user_query |= Q(**{f"{field}__icontains": search_term})
+        user_ids = list(
+            get_user_model()
+            .objects.filter(user_query)
+            .values_list("pk", flat=True)[: self.user_search_limit]
+        )
+        if user_ids:
+            results |= queryset.filter(user_id__in=user_ids)
+        return results, may_have_duplicates
+
+    def export_logs_ndjson(self, request, queryset):
+        """Queue a gzip NDJSON export of the selected logs on Celery"""
+        from monitoring.tasks import export_logs_task
+
+        if request.POST.get("select_across") == "1":
+            # Whole filtered changelist: ship its query string, not millions
+            # of ids; the task rebuilds this changelist's queryset from it
+            filters = {
+                "changelist": {key: request.GET.getlist(key) for key in request.GET}
+            }
+        else:
+            filters = {"ids": list(queryset.values_list("pk", flat=True))}
+
+        export_logs_task.delay(
+            fmt="ndjson", compress=True, filters=filters, user_id=request.user.pk
+        )
+        self.message_user(
+            request,
+            "صادرات لاگ‌ها در پس‌زمینه آغاز شد؛ مسیر فایل پس از پایان در لاگ‌ها ثبت می‌شود.",
+        )
+
+    export_logs_ndjson.short_description = "صادرات لاگ‌ها (NDJSON فشرده، پس‌زمینه)"
+
     def get_form(self, request, obj=None, **kwargs):
         """Customize form with Persian help texts"""
         form = super().get_form(request, obj, **kwargs)
@@ -198,3 +349,333 @@ class CodeLogAdmin(admin.ModelAdmin):
     class Media:
         css = {"all": ("admin/css/monitoring_admin.css",)}
         js = ("admin/js/monitoring_admin.js",)
+
+
+@admin.register(QueryStatistic)
+class QueryStatisticAdmin(admin.ModelAdmin):
+    """Aggregated SQL statistics, most expensive statements first"""
+
+    list_display = (
+        "sql_preview",
+        "view",
+        "calls",
+        "total_time_display",
+        "mean_time_display",
+        "p95_time_display",
+        "rows",
+        "last_seen",
+    )
+    list_filter = ("view",)
+    search_fields = ("sql", "view", "fingerprint")
+    ordering = ("-total_time",)
+    list_per_page = 50
+    readonly_fields = (
+        "fingerprint",
+        "view",
+        "sql",
+        "calls",
+        "total_time",
+        "p95_time",
+        "rows",
+        "histogram",
+        "last_seen",
+    )
+    fields = readonly_fields
+
+    def sql_preview(self, obj):
+        """Show the beginning of the normalized statement"""
+        return format_html('<code title="{}">{}</code>', obj.sql, obj.sql[:120])
+
+    sql_preview.short_description = "کوئری"
+
+    def total_time_display(self, obj):
+        return f"{obj.total_time * 1000:.1f} ms"
+
+    total_time_display.short_description = "زمان کل"
+    total_time_display.admin_order_field = "total_time"
+
+    def mean_time_display(self, obj):
+        return f"{obj.mean_time * 1000:.2f} ms"
+
+    mean_time_display.short_description = "میانگین زمان"
+
+    def p95_time_display(self, obj):
+        return f"{obj.p95_time * 1000:.2f} ms"
+
+    p95_time_display.short_description = "صدک ۹۵"
+    p95_time_display.admin_order_field = "p95_time"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(IssueGroup)
+class IssueGroupAdmin(admin.ModelAdmin):
+    """Grouped exceptions with the resolve workflow"""
+
+    list_display = (
+        "title",
+        "exception_type",
+        "module",
+        "method",
+        "occurrences",
+        "first_seen",
+        "last_seen",
+        "is_resolved",
+    )
+    list_filter = ("is_resolved", "level", "exception_type", "last_seen")
+    search_fields = ("title", "last_message", "exception_type", "module", "method")
+    ordering = ("-last_seen",)
+    list_per_page = 50
+    readonly_fields = (
+        "fingerprint",
+        "level",
+        "exception_type",
+        "module",
+        "method",
+        "title",
+        "last_message",
+        "occurrences",
+        "first_seen",
+        "last_seen",
+        "resolved_at",
+        "traceback_info",
+        "samples_display",
+    )
+
+    fieldsets = (
+        (
+            "🔍 اطلاعات اصلی",
+            {
+                "fields": (
+                    "title",
+                    ("exception_type", "level"),
+                    ("module", "method"),
+                    "last_message",
+                    ("is_resolved", "resolved_at"),
+                    "resolution_note",
+                )
+            },
+        ),
+        (
+            "📊 رخدادها",
+            {
+                "fields": (
+                    ("occurrences", "first_seen", "last_seen"),
+                    "fingerprint",
+                )
+            },
+        ),
+        (
+            "⚠️ traceback و نمونه‌ها",
+            {
+                "fields": ("traceback_info", "samples_display"),
+                "classes": ("collapse",),
+            },
+        ),
+    )
+
+    def samples_display(self, obj):
+        """Pretty-print the sampled occurrences"""
+        return format_html(
+            '<pre style="direction: ltr;">{}</pre>',
+            json.dumps(obj.samples, ensure_ascii=False, indent=2),
+        )
+
+    samples_display.short_description = "نمونه رخدادها"
+
+    actions = ["mark_as_resolved", "mark_as_unresolved"]
+
+    def mark_as_resolved(self, request, queryset):
+        """Mark selected issues as resolved"""
+        count = queryset.update(is_resolved=True, resolved_at=timezone.now())
+        self.message_user(request, f"{count} مسئله به عنوان حل شده علامت‌گذاری شد.")
+
+    mark_as_resolved.short_description = "علامت‌گذاری به عنوان حل شده"
+
+    def mark_as_unresolved(self, request, queryset):
+        """Mark selected issues as unresolved"""
+        count = queryset.update(is_resolved=False, resolved_at=None)
+        self.message_user(request, f"{count} مسئله به عنوان حل نشده علامت‌گذاری شد.")
+
+    mark_as_unresolved.short_description = "علامت‌گذاری به عنوان حل نشده"
+
+    def save_model(self, request, obj, form, change):
+        """Stamp the resolution time when resolved from the change form"""
+        if obj.is_resolved and not obj.resolved_at:
+            obj.resolved_at = timezone.now()
+        elif not obj.is_resolved:
+            obj.resolved_at = None
+        super().save_model(request, obj, form, change)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Sampled stack profiles of slow requests"""
+
+    list_display = ("view", "duration", "sample_count", "interval", "created_at")
+    list_filter = ("view",)
+    search_fields = ("view", "collapsed_stacks")
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "log",
+        "view",
+        "duration",
+        "interval",
+        "sample_count",
+        "top_frames_display",
+        "collapsed_stacks",
+    )
+    fields = readonly_fields
+    actions = ["download_collapsed_stacks"]
+
+    def top_frames_display(self, obj):
+        """Hottest innermost frames with their share of samples"""
+        rows = format_html_join(
+            "\n",
+            "<tr><td>{}</td><td>{}%</td></tr>",
+            (
+                (frame, round(count * 100 / obj.sample_count, 1))
+                for frame, count in obj.top_frames()
+            ),
+        )
+        return format_html('<table style="direction: ltr;">{}</table>', rows)
+
+    top_frames_display.short_description = "داغ‌ترین فریم‌ها"
+
+    def download_collapsed_stacks(self, request, queryset):
+        """Download profiles as one collapsed-stack file for flamegraph tools"""
+        content = "\n".join(profile.collapsed_stacks for profile in queryset)
+        response = HttpResponse(content, content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = 'attachment; filename="profile.folded"'
+        return response
+
+    download_collapsed_stacks.short_description = (
+        "دریافت فایل collapsed برای flamegraph"
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(SmsDelivery)
+class SmsDeliveryAdmin(admin.ModelAdmin):
+    """Delivery results of queued SMS messages"""
+
+    list_display = (
+        "receptor",
+        "template",
+        "purpose",
+        "status",
+        "attempts",
+        "provider",
+        "created_at",
+        "sent_at",
+    )
+    list_filter = ("status", "purpose", "provider")
+    search_fields = ("=receptor", "=provider_message_id")
+    ordering = ("-created_at",)
+    readonly_fields = (
+        "receptor",
+        "template",
+        "purpose",
+        "status",
+        "provider",
+        "provider_message_id",
+        "attempts",
+        "error",
+        "latency",
+        "created_at",
+        "sent_at",
+        "tokens_display",
+    )
+    # Pending tokens may contain one-time codes, so only their keys are shown
+    fields = readonly_fields
+
+    def tokens_display(self, obj):
+        return json.dumps(obj.masked_tokens, ensure_ascii=False)
+
+    tokens_display.short_description = "مقادیر قالب"
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(TraceSpan)
+class TraceSpanAdmin(admin.ModelAdmin):
+    """Spans of stored traces with a per-trace waterfall"""
+
+    list_display = ("name", "kind", "duration_ms", "is_error", "trace_id", "start_time")
+    list_filter = ("kind", "is_error")
+    search_fields = ("=trace_id", "name")
+    ordering = ("-start_time",)
+    readonly_fields = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "start_time",
+        "duration",
+        "is_error",
+        "attributes",
+        "waterfall_display",
+    )
+    fields = readonly_fields
+
+    def duration_ms(self, obj):
+        return f"{obj.duration * 1000:.1f}"
+
+    duration_ms.short_description = "مدت (میلی‌ثانیه)"
+
+    def waterfall_display(self, obj):
+        """Every span of the trace as a bar positioned on a shared time axis"""
+        spans = list(
+            TraceSpan.objects.filter(trace_id=obj.trace_id).order_by("start_time")
+        )
+        start = spans[0].start_time
+        end = max(span.start_time.timestamp() + span.duration for span in spans)
+        total = max(end - start.timestamp(), 1e-6)
+
+        depths = {}
+        for span in spans:
+            depths[span.span_id] = depths.get(span.parent_id, -1) + 1
+
+        rows = format_html_join(
+            "\n",
+            '<tr><td style="padding-left: {}px; white-space: nowrap;">{}</td>'
+            "<td>{}</td>"
+            '<td style="width: 60%;"><div style="margin-left: {}%; width: {}%;'
+            ' min-width: 1px; height: 12px; background: {};"></div></td></tr>',
+            (
+                (
+                    depths[span.span_id] * 16,
+                    span.name,
+                    f"{span.duration * 1000:.1f}ms",
+                    round((span.start_time - start).total_seconds() * 100 / total, 2),
+                    round(span.duration * 100 / total, 2),
+                    "#c0392b" if span.is_error else "#2e86c1",
+                )
+                for span in spans
+            ),
+        )
+        return format_html(
+            '<table style="direction: ltr; width: 100%;">{}</table>', rows
+        )
+
+    waterfall_display.short_description = "نمودار آبشاری"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
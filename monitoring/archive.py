@@ -0,0 +1,216 @@
+"""
+Cold archive tier for old CodeLog rows
+
+Rows older than LOG_ARCHIVE_AFTER_DAYS are moved out of the database into
+gzip-compressed NDJSON segments under MONITORING_ARCHIVE_ROOT, partitioned
+by day:
+
+    codelog/2025/01/31/segment-000000120001-000000125000.ndjson.gz
+    codelog/2025/01/31/segment-000000120001-000000125000.json
+
+Each line holds every column of the row, with the compressed context and
+traceback overflow expanded, since the row itself is deleted. The JSON
+sidecar is the segment index (row count, id range, min/max
+timestamp, rows per level) so a search can skip segments without opening
+them. Segment names derive from the id range, so re-running after a crash
+between writing a segment and deleting its rows overwrites the same file
+instead of duplicating rows.
+"""
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from monitoring.models import CodeLog
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+INDEX_SUFFIX = ".json"
+DEFAULT_SEGMENT_ROWS = 5000
+
+# Columns archived with their compressed overflow merged back in; the
+# compressed_payload column itself is then redundant
+EXPANDED_FIELDS = {"context": "full_context", "traceback_info": "full_traceback"}
+SKIPPED_FIELDS = ("compressed_payload",)
+
+
+def archive_root():
+    return os.path.join(settings.MONITORING_ARCHIVE_ROOT, "codelog")
+
+
+def _segment_base(day, first_id, last_id):
+    return os.path.join(
+        archive_root(),
+        f"{day:%Y}",
+        f"{day:%m}",
+        f"{day:%d}",
+        f"segment-{first_id:012d}-{last_id:012d}",
+    )
+
+
+def archive_row(log):
+    """Every column of ``log`` as a JSON document, overflow expanded"""
+    row = {}
+    for field in CodeLog._meta.concrete_fields:
+        if field.attname in SKIPPED_FIELDS:
+            continue
+        value = getattr(log, EXPANDED_FIELDS.get(field.attname, field.attname))
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        row[field.attname] = value
+    row["user"] = str(log.user) if log.user_id else None
+    return row
+
+
+def _write_atomically(path, payload, compress=False):
+    """Write aside and rename so readers never see a partial file"""
+    temporary = f"{path}.tmp"
+    opener = gzip.open if compress else open
+    with opener(temporary, "wt", encoding="utf-8") as stream:
+        stream.write(payload)
+    os.replace(temporary, path)
+
+
+def write_segment(day, rows):
+    """Write ``rows`` (NDJSON dicts of one day, by id) and its index"""
+    base = _segment_base(day, rows[0]["id"], rows[-1]["id"])
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+
+    levels = {}
+    for row in rows:
+        levels[row["level"]] = levels.get(row["level"], 0) + 1
+    moments = [parse_datetime(row["timestamp"]) for row in rows]
+    index = {
+        "count": len(rows),
+        "min_id": rows[0]["id"],
+        "max_id": rows[-1]["id"],
+        "min_timestamp": min(moments).isoformat(),
+        "max_timestamp": max(moments).isoformat(),
+        "levels": levels,
+    }
+
+    payload = "".join(
+        json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows
+    )
+    _write_atomically(base + SEGMENT_SUFFIX, payload, compress=True)
+    _write_atomically(base + INDEX_SUFFIX, json.dumps(index))
+    return base + SEGMENT_SUFFIX
+
+
+def archive_logs(days=None, segment_rows=DEFAULT_SEGMENT_ROWS):
+    """
+    Move CodeLog rows older than ``days`` into archive segments.
+    Returns (rows archived, segments written).
+    """
+    days = settings.LOG_ARCHIVE_AFTER_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    queryset = CodeLog.objects.filter(timestamp__lt=cutoff).select_related("user")
+
+    archived = segments = 0
+    last_id = 0
+    while True:
+        logs = list(queryset.filter(pk__gt=last_id).order_by("pk")[:segment_rows])
+        if not logs:
+            break
+        last_id = logs[-1].pk
+
+        by_day = {}
+        for log in logs:
+            day = timezone.localtime(log.timestamp).date()
+            by_day.setdefault(day, []).append(archive_row(log))
+        for day, rows in by_day.items():
+            write_segment(day, rows)
+            segments += 1
+
+        with transaction.atomic():
+            CodeLog.objects.filter(pk__in=[log.pk for log in logs]).delete()
+        archived += len(logs)
+
+    return archived, segments
+
+
+def iter_segment_indexes():
+    """Yield (segment path, index) for every archived segment"""
+    root = archive_root()
+    for directory, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if not filename.endswith(INDEX_SUFFIX):
+                continue
+            path = os.path.join(directory, filename)
+            with open(path, encoding="utf-8") as stream:
+                index = json.load(stream)
+            yield path[: -len(INDEX_SUFFIX)] + SEGMENT_SUFFIX, index
+
+
+def _index_matches(index, since, until, levels):
+    if since and parse_datetime(index["max_timestamp"]) < since:
+        return False
+    if until and parse_datetime(index["min_timestamp"]) >= until:
+        return False
+    if levels and not set(levels) & set(index["levels"]):
+        return False
+    return True
+
+
+def scan_segment(path, filters):
+    """Return the rows of one segment matching ``filters`` (picklable)"""
+    since = filters.get("since")
+    until = filters.get("until")
+    levels = set(filters.get("levels") or ())
+    modules = set(filters.get("modules") or ())
+    contains = filters.get("contains")
+
+    matches = []
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        for line in stream:
+            if contains and contains not in line:
+                continue
+            row = json.loads(line)
+            moment = parse_datetime(row["timestamp"])
+            if since and moment < since:
+                continue
+            if until and moment >= until:
+                continue
+            if levels and row["level"] not in levels:
+                continue
+            if modules and row["module"] not in modules:
+                continue
+            matches.append(row)
+    return matches
+
+
+def search_archive(
+    since=None, until=None, levels=None, modules=None, contains=None, workers=None
+):
+    """
+    Return archived rows matching the filters, oldest first. Segments are
+    pruned by their index, then scanned in parallel across ``workers``
+    processes (one process scans inline).
+    """
+    paths = [
+        path
+        for path, index in iter_segment_indexes()
+        if _index_matches(index, since, until, levels)
+    ]
+    filters = {
+        "since": since,
+        "until": until,
+        "levels": levels,
+        "modules": modules,
+        "contains": contains,
+    }
+
+    if workers == 1 or len(paths) <= 1:
+        results = [scan_segment(path, filters) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(scan_segment, paths, [filters] * len(paths)))
+
+    rows = [row for segment in results for row in segment]
+    rows.sort(key=lambda row: (parse_datetime(row["timestamp"]), row["id"]))
+    return rows
@@ -0,0 +1,20 @@
+"""
+Cache backends that report hit/miss counters to Prometheus
+"""
+from django_redis.cache import RedisCache
+
+from monitoring.metrics import record_cache_access
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """django-redis backend counting every ``get`` as a hit or a miss"""
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, _MISSING, version=version, client=client)
+        if value is _MISSING:
+            record_cache_access(hit=False)
+            return default
+        record_cache_access(hit=True)
+        return value
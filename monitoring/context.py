@@ -0,0 +1,19 @@
+"""
+Context variables describing the unit of work currently running
+(an HTTP request or a Celery task), shared by the monitoring tools.
+"""
+from contextvars import ContextVar
+
+# Resolved view name, "celery:<task>" inside tasks, or None
+current_view = ContextVar("current_view", default=None)
+
+# HttpRequest being served by the current thread or task, or None
+current_request = ContextVar("current_request", default=None)
+
+# Correlation id of the request or task; propagated to Celery in task headers
+current_request_id = ContextVar("current_request_id", default=None)
+
+# monitoring.tracing.Trace collecting spans of the current unit of work, and
+# the id of the innermost open span (the parent of the next one)
+current_trace = ContextVar("current_trace", default=None)
+current_span_id = ContextVar("current_span_id", default=None)
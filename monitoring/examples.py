@@ -69,6 +69,16 @@ def slow_database_query():
     return "data"
 
 
+# Every call also lands in the function_duration_seconds histogram on /metrics;
+# time a block instead of a whole function with the context manager
+from monitoring.utils import track_performance
+
+
+def export_report():
+    with track_performance("reports.export_report.render", threshold=5.0):
+        return "rendered"
+
+
 # Example 4: User Action Logging
 from monitoring.utils import log_user_action
 
@@ -0,0 +1,174 @@
+"""
+Streaming export pipeline for CodeLog rows
+"""
+import csv
+import gzip
+import json
+
+from monitoring.models import CodeLog
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+CSV_FIELDNAMES = [
+    "timestamp",
+    "level",
+    "log_type",
+    "module",
+    "method",
+    "message",
+    "user",
+    "duration",
+    "exception_type",
+    "request_method",
+    "request_path",
+    "request_id",
+    "is_resolved",
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def changelist_queryset(params, user):
+    """
+    Rows the CodeLog admin changelist shows ``user`` for the query string
+    ``params`` (a dict of value lists): search, list filters and date
+    hierarchy are applied by the admin itself, so an export of the whole
+    changelist matches what was on screen.
+    """
+    from django.contrib import admin
+    from django.http import HttpRequest, QueryDict
+
+    request = HttpRequest()
+    request.method = "GET"
+    request.GET = QueryDict(mutable=True)
+    for key, values in params.items():
+        request.GET.setlist(key, values)
+    request.user = user
+    changelist = admin.site._registry[CodeLog].get_changelist_instance(request)
+    return changelist.get_queryset(request)
+
+
+def build_export_queryset(
+    since=None,
+    until=None,
+    levels=None,
+    log_types=None,
+    modules=None,
+    ids=None,
+    changelist=None,
+    user=None,
+):
+    """
+    Build the filtered, ordered queryset used by every exporter.
+    All filters are optional; ``until`` is exclusive. ``changelist`` is an
+    admin changelist query string viewed by ``user``.
+    """
+    if changelist is not None:
+        queryset = changelist_queryset(changelist, user).select_related("user")
+    else:
+        queryset = CodeLog.objects.select_related("user")
+
+    if ids:
+        queryset = queryset.filter(pk__in=ids)
+    if since:
+        queryset = queryset.filter(timestamp__gte=since)
+    if until:
+        queryset = queryset.filter(timestamp__lt=until)
+    if levels:
+        queryset = queryset.filter(level__in=levels)
+    if log_types:
+        queryset = queryset.filter(log_type__in=log_types)
+    if modules:
+        queryset = queryset.filter(module__in=modules)
+
+    return queryset.order_by("-timestamp")
+
+
+def _csv_row(log):
+    """Flatten a log entry into the human readable CSV layout"""
+    return {
+        "timestamp": log.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+        "level": log.get_level_display(),
+        "log_type": log.get_log_type_display(),
+        "module": log.module,
+        "method": log.method,
+        "message": log.message,
+        "user": str(log.user) if log.user else "",
+        "duration": log.duration or "",
+        "exception_type": log.exception_type or "",
+        "request_method": log.request_method or "",
+        "request_path": log.request_path or "",
+        "request_id": log.request_id or "",
+        "is_resolved": "بله" if log.is_resolved else "خیر",
+    }
+
+
+def _ndjson_row(log):
+    """Flatten a log entry into a machine readable JSON document"""
+    return {
+        "id": log.id,
+        "timestamp": log.timestamp.isoformat(),
+        "level": log.level,
+        "log_type": log.log_type,
+        "module": log.module,
+        "method": log.method,
+        "message": log.message,
+        "context": log.full_context,
+        "user_id": log.user_id,
+        "user": str(log.user) if log.user else None,
+        "duration": log.duration,
+        "exception_type": log.exception_type,
+        "exception_message": log.exception_message,
+        "request_method": log.request_method,
+        "request_path": log.request_path,
+        "request_id": log.request_id,
+        "ip_address": log.ip_address,
+        "is_resolved": log.is_resolved,
+        "tags": log.tags,
+    }
+
+
+def write_logs(queryset, stream, fmt="csv"):
+    """
+    Stream ``queryset`` into the text ``stream`` and return the row count.
+    Rows are fetched with a server-side iterator so memory stays constant.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    count = 0
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=CSV_FIELDNAMES)
+        writer.writeheader()
+        for log in rows:
+            writer.writerow(_csv_row(log))
+            count += 1
+    else:
+        for log in rows:
+            stream.write(json.dumps(_ndjson_row(log), ensure_ascii=False, default=str))
+            stream.write("\n")
+            count += 1
+
+    return count
+
+
+def open_export_file(filename, compress=False):
+    """Open ``filename`` for text writing, gzip-compressed when requested"""
+    if compress:
+        return gzip.open(filename, "wt", encoding="utf-8", newline="")
+    return open(filename, "w", encoding="utf-8", newline="")
+
+
+def export_logs(filename, fmt="csv", compress=None, **filters):
+    """
+    Export the logs matching ``filters`` into ``filename``.
+    Compression defaults to gzip when the filename ends with ``.gz``.
+    """
+    if compress is None:
+        compress = str(filename).endswith(".gz")
+
+    queryset = build_export_queryset(**filters)
+    with open_export_file(filename, compress=compress) as stream:
+        return write_logs(queryset, stream, fmt=fmt)
@@ -0,0 +1,83 @@
+"""
+Facet values of CodeLog columns used by the admin list filters
+
+Distinct values are kept in one Redis set per field and extended as logs are
+written, so the changelist never runs SELECT DISTINCT over the log table.
+Each process remembers the values it already added and only talks to Redis
+when it meets a new one. ``log_manager --rebuild-facets`` recomputes the
+sets from the table, e.g. after old logs were deleted.
+"""
+from django.db.models import Q
+from django_redis import get_redis_connection
+
+from monitoring.models import CodeLog
+
+FACET_FIELDS = ("module", "request_method")
+MAX_KNOWN_VALUES = 10000
+EMPTY_MARKER = ""
+
+_known = set()
+
+
+def facet_key(field):
+    return f"monitoring:codelog:facets:{field}"
+
+
+def _connection():
+    return get_redis_connection("default")
+
+
+def remember(logs):
+    """Add the facet values of ``logs`` (CodeLog instances) to their sets"""
+    new_values = {}
+    for log in logs:
+        for field in FACET_FIELDS:
+            value = getattr(log, field)
+            if value and (field, value) not in _known:
+                new_values.setdefault(field, set()).add(value)
+    if not new_values:
+        return
+
+    try:
+        pipeline = _connection().pipeline(transaction=False)
+        for field, values in new_values.items():
+            pipeline.sadd(facet_key(field), *values)
+        pipeline.execute()
+    except Exception:
+        # Facets are an admin convenience; never fail a log write for them
+        return
+
+    if len(_known) >= MAX_KNOWN_VALUES:
+        _known.clear()
+    _known.update(
+        (field, value) for field, values in new_values.items() for value in values
+    )
+
+
+def rebuild(field):
+    """Recompute the set of ``field`` from the table and return its values"""
+    values = set(
+        CodeLog.objects.exclude(Q(**{f"{field}__isnull": True}) | Q(**{field: ""}))
+        .order_by()
+        .values_list(field, flat=True)
+        .distinct()
+    )
+    pipeline = _connection().pipeline()
+    pipeline.delete(facet_key(field))
+    # The empty member marks the set as built even when there are no values
+    pipeline.sadd(facet_key(field), EMPTY_MARKER, *values)
+    pipeline.execute()
+    return sorted(values)
+
+
+def get_values(field):
+    """Sorted facet values of ``field``, built from the table on first use"""
+    try:
+        members = _connection().smembers(facet_key(field))
+    except Exception:
+        return []
+    marker = EMPTY_MARKER.encode()
+    if marker not in members:
+        # Never built, or only holds values added since Redis was emptied
+        return rebuild(field)
+    return sorted(member.decode() for member in members if member != marker)
@@ -0,0 +1,216 @@
+"""
+Notification fan-out and unread counters
+
+``fan_out`` creates one Notification per user of an audience (registrants
+of a festival format, of a province, or explicit users) with bulk_create in
+chunks of NOTIFICATION_FANOUT_CHUNK_SIZE, then queues external delivery per
+channel to rate limited Celery tasks.
+
+Unread counts live in Redis, one key per user. A key is only created when
+the count is first read (one COUNT query) and expires after
+NOTIFICATION_UNREAD_TTL seconds, or as soon as one of the counted
+notifications expires, whichever comes first. Writers only adjust keys that
+exist, shortening them to the expiry of what they add; the retention purge
+drops the keys of the users it deletes notifications of.
+"""
+import math
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from festival.models import FestivalRegistration
+from monitoring.models import Notification
+
+# Adjust the counters that exist by ARGV[1], never below zero, and make
+# them expire within ARGV[2] seconds when given
+ADJUST_EXISTING = """
+local expires_in = tonumber(ARGV[2])
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        if redis.call('INCRBY', key, ARGV[1]) < 0 then
+            redis.call('SET', key, 0, 'KEEPTTL')
+        end
+        if expires_in then
+            local ttl = redis.call('TTL', key)
+            if ttl < 0 or ttl > expires_in then
+                redis.call('EXPIRE', key, expires_in)
+            end
+        end
+    end
+end
+return #KEYS
+"""
+
+_adjust_script = None
+
+
+def unread_key(user_id):
+    return f"monitoring:notifications:unread:{user_id}"
+
+
+def _connection():
+    return get_redis_connection("default")
+
+
+def seconds_until(moment):
+    """Whole seconds (at least 1) from now until ``moment``"""
+    return max(1, math.ceil((moment - timezone.now()).total_seconds()))
+
+
+def adjust_unread(user_ids, amount, expiration_date=None):
+    """
+    Add ``amount`` to the cached unread count of every user in ``user_ids``;
+    with ``expiration_date`` the counters expire no later than that.
+    """
+    global _adjust_script
+    if not user_ids:
+        return
+    args = [amount]
+    if expiration_date is not None:
+        args.append(seconds_until(expiration_date))
+    try:
+        if _adjust_script is None:
+            _adjust_script = _connection().register_script(ADJUST_EXISTING)
+        _adjust_script(keys=[unread_key(pk) for pk in user_ids], args=args)
+    except Exception:
+        # A missed adjustment is corrected when the key expires
+        return
+
+
+def invalidate_unread(user_ids):
+    """Drop the cached unread counts of ``user_ids``"""
+    if not user_ids:
+        return
+    try:
+        _connection().delete(*[unread_key(pk) for pk in user_ids])
+    except Exception:
+        return
+
+
+def invalidate_unread_of(notifications):
+    """
+    Retention hook: once the transaction deleting ``notifications`` commits,
+    drop the counters of their users with unread ones.
+    """
+    user_ids = set(
+        notifications.filter(is_read=False).values_list("user_id", flat=True)
+    )
+    transaction.on_commit(lambda: invalidate_unread(user_ids))
+
+
+def unread_count(user_id):
+    """Unread, unexpired notifications of a user, from Redis when cached"""
+    try:
+        cached = _connection().get(unread_key(user_id))
+    except Exception:
+        cached = None
+    if cached is not None:
+        return int(cached)
+
+    unread = (
+        Notification.objects.filter(user_id=user_id, is_read=False)
+        .filter(Q(expiration_date__isnull=True) | Q(expiration_date__gt=timezone.now()))
+        .aggregate(count=Count("pk"), next_expiry=Min("expiration_date"))
+    )
+    count = unread["count"]
+    timeout = settings.NOTIFICATION_UNREAD_TTL
+    if unread["next_expiry"] is not None:
+        # The count drops when that notification expires
+        timeout = min(timeout, seconds_until(unread["next_expiry"]))
+    try:
+        _connection().set(unread_key(user_id), count, ex=timeout, nx=True)
+    except Exception:
+        pass
+    return count
+
+
+def mark_all_read(user_id):
+    """Mark every notification of a user as read with a single UPDATE"""
+    updated = Notification.objects.filter(user_id=user_id, is_read=False).update(
+        is_read=True
+    )
+    try:
+        _connection().set(unread_key(user_id), 0, ex=settings.NOTIFICATION_UNREAD_TTL)
+    except Exception:
+        pass
+    return updated
+
+
+def audience(festival_format=None, province=None, user_ids=None):
+    """
+    Ids of the active users targeted, ordered by id. Registration filters
+    are combined: ``festival_format`` and ``province`` together target the
+    registrants of that format in that province.
+    """
+    users = get_user_model().objects.filter(is_active=True)
+    if festival_format is not None or province is not None:
+        registrations = FestivalRegistration.objects.all()
+        if festival_format is not None:
+            registrations = registrations.filter(festival_format=festival_format)
+        if province is not None:
+            registrations = registrations.filter(province=province)
+        users = users.filter(pk__in=registrations.values("user_id"))
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    return users.order_by("pk").values_list("pk", flat=True)
+
+
+def queue_delivery(channel, notification_ids):
+    """Hand notifications of ``channel`` to its rate limited delivery task"""
+    from monitoring.tasks import DELIVERY_TASKS
+
+    task = DELIVERY_TASKS.get(channel)
+    if task is None:
+        # Dashboard notifications are delivered by being stored
+        return
+    size = settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+    for start in range(0, len(notification_ids), size):
+        task.delay(notification_ids[start : start + size])
+
+
+def fan_out(
+    title,
+    message,
+    channel="dashboard",
+    priority="low",
+    expiration_date=None,
+    chunk_size=None,
+    **audience_filters,
+):
+    """
+    Create a notification for every user of the audience described by
+    ``audience_filters`` (see ``audience``) and return how many were created.
+    """
+    chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+    user_ids = audience(**audience_filters)
+
+    created = 0
+    last_id = 0
+    while True:
+        chunk = list(user_ids.filter(pk__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1]
+
+        notifications = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=user_id,
+                    title=title,
+                    message=message,
+                    channel=channel,
+                    priority=priority,
+                    expiration_date=expiration_date,
+                )
+                for user_id in chunk
+            ]
+        )
+        adjust_unread(chunk, 1, expiration_date)
+        queue_delivery(channel, [notification.pk for notification in notifications])
+        created += len(notifications)
+
+    return created
@@ -0,0 +1,293 @@
+"""
+Standard library logging handler that stores records as CodeLog entries
+
+Module and function come straight from the LogRecord, so unlike
+monitoring.utils.Logger no stack walking is needed, and request details are
+read from monitoring.context. Records are queued and written in batches by
+a background thread per process; ``asynchronous=False`` (used by the test
+settings) writes them inline instead.
+
+This module is imported while logging is configured, before the app
+registry is ready, so models are only imported when a batch is written.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.utils.functional import LazyObject, empty
+
+from monitoring.context import current_request, current_request_id, current_view
+from monitoring.payloads import USER_AGENT_MAX_LENGTH, pack
+
+# Logger name prefixes mapped to CodeLog log types; everything else is SYSTEM
+LOG_TYPE_PREFIXES = (
+    ("django.security", "SECURITY"),
+    ("django.db", "DATABASE"),
+    ("django.request", "API_CALL"),
+)
+
+
+def map_level(levelno):
+    """CodeLog level for a logging level number"""
+    if levelno >= logging.CRITICAL:
+        return "CRITICAL"
+    if levelno >= logging.ERROR:
+        return "ERROR"
+    if levelno >= logging.WARNING:
+        return "WARNING"
+    if levelno >= logging.INFO:
+        return "INFO"
+    return "DEBUG"
+
+
+def _log_type(logger_name):
+    for prefix, log_type in LOG_TYPE_PREFIXES:
+        if logger_name.startswith(prefix):
+            return log_type
+    return "SYSTEM"
+
+
+def _request_user(request):
+    """Authenticated user of ``request`` without triggering a lazy lookup"""
+    user = request.__dict__.get("user")
+    if isinstance(user, LazyObject):
+        if user._wrapped is empty:
+            return None
+        user = user._wrapped
+    return user if getattr(user, "is_authenticated", False) else None
+
+
+def _request_fields(request):
+    from monitoring.models import CodeLog
+
+    user = _request_user(request)
+    return {
+        "request_path": request.path[:500],
+        "request_method": request.method,
+        "ip_address": CodeLog._get_client_ip(request),
+        "user_agent": request.META.get("HTTP_USER_AGENT", "")[:USER_AGENT_MAX_LENGTH],
+        "user_id": user.pk if user else None,
+    }
+
+
+def build_entry(record):
+    """
+    Turn a LogRecord into (CodeLog field values, exception or None).
+
+    ``extra={"log_type": ..., "context": {...}, "tags": ..., "duration": ...}``
+    on the logging call is honoured.
+    """
+    context = {"pathname": record.pathname, "lineno": record.lineno}
+    context.update(getattr(record, "context", None) or {})
+    view = current_view.get()
+    if view:
+        context["view"] = view
+
+    entry = {
+        "level": map_level(record.levelno),
+        "log_type": getattr(record, "log_type", None) or _log_type(record.name),
+        "module": record.name[:100],
+        "method": (record.funcName or "")[:100],
+        "message": record.getMessage(),
+        "context": context,
+        "duration": getattr(record, "duration", None),
+        "tags": getattr(record, "tags", None),
+        "request_id": current_request_id.get(),
+    }
+    request = current_request.get()
+    if request is not None:
+        entry.update(_request_fields(request))
+
+    exception = record.exc_info[1] if record.exc_info else None
+    return entry, exception
+
+
+def write_entries(items):
+    """Store a batch of built entries, grouping the ones with an exception"""
+    from monitoring.facets import remember
+    from monitoring.issues import record_exception
+    from monitoring.models import CodeLog
+
+    rows = []
+    for entry, exception in items:
+        if exception is None:
+            payload = pack(entry.pop("context"))
+            rows.append(CodeLog(**entry, **payload))
+            continue
+        context = dict(entry["context"])
+        for field in (
+            "request_id",
+            "request_path",
+            "request_method",
+            "ip_address",
+            "user_id",
+        ):
+            if entry.get(field) is not None:
+                context[field] = entry[field]
+        record_exception(
+            "EXCEPTION" if entry["level"] == "ERROR" else entry["level"],
+            entry["module"],
+            entry["method"],
+            entry["message"],
+            exception,
+            context=context,
+        )
+    if rows:
+        CodeLog.objects.bulk_create(rows)
+        remember(rows)
+
+
+class BatchingSink:
+    """
+    Bounded queue drained by a daemon thread that hands batches of up to
+    ``batch_size`` items to ``write`` at least every ``flush_interval``
+    seconds. Items are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, write, batch_size=200, flush_interval=2.0, max_queue=10000):
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def put(self, item):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def in_worker(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def _ensure_worker(self):
+        # Threads and queue locks do not survive a fork: start over per process
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._thread = threading.Thread(
+                target=self._run, name="monitoring-codelog-sink", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        from django.db import close_old_connections
+
+        try:
+            self.write(batch)
+        except Exception:
+            self.dropped += len(batch)
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Write everything queued so far from the calling thread"""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+
+class LoggerLevelFilter(logging.Filter):
+    """
+    Drop records of ``logger`` and its children below ``level``, e.g. to
+    keep Celery's per-task INFO lines on stdout but out of CodeLog
+    """
+
+    def __init__(self, logger, level):
+        super().__init__()
+        self.logger = logger
+        self.levelno = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def filter(self, record):
+        if record.name == self.logger or record.name.startswith(self.logger + "."):
+            return record.levelno >= self.levelno
+        return True
+
+
+class CodeLogHandler(logging.Handler):
+    """
+    Logging handler storing records as CodeLog rows
+
+    Usage in LOGGING:
+        "codelog": {
+            "class": "monitoring.handlers.CodeLogHandler",
+            "level": "INFO",
+            "batch_size": 200,
+            "flush_interval": 2.0,
+        }
+    """
+
+    def __init__(
+        self,
+        level=logging.NOTSET,
+        asynchronous=True,
+        batch_size=200,
+        flush_interval=2.0,
+        max_queue=10000,
+    ):
+        super().__init__(level)
+        self.sink = None
+        if asynchronous:
+            self.sink = BatchingSink(
+                write_entries, batch_size, flush_interval, max_queue
+            )
+        self._local = threading.local()
+
+    def emit(self, record):
+        # Skip records raised while a CodeLog is being written (e.g. SQL
+        # debug logging) so the handler never feeds itself
+        if getattr(self._local, "busy", False):
+            return
+        if self.sink is not None and self.sink.in_worker():
+            return
+
+        self._local.busy = True
+        try:
+            item = build_entry(record)
+            if self.sink is not None:
+                self.sink.put(item)
+            else:
+                write_entries([item])
+        except Exception:
+            self.handleError(record)
+        finally:
+            self._local.busy = False
+
+    def flush(self):
+        if self.sink is not None:
+            self.sink.flush()
@@ -0,0 +1,167 @@
+"""
+Exception grouping services
+
+Occurrences of the same exception (same type raised through the same top
+frames) share one IssueGroup row. A repeat occurrence costs a single UPDATE
+of its counters; full sample details are written at most once every
+ISSUE_SAMPLE_INTERVAL seconds per group and process, into a ring capped at
+ISSUE_SAMPLE_LIMIT entries.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from monitoring.context import current_request_id
+from monitoring.models import CodeLog, IssueGroup
+from monitoring.payloads import sanitize
+
+FINGERPRINT_FRAMES = 5
+MAX_TRACKED_FINGERPRINTS = 10000
+
+_PATH_MARKERS = ("site-packages" + os.sep, "dist-packages" + os.sep)
+_HEX_RE = re.compile(r"0x[0-9a-fA-F]+")
+_NUMBER_RE = re.compile(r"\d+")
+
+_last_sampled = {}
+_sample_lock = threading.Lock()
+
+
+def _normalize_path(filename):
+    """Make frame paths independent of the install location"""
+    for marker in _PATH_MARKERS:
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    base_dir = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base_dir):
+        return filename[len(base_dir) :]
+    return os.path.basename(filename)
+
+
+def exception_fingerprint(exception, module="", method=""):
+    """
+    Fingerprint an exception by its type and innermost frames. Line numbers
+    are ignored so unrelated edits above a bug do not split its group.
+    """
+    exc_type = type(exception)
+    parts = [f"{exc_type.__module__}.{exc_type.__qualname__}"]
+
+    frames = traceback.extract_tb(exception.__traceback__)[-FINGERPRINT_FRAMES:]
+    if frames:
+        parts.extend(f"{_normalize_path(f.filename)}:{f.name}" for f in frames)
+    else:
+        # Never raised: fall back to the call site and a value-free message
+        message = _NUMBER_RE.sub("?", _HEX_RE.sub("?", str(exception)))
+        parts.extend([module, method, message])
+
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _should_sample(fingerprint):
+    now = time.monotonic()
+    with _sample_lock:
+        last = _last_sampled.get(fingerprint)
+        if last is not None and now - last < settings.ISSUE_SAMPLE_INTERVAL:
+            return False
+        if len(_last_sampled) >= MAX_TRACKED_FINGERPRINTS:
+            _last_sampled.clear()
+        _last_sampled[fingerprint] = now
+        return True
+
+
+def _build_sample(exception, message, context, request, user):
+    sample = {
+        "timestamp": timezone.now().isoformat(),
+        "message": message,
+        "exception_message": str(exception),
+        "context": sanitize(context),
+        "user_id": getattr(user, "pk", None),
+        "request_id": current_request_id.get(),
+    }
+    if request is not None:
+        sample.update(
+            {
+                "request_path": request.path,
+                "request_method": request.method,
+                "ip_address": CodeLog._get_client_ip(request),
+            }
+        )
+    return sample
+
+
+def _lazy_group(fingerprint):
+    return SimpleLazyObject(lambda: IssueGroup.objects.get(fingerprint=fingerprint))
+
+
+def record_exception(
+    level,
+    module,
+    method,
+    message,
+    exception,
+    context=None,
+    request=None,
+    user=None,
+):
+    """
+    Count an occurrence of ``exception`` against its IssueGroup and return
+    the group. After an unsampled repeat the group is only fetched if the
+    caller uses it, so the repeat still costs a single UPDATE.
+    """
+    fingerprint = exception_fingerprint(exception, module, method)
+    now = timezone.now()
+    counters = {
+        "occurrences": F("occurrences") + 1,
+        "last_seen": now,
+        "level": level,
+        "last_message": str(exception),
+        # A resolved issue that happens again is a regression
+        "is_resolved": False,
+        "resolved_at": None,
+    }
+
+    if not _should_sample(fingerprint):
+        if IssueGroup.objects.filter(fingerprint=fingerprint).update(**counters):
+            return _lazy_group(fingerprint)
+
+    sample = _build_sample(exception, message, context, request, user)
+    try:
+        with transaction.atomic():
+            group = (
+                IssueGroup.objects.select_for_update()
+                .filter(fingerprint=fingerprint)
+                .first()
+            )
+            if group is None:
+                return IssueGroup.objects.create(
+                    fingerprint=fingerprint,
+                    level=level,
+                    exception_type=type(exception).__name__,
+                    module=module[:100],
+                    method=method[:100],
+                    title=message[:255],
+                    last_message=str(exception),
+                    traceback_info="".join(traceback.format_exception(exception)),
+                    first_seen=now,
+                    last_seen=now,
+                    samples=[sample],
+                )
+
+            group.samples = (group.samples + [sample])[-settings.ISSUE_SAMPLE_LIMIT :]
+            for field, value in counters.items():
+                setattr(group, field, value)
+            group.save(update_fields=[*counters, "samples", "updated_at"])
+            group.refresh_from_db(fields=["occurrences"])
+            return group
+    except IntegrityError:
+        # Another worker created the group concurrently
+        IssueGroup.objects.filter(fingerprint=fingerprint).update(**counters)
+    return _lazy_group(fingerprint)
@@ -0,0 +1,71 @@
+"""
+Management command measuring the overhead of the sampling stack profiler
+
+Samples a busy thread at a realistic stack depth with StackSampler and
+reports the median cost of one sample and the share of the sampling
+interval it takes, to check the 2% overhead budget on the target host.
+"""
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitoring.sampler import StackSampler
+
+
+def nested(depth, stop_event):
+    if depth:
+        return nested(depth - 1, stop_event)
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class Command(BaseCommand):
+    help = "اندازه‌گیری سربار نمونه‌بردار پشته درخواست‌ها"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=60,
+            help="عمق پشته رشته نمونه‌برداری شده (پیش‌فرض: 60)",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=2000,
+            help="تعداد نمونه‌ها (پیش‌فرض: 2000)",
+        )
+
+    def handle(self, *args, **options):
+        interval = settings.STACK_SAMPLER_INTERVAL
+        sampler = StackSampler(interval)
+        stop_event = threading.Event()
+        worker = threading.Thread(
+            target=nested, args=(max(0, options["depth"]), stop_event)
+        )
+        worker.start()
+        # Register the worker directly so that only the timed calls sample it
+        sampler._targets[worker.ident] = Counter()
+
+        durations = []
+        try:
+            for _ in range(max(1, options["samples"])):
+                started = time.perf_counter()
+                sampler.sample_once()
+                durations.append(time.perf_counter() - started)
+        finally:
+            stop_event.set()
+            worker.join()
+
+        per_sample = statistics.median(durations)
+        share = per_sample / interval * 100
+        self.stdout.write(
+            f"هر نمونه: {per_sample * 1e6:.1f}µs  "
+            f"سربار در بازه {interval * 1000:.0f}ms: {share:.3f}%"
+        )
+        style = self.style.SUCCESS if share < 2 else self.style.ERROR
+        self.stdout.write(style("زیر بودجه ۲٪" if share < 2 else "بیش از بودجه ۲٪"))
@@ -1,10 +1,18 @@
 """
 Management command for log analysis and maintenance
 """
-from django.core.management.base import BaseCommand
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
 from django.utils import timezone
-from datetime import timedelta
-from monitoring.models import CodeLog
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta
+
+from monitoring import archive, facets
+from monitoring.exporters import EXPORT_FORMATS, export_logs
+from monitoring.models import CodeLog, IssueGroup
+from monitoring.retention import RetentionPolicy, apply_policy, run_retention
 
 
 class Command(BaseCommand):
@@ -20,8 +28,10 @@ class Command(BaseCommand):
         parser.add_argument(
             "--days",
             type=int,
-            default=30,
-            help="تعداد روزهای نگهداری لاگ (پیش‌فرض: 30)",
+            help=(
+                "تعداد روزهای نگهداری لاگ "
+                "(پیش‌فرض: 30 برای پاکسازی و LOG_ARCHIVE_AFTER_DAYS برای بایگانی)"
+            ),
         )
 
         parser.add_argument("--stats", action="store_true", help="نمایش آمار لاگ‌ها")
@@ -34,11 +44,86 @@ class Command(BaseCommand):
             "--unresolved", action="store_true", help="نمایش مسائل حل نشده"
         )
 
-        parser.add_argument("--export", type=str, help="صادرات لاگ‌ها به فایل CSV")
+        parser.add_argument(
+            "--export",
+            type=str,
+            help="صادرات لاگ‌ها به فایل (پسوند .gz فایل را فشرده می‌کند)",
+        )
+
+        parser.add_argument(
+            "--format",
+            choices=EXPORT_FORMATS,
+            default="csv",
+            help="قالب فایل صادراتی (پیش‌فرض: csv)",
+        )
+
+        parser.add_argument(
+            "--gzip", action="store_true", help="فشرده‌سازی فایل صادراتی با gzip"
+        )
+
+        parser.add_argument(
+            "--since", type=str, help="صادرات لاگ‌ها از این زمان (YYYY-MM-DD یا ISO)"
+        )
+
+        parser.add_argument(
+            "--until", type=str, help="صادرات لاگ‌ها تا این زمان (YYYY-MM-DD یا ISO)"
+        )
+
+        parser.add_argument(
+            "--level", type=str, help="فیلتر سطح لاگ (با کاما جدا کنید)"
+        )
+
+        parser.add_argument("--type", type=str, help="فیلتر نوع لاگ (با کاما جدا کنید)")
+
+        parser.add_argument("--module", type=str, help="فیلتر ماژول (با کاما جدا کنید)")
+
+        parser.add_argument(
+            "--retention",
+            action="store_true",
+            help="اعمال سیاست‌های نگهداری (لاگ‌ها، اعلان‌های منقضی، پیام‌های تماس)",
+        )
+
+        parser.add_argument(
+            "--archive",
+            action="store_true",
+            help="انتقال لاگ‌های قدیمی به بایگانی فشرده روی دیسک",
+        )
+
+        parser.add_argument(
+            "--search-archive",
+            action="store_true",
+            help="جستجو در بایگانی (با --since، --until، --level، --module و --contains)",
+        )
+
+        parser.add_argument(
+            "--contains", type=str, help="جستجوی متن در لاگ‌های بایگانی شده"
+        )
+
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="تعداد پردازه‌های موازی جستجوی بایگانی (پیش‌فرض: تعداد هسته‌ها)",
+        )
+
+        parser.add_argument(
+            "--rebuild-facets",
+            action="store_true",
+            help="بازسازی مقادیر فیلترهای پنل مدیریت لاگ از روی جدول",
+        )
 
     def handle(self, *args, **options):
         if options["cleanup"]:
-            self.cleanup_old_logs(options["days"])
+            self.cleanup_old_logs(options["days"] or 30)
+
+        if options["retention"]:
+            self.apply_retention()
+
+        if options["archive"]:
+            self.archive_old_logs(options["days"])
+
+        if options["search_archive"]:
+            self.search_archive(options)
 
         if options["stats"]:
             self.show_stats()
@@ -50,7 +135,10 @@ class Command(BaseCommand):
             self.show_unresolved_issues()
 
         if options["export"]:
-            self.export_logs(options["export"])
+            self.export_logs(options["export"], options)
+
+        if options["rebuild_facets"]:
+            self.rebuild_facets()
 
         if not any(
             [
@@ -59,6 +147,10 @@ class Command(BaseCommand):
                 options["critical"],
                 options["unresolved"],
                 options["export"],
+                options["rebuild_facets"],
+                options["retention"],
+                options["archive"],
+                options["search_archive"],
             ]
         ):
             self.show_help()
@@ -74,12 +166,14 @@ class Command(BaseCommand):
             is_resolved=False,
         ).count()
 
-        # Delete old non-critical logs
-        deleted_count = (
-            CodeLog.objects.filter(timestamp__lt=cutoff_date)
-            .exclude(level__in=["CRITICAL", "SECURITY", "EXCEPTION"], is_resolved=False)
-            .delete()[0]
+        # Delete old non-critical logs in small batches
+        policy = RetentionPolicy(
+            "log-manager-cleanup",
+            "monitoring.CodeLog",
+            Q(timestamp__lt=cutoff_date)
+            & ~Q(level__in=["CRITICAL", "SECURITY", "EXCEPTION"], is_resolved=False),
         )
+        deleted_count = apply_policy(policy).rows
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -88,6 +182,45 @@ class Command(BaseCommand):
             )
         )
 
+    def apply_retention(self):
+        """Run every configured retention policy and report what was purged"""
+        for report in run_retention():
+            line = f"{report.policy}: {report.rows} ردیف در {report.batches} دسته"
+            if report.bytes_estimate is not None:
+                line += f" (~{report.bytes_estimate // 1024} KB)"
+            if report.resumed_from is not None:
+                line += f"، ادامه از شناسه {report.resumed_from}"
+            self.stdout.write(line)
+        self.stdout.write(self.style.SUCCESS("✅ سیاست‌های نگهداری اعمال شد."))
+
+    def archive_old_logs(self, days):
+        """Move old logs to the compressed archive"""
+        archived, segments = archive.archive_logs(days=days)
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ {archived} لاگ در {segments} بخش بایگانی شد.")
+        )
+
+    def search_archive(self, options):
+        """Print archived logs matching the filters as NDJSON"""
+        rows = archive.search_archive(
+            since=self._parse_moment(options["since"]),
+            until=self._parse_moment(options["until"]),
+            levels=self._split(options["level"]),
+            modules=self._split(options["module"]),
+            contains=options["contains"],
+            workers=options["workers"],
+        )
+        for row in rows:
+            self.stdout.write(json.dumps(row, ensure_ascii=False))
+        self.stderr.write(f"{len(rows)} لاگ یافت شد.")
+
+    def rebuild_facets(self):
+        """Recompute the admin filter values from the log table"""
+        for field in facets.FACET_FIELDS:
+            values = facets.rebuild(field)
+            self.stdout.write(f"{field}: {len(values)} مقدار")
+        self.stdout.write(self.style.SUCCESS("✅ مقادیر فیلترها بازسازی شد."))
+
     def show_stats(self):
         """Show log statistics"""
         total_logs = CodeLog.objects.count()
@@ -114,9 +247,7 @@ class Command(BaseCommand):
         ).count()
 
         # Unresolved issues
-        unresolved = CodeLog.objects.filter(
-            level__in=["ERROR", "CRITICAL", "EXCEPTION"], is_resolved=False
-        ).count()
+        unresolved = IssueGroup.objects.filter(is_resolved=False).count()
 
         self.stdout.write(self.style.SUCCESS("📊 آمار لاگ‌های سیستم:"))
         self.stdout.write(f"  📝 کل لاگ‌ها: {total_logs}")
@@ -158,10 +289,8 @@ class Command(BaseCommand):
             self.stdout.write("")
 
     def show_unresolved_issues(self):
-        """Show unresolved issues"""
-        unresolved = CodeLog.objects.filter(
-            level__in=["ERROR", "CRITICAL", "EXCEPTION"], is_resolved=False
-        ).order_by("-timestamp")
+        """Show unresolved issue groups"""
+        unresolved = IssueGroup.objects.filter(is_resolved=False).order_by("-last_seen")
 
         if not unresolved:
             self.stdout.write(self.style.SUCCESS("✅ همه مسائل حل شده‌اند."))
@@ -171,58 +300,57 @@ class Command(BaseCommand):
             self.style.WARNING(f"⚠️  {unresolved.count()} مسئله حل نشده:")
         )
 
-        for log in unresolved:
+        for group in unresolved:
             self.stdout.write(
-                f'  🔴 [{log.timestamp.strftime("%Y-%m-%d %H:%M")}] '
-                f"{log.get_level_display()} - {log.module}.{log.method}"
+                f'  🔴 [{group.last_seen.strftime("%Y-%m-%d %H:%M")}] '
+                f"{group.level} - {group.module}.{group.method} "
+                f"- {group.occurrences} رخداد"
             )
-            self.stdout.write(f"     📝 {log.message}")
-            if log.exception_type:
-                self.stdout.write(f"     🐛 {log.exception_type}")
+            self.stdout.write(f"     📝 {group.title}")
+            self.stdout.write(f"     🐛 {group.exception_type}: {group.last_message}")
             self.stdout.write("")
 
-    def export_logs(self, filename):
-        """Export logs to CSV"""
-        import csv
-
-        logs = CodeLog.objects.all().order_by("-timestamp")[:1000]  # Last 1000 logs
-
-        with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-            fieldnames = [
-                "timestamp",
-                "level",
-                "log_type",
-                "module",
-                "method",
-                "message",
-                "user",
-                "duration",
-                "exception_type",
-                "is_resolved",
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-            writer.writeheader()
-            for log in logs:
-                writer.writerow(
-                    {
-                        "timestamp": log.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                        "level": log.get_level_display(),
-                        "log_type": log.get_log_type_display(),
-                        "module": log.module,
-                        "method": log.method,
-                        "message": log.message,
-                        "user": str(log.user) if log.user else "",
-                        "duration": log.duration or "",
-                        "exception_type": log.exception_type or "",
-                        "is_resolved": "بله" if log.is_resolved else "خیر",
-                    }
-                )
+    def export_logs(self, filename, options):
+        """Stream filtered logs to a CSV or NDJSON file"""
+        filters = {
+            "since": self._parse_moment(options["since"]),
+            "until": self._parse_moment(options["until"]),
+            "levels": self._split(options["level"]),
+            "log_types": self._split(options["type"]),
+            "modules": self._split(options["module"]),
+        }
+        compress = options["gzip"] or filename.endswith(".gz")
+
+        count = export_logs(
+            filename, fmt=options["format"], compress=compress, **filters
+        )
 
         self.stdout.write(
-            self.style.SUCCESS(f"✅ {logs.count()} لاگ به فایل {filename} صادر شد.")
+            self.style.SUCCESS(f"✅ {count} لاگ به فایل {filename} صادر شد.")
         )
 
+    @staticmethod
+    def _split(value):
+        """Split a comma separated option into a list"""
+        if not value:
+            return None
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    @staticmethod
+    def _parse_moment(value):
+        """Parse a date or datetime option into an aware datetime"""
+        if not value:
+            return None
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f"تاریخ نامعتبر: {value}")
+            moment = datetime.combine(day, time.min)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
     def show_help(self):
         """Show usage help"""
         self.stdout.write(self.style.SUCCESS("🔧 راهنمای استفاده از دستور log_manager:"))
@@ -239,5 +367,22 @@ class Command(BaseCommand):
         self.stdout.write("  🧹 پاکسازی لاگ‌های قدیمی:")
         self.stdout.write("    python manage.py log_manager --cleanup --days 30")
         self.stdout.write("")
+        self.stdout.write("  ♻️  اعمال سیاست‌های نگهداری:")
+        self.stdout.write("    python manage.py log_manager --retention")
+        self.stdout.write("")
+        self.stdout.write("  🗄️  بایگانی و جستجوی لاگ‌های قدیمی:")
+        self.stdout.write("    python manage.py log_manager --archive --days 90")
+        self.stdout.write(
+            "    python manage.py log_manager --search-archive "
+            "--since 2025-01-01 --until 2025-02-01 --level ERROR --contains OTP"
+        )
+        self.stdout.write("")
+        self.stdout.write("  🔄 بازسازی مقادیر فیلترهای پنل مدیریت:")
+        self.stdout.write("    python manage.py log_manager --rebuild-facets")
+        self.stdout.write("")
         self.stdout.write("  📤 صادرات لاگ‌ها:")
         self.stdout.write("    python manage.py log_manager --export logs.csv")
+        self.stdout.write(
+            "    python manage.py log_manager --export logs.ndjson.gz --format ndjson "
+            "--since 2025-01-01 --level ERROR,EXCEPTION"
+        )
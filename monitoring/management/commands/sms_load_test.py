@@ -0,0 +1,71 @@
+"""
+Management command load testing the SMS pipeline against the fake provider
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count, Max
+
+from monitoring.models import SmsDelivery
+from monitoring.sms import queue_sms
+
+
+class Command(BaseCommand):
+    help = "آزمون بار صف پیامک با سرویس‌دهنده آزمایشی (SMS_PROVIDER=fake)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=100, help="تعداد پیامک‌ها (پیش‌فرض: 100)"
+        )
+        parser.add_argument(
+            "--receptor", default="09120000000", help="شماره گیرنده آزمایشی"
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=300,
+            help="حداکثر ثانیه انتظار برای پایان ارسال‌ها",
+        )
+
+    def handle(self, *args, **options):
+        if settings.SMS_PROVIDER != "fake":
+            raise CommandError("آزمون بار فقط با SMS_PROVIDER=fake مجاز است")
+
+        started = time.monotonic()
+        ids = [
+            queue_sms(
+                options["receptor"], "otp", {"token": index}, purpose="load-test"
+            ).pk
+            for index in range(options["count"])
+        ]
+        queued_in = time.monotonic() - started
+        self.stdout.write(f"{len(ids)} پیامک در {queued_in:.2f} ثانیه در صف قرار گرفت")
+
+        deliveries = SmsDelivery.objects.filter(pk__in=ids)
+        deadline = started + options["timeout"]
+        while deliveries.filter(status=SmsDelivery.QUEUED).exists():
+            if time.monotonic() > deadline:
+                self.stdout.write(self.style.WARNING("مهلت انتظار به پایان رسید"))
+                break
+            time.sleep(0.5)
+        elapsed = time.monotonic() - started
+
+        summary = deliveries.aggregate(
+            avg_latency=Avg("latency"), max_latency=Max("latency")
+        )
+        by_status = dict(
+            deliveries.values_list("status").annotate(count=Count("id")).order_by()
+        )
+        sent = by_status.get(SmsDelivery.SENT, 0)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"ارسال شده: {sent}، ناموفق: {by_status.get(SmsDelivery.FAILED, 0)}، "
+                f"در صف: {by_status.get(SmsDelivery.QUEUED, 0)}"
+            )
+        )
+        self.stdout.write(
+            f"توان عملیاتی: {sent / elapsed:.1f} پیامک در ثانیه، "
+            f"میانگین پاسخ: {(summary['avg_latency'] or 0) * 1000:.1f}ms، "
+            f"بیشینه: {(summary['max_latency'] or 0) * 1000:.1f}ms"
+        )
@@ -0,0 +1,232 @@
+"""
+Prometheus metrics for requests, database, cache and Celery tasks
+
+Under gunicorn every worker writes its samples into PROMETHEUS_MULTIPROC_DIR
+(see gunicorn.conf.py) and the /metrics view aggregates them across workers.
+Celery workers run in their own containers, so with METRICS_WORKER_PORT set
+each worker serves the samples of its pool processes (Celery task metrics
+among them) on that port, see config/celery.py.
+"""
+import glob
+import os
+import time
+
+from celery.signals import task_postrun, task_prerun
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client import multiprocess
+
+# Request latency buckets tuned for an API whose slow threshold is 2 seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# HDR-style 1-2-5 buckets per decade, 100us .. 50s, for function timings
+FUNCTION_BUCKETS = tuple(
+    round(mantissa * 10**exponent, 6)
+    for exponent in range(-4, 2)
+    for mantissa in (1, 2, 5)
+)
+
+REQUEST_LATENCY = Histogram(
+    "django_http_request_duration_seconds",
+    "HTTP request latency by resolved view",
+    ["view", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REQUESTS_IN_PROGRESS = Gauge(
+    "django_http_requests_in_progress",
+    "HTTP requests currently being processed",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_QUERIES = Histogram(
+    "django_db_queries_per_request",
+    "Number of database queries executed per request",
+    ["view"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+
+DB_QUERY_DURATION = Histogram(
+    "django_db_query_duration_seconds",
+    "Total database time spent per request",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_CONNECTIONS = Counter(
+    "django_db_connections_total",
+    "Database connections taken by requests and tasks: opened, checked out "
+    "of a pool (pooled) or kept from an earlier request (reused)",
+    ["alias", "state"],
+)
+
+DB_CONNECTION_WAIT = Histogram(
+    "django_db_connection_wait_seconds",
+    "Time to obtain a database connection by source (connect or pool)",
+    ["alias", "source"],
+    buckets=FUNCTION_BUCKETS,
+)
+
+CACHE_REQUESTS = Counter(
+    "django_cache_requests_total",
+    "Cache lookups by result",
+    ["result"],
+)
+
+CACHED_REQUESTS = Counter(
+    "cache_namespace_requests_total",
+    "Lookups of common.cache.cached functions by namespace and result "
+    "(hit, miss, early recomputation, wait for another caller)",
+    ["namespace", "result"],
+)
+
+FUNCTION_LATENCY = Histogram(
+    "function_duration_seconds",
+    "Runtime of functions instrumented with monitoring.utils.log_performance",
+    ["function"],
+    buckets=FUNCTION_BUCKETS,
+)
+
+FUNCTION_CALLS = Counter(
+    "function_calls_total",
+    "Calls of instrumented functions by outcome",
+    ["function", "outcome"],
+)
+
+LOG_PAYLOAD_BYTES = Counter(
+    "codelog_payload_bytes_total",
+    "CodeLog context and traceback bytes before (raw) and after (stored) "
+    "truncation and compression",
+    ["stage"],
+)
+
+SMS_DELIVERIES = Counter(
+    "sms_deliveries_total",
+    "SMS send attempts by provider and outcome (sent, failed, retry)",
+    ["provider", "status"],
+)
+
+SMS_SEND_DURATION = Histogram(
+    "sms_send_duration_seconds",
+    "Latency of SMS provider calls",
+    ["provider"],
+    buckets=LATENCY_BUCKETS,
+)
+
+THROTTLE_REJECTIONS = Counter(
+    "throttle_rejections_total",
+    "Requests rejected by common.throttling by scope",
+    ["scope"],
+)
+
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task runtime by task name and final state",
+    ["task", "state"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def record_cache_access(hit):
+    """Count a cache lookup as a hit or a miss"""
+    CACHE_REQUESTS.labels(result="hit" if hit else "miss").inc()
+
+
+def resolve_view_name(request):
+    """Low-cardinality view label for a request"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match._func_path
+
+
+def metrics_registry():
+    """Registry of the current process or, in multiprocess mode, all workers"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics():
+    """Return (payload, content_type) for the current process or all workers"""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def start_worker_metrics_server(port):
+    """
+    Serve a Celery worker's metrics over HTTP on ``port``. Prefork pool
+    processes write into PROMETHEUS_MULTIPROC_DIR, which is emptied first so
+    samples of a previous run are not served again.
+    """
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+    start_http_server(port, registry=metrics_registry())
+
+
+class QueryCounter:
+    """``connection.execute_wrapper`` hook that counts queries and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+# Database connection reuse
+@receiver(connection_created, weak=False)
+def _on_connection_created(sender, connection=None, **kwargs):
+    state = "pooled" if getattr(connection, "uses_pool", False) else "opened"
+    DB_CONNECTIONS.labels(alias=connection.alias, state=state).inc()
+
+
+@receiver(request_started, weak=False)
+def _on_request_started(**kwargs):
+    # Runs after close_old_connections, so what is still open is reused
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            DB_CONNECTIONS.labels(alias=connection.alias, state="reused").inc()
+
+
+# Celery task timing
+_task_started = {}
+
+
+@task_prerun.connect(weak=False)
+def _on_task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect(weak=False)
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    CELERY_TASK_DURATION.labels(task=task.name, state=state or "UNKNOWN").observe(
+        time.perf_counter() - started
+    )
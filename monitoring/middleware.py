@@ -3,10 +3,19 @@ Enhanced Logging Middleware for comprehensive monitoring
 """
 import time
 import json
+import random
+from contextlib import ExitStack
+
+import psutil
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
+from django.db import connections
 from django.http import Http404
-from monitoring.models import CodeLog
+from monitoring import metrics, tracing
+from monitoring.context import current_request, current_request_id, current_view
+from monitoring.models import CodeLog, RequestProfile
+from monitoring.sampler import format_collapsed, get_sampler
+from monitoring.sql import RequestSQLProfiler
 
 
 class EnhancedLoggingMiddleware(MiddlewareMixin):
@@ -73,9 +82,9 @@ class EnhancedLoggingMiddleware(MiddlewareMixin):
         if hasattr(request, "_start_time"):
             duration = time.time() - request._start_time
 
-            # Log slow requests (> 2 seconds)
-            if duration > 2.0:
-                CodeLog.log_performance(
+            # Log slow requests (> SLOW_REQUEST_THRESHOLD seconds)
+            if duration > settings.SLOW_REQUEST_THRESHOLD:
+                request._performance_log = CodeLog.log_performance(
                     module="middleware",
                     method="process_response",
                     message=f"درخواست کند: {request.path} - {duration:.2f} ثانیه",
@@ -166,6 +175,221 @@ class EnhancedLoggingMiddleware(MiddlewareMixin):
         return None
 
 
+class RequestIDMiddleware:
+    """
+    Middleware to give every request a correlation id and a trace
+
+    The id comes from a valid X-Request-ID header or is generated, is
+    returned in the response header, recorded on CodeLog rows and sent to
+    Celery tasks. The request and its database queries are traced as spans.
+    """
+
+    header = "HTTP_X_REQUEST_ID"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = (
+            tracing.clean_request_id(request.META.get(self.header))
+            or tracing.new_request_id()
+        )
+        request.request_id = request_id
+        id_token = current_request_id.set(request_id)
+        trace, trace_token = tracing.start_trace(request_id)
+        root = tracing.open_span(
+            f"{request.method} {request.path}", kind="http", method=request.method
+        )
+        status = 500
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(tracing.QuerySpanWrapper())
+                    )
+                response = self.get_response(request)
+            status = response.status_code
+            response["X-Request-ID"] = request_id
+            return response
+        finally:
+            root.attributes.update(
+                {"view": metrics.resolve_view_name(request), "status": status}
+            )
+            duration = root.finish(error=status >= 500)
+            tracing.finish_trace(trace, trace_token, duration)
+            current_request_id.reset(id_token)
+
+
+class MetricsMiddleware:
+    """
+    Middleware to feed Prometheus request latency, in-flight and DB metrics
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = metrics.QueryCounter()
+        in_progress = metrics.REQUESTS_IN_PROGRESS.labels(method=request.method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status = 500
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+
+            view = metrics.resolve_view_name(request)
+            metrics.REQUEST_LATENCY.labels(
+                view=view, method=request.method, status=str(status)
+            ).observe(duration)
+            metrics.DB_QUERIES.labels(view=view).observe(counter.count)
+            metrics.DB_QUERY_DURATION.labels(view=view).observe(counter.duration)
+
+
+class RequestContextMiddleware:
+    """
+    Middleware to publish the running request and its resolved view through
+    monitoring.context so tools outside the view layer can attribute work
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_view.set(None)
+        request_token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(request_token)
+            current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_view.set(metrics.resolve_view_name(request))
+
+
+class SQLProfilerMiddleware:
+    """
+    Middleware to profile the SQL of a sample of requests and record
+    probable N+1 query patterns
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SQL_PROFILER_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profiler = RequestSQLProfiler()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profiler))
+            response = self.get_response(request)
+
+        request.sql_profile = profiler
+        offenders = profiler.n_plus_one_offenders()
+        if offenders:
+            self.record_offenders(request, response, profiler, offenders)
+
+        return response
+
+    def record_offenders(self, request, response, profiler, offenders):
+        """Store one performance log per request with repeated queries"""
+        view = metrics.resolve_view_name(request)
+        worst = offenders[0]
+
+        CodeLog.log_message(
+            level="PERFORMANCE",
+            log_type="DATABASE",
+            module="middleware",
+            method=view,
+            message=f"احتمال N+1 در {view}: {worst['count']} تکرار یک کوئری",
+            duration=profiler.duration,
+            cpu_usage=psutil.cpu_percent(interval=None),
+            memory_usage=psutil.virtual_memory().percent,
+            context={
+                "view": view,
+                "status_code": response.status_code,
+                "query_count": profiler.count,
+                "db_time": profiler.duration,
+                "threshold": profiler.threshold,
+                "offenders": offenders,
+            },
+            request=request,
+            tags=f"performance,n_plus_one,{request.method}",
+        )
+
+
+class StackSamplerMiddleware:
+    """
+    Middleware to sample the stack of requests while they run and keep the
+    profile of those slower than SLOW_REQUEST_THRESHOLD
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.STACK_SAMPLER_ENABLED:
+            return self.get_response(request)
+
+        sampler = get_sampler(settings.STACK_SAMPLER_INTERVAL)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            samples = sampler.stop()
+
+        duration = time.perf_counter() - start
+        if duration > settings.SLOW_REQUEST_THRESHOLD and samples:
+            self.save_profile(request, response, duration, samples)
+        return response
+
+    def save_profile(self, request, response, duration, samples):
+        """Attach the profile to the slow request log, creating it if needed"""
+        view = metrics.resolve_view_name(request)
+        log = getattr(request, "_performance_log", None)
+        if log is None:
+            log = CodeLog.log_message(
+                level="PERFORMANCE",
+                log_type="PERFORMANCE",
+                module="middleware",
+                method="stack_sampler",
+                message=f"درخواست کند: {request.path} - {duration:.2f} ثانیه",
+                duration=duration,
+                cpu_usage=psutil.cpu_percent(interval=None),
+                memory_usage=psutil.virtual_memory().percent,
+                context={
+                    "path": request.path,
+                    "method": request.method,
+                    "view": view,
+                    "status_code": response.status_code,
+                },
+                request=request,
+                tags=f"performance,slow_request,profile,{request.method}",
+            )
+
+        RequestProfile.objects.create(
+            log=log,
+            view=view,
+            duration=duration,
+            interval=settings.STACK_SAMPLER_INTERVAL,
+            sample_count=sum(samples.values()),
+            collapsed_stacks=format_collapsed(samples),
+        )
+
+
 class SecurityLoggingMiddleware(MiddlewareMixin):
     """
     Middleware to log security-related events
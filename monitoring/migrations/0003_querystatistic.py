@@ -0,0 +1,114 @@
+# Generated by Django 4.2.23 on 2026-10-19 00:35
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0002_alter_codelog_options_codelog_exception_message_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueryStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="هش کوئری نرمال\u200cشده",
+                        max_length=16,
+                        verbose_name="شناسه کوئری",
+                    ),
+                ),
+                (
+                    "view",
+                    models.CharField(
+                        help_text="نام نما یا تسک Celery که کوئری را اجرا کرده است",
+                        max_length=200,
+                        verbose_name="نمای فراخوان",
+                    ),
+                ),
+                (
+                    "sql",
+                    models.TextField(
+                        help_text="متن کوئری بدون مقادیر ثابت",
+                        verbose_name="کوئری نرمال\u200cشده",
+                    ),
+                ),
+                ("calls", models.BigIntegerField(default=0, verbose_name="تعداد اجرا")),
+                (
+                    "total_time",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="مجموع زمان اجرا به ثانیه",
+                        verbose_name="زمان کل",
+                    ),
+                ),
+                (
+                    "p95_time",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="تخمین صدک ۹۵ زمان اجرا به ثانیه",
+                        verbose_name="صدک ۹۵ زمان",
+                    ),
+                ),
+                (
+                    "rows",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="مجموع ردیف\u200cهای برگشتی یا تغییر یافته",
+                        verbose_name="تعداد ردیف\u200cها",
+                    ),
+                ),
+                (
+                    "histogram",
+                    models.JSONField(
+                        default=list,
+                        help_text="تعداد اجرا در هر بازه زمانی لگاریتمی",
+                        verbose_name="هیستوگرام زمان",
+                    ),
+                ),
+                (
+                    "last_seen",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="آخرین اجرا"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "آمار کوئری",
+                "verbose_name_plural": "آمار کوئری\u200cها",
+                "ordering": ["-total_time"],
+                "indexes": [
+                    models.Index(
+                        fields=["-total_time"], name="monitoring__total_t_1ea762_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="querystatistic",
+            constraint=models.UniqueConstraint(
+                fields=("fingerprint", "view"), name="unique_query_statistic"
+            ),
+        ),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 4.2.23 on 2026-10-19 00:37
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0003_querystatistic"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueGroup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="هش نوع استثنا و فریم\u200cهای بالایی traceback",
+                        max_length=40,
+                        unique=True,
+                        verbose_name="اثر انگشت",
+                    ),
+                ),
+                (
+                    "level",
+                    models.CharField(
+                        default="EXCEPTION",
+                        help_text="سطح آخرین رخداد",
+                        max_length=15,
+                        verbose_name="سطح لاگ",
+                    ),
+                ),
+                (
+                    "exception_type",
+                    models.CharField(max_length=100, verbose_name="نوع استثنا"),
+                ),
+                ("module", models.CharField(max_length=100, verbose_name="ماژول")),
+                (
+                    "method",
+                    models.CharField(blank=True, max_length=100, verbose_name="متد"),
+                ),
+                (
+                    "title",
+                    models.CharField(
+                        help_text="پیام اولین رخداد",
+                        max_length=255,
+                        verbose_name="عنوان",
+                    ),
+                ),
+                (
+                    "last_message",
+                    models.TextField(
+                        blank=True,
+                        help_text="پیام استثنای آخرین رخداد",
+                        verbose_name="آخرین پیام",
+                    ),
+                ),
+                (
+                    "traceback_info",
+                    models.TextField(
+                        blank=True,
+                        help_text="traceback اولین رخداد",
+                        verbose_name="جزئیات traceback",
+                    ),
+                ),
+                (
+                    "occurrences",
+                    models.BigIntegerField(default=1, verbose_name="تعداد رخداد"),
+                ),
+                (
+                    "first_seen",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="اولین رخداد"
+                    ),
+                ),
+                (
+                    "last_seen",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="آخرین رخداد"
+                    ),
+                ),
+                (
+                    "samples",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="حلقه محدود از آخرین رخدادهای نمونه\u200cبرداری شده",
+                        verbose_name="نمونه رخدادها",
+                    ),
+                ),
+                (
+                    "is_resolved",
+                    models.BooleanField(
+                        default=False,
+                        help_text="آیا این مسئله حل شده است؟",
+                        verbose_name="حل شده",
+                    ),
+                ),
+                (
+                    "resolved_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="زمان حل"),
+                ),
+                (
+                    "resolution_note",
+                    models.TextField(
+                        blank=True,
+                        help_text="توضیحات مربوط به حل مسئله",
+                        null=True,
+                        verbose_name="یادداشت حل مسئله",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "گروه استثنا",
+                "verbose_name_plural": "گروه\u200cهای استثنا",
+                "ordering": ["-last_seen"],
+                "indexes": [
+                    models.Index(
+                        fields=["is_resolved", "-last_seen"],
+                        name="monitoring__is_reso_b96146_idx",
+                    ),
+                    models.Index(
+                        fields=["exception_type"], name="monitoring__excepti_04b243_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.23 on 2026-10-19 00:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0004_issuegroup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "view",
+                    models.CharField(blank=True, max_length=200, verbose_name="نما"),
+                ),
+                (
+                    "duration",
+                    models.FloatField(
+                        help_text="زمان اجرا به ثانیه", verbose_name="مدت اجرا"
+                    ),
+                ),
+                (
+                    "interval",
+                    models.FloatField(
+                        help_text="فاصله نمونه\u200cها به ثانیه",
+                        verbose_name="فاصله نمونه\u200cبرداری",
+                    ),
+                ),
+                (
+                    "sample_count",
+                    models.PositiveIntegerField(verbose_name="تعداد نمونه"),
+                ),
+                (
+                    "collapsed_stacks",
+                    models.TextField(
+                        help_text="قالب collapsed قابل استفاده در flamegraph.pl و speedscope",
+                        verbose_name="پشته\u200cهای فشرده",
+                    ),
+                ),
+                (
+                    "log",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="profile",
+                        to="monitoring.codelog",
+                        verbose_name="لاگ عملکرد",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "پروفایل درخواست",
+                "verbose_name_plural": "پروفایل\u200cهای درخواست",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.23 on 2026-10-19 00:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0005_requestprofile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="codelog",
+            name="request_id",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="شناسه همبستگی درخواست یا تسک؛ برای دنبال کردن ردپای آن",
+                max_length=64,
+                null=True,
+                verbose_name="شناسه درخواست",
+            ),
+        ),
+        migrations.CreateModel(
+            name="TraceSpan",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "trace_id",
+                    models.CharField(
+                        help_text="همان شناسه درخواست ثبت شده روی لاگ\u200cها",
+                        max_length=64,
+                        verbose_name="شناسه ردپا",
+                    ),
+                ),
+                ("span_id", models.CharField(max_length=16, verbose_name="شناسه بازه")),
+                (
+                    "parent_id",
+                    models.CharField(
+                        blank=True,
+                        max_length=16,
+                        null=True,
+                        verbose_name="شناسه بازه والد",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, verbose_name="نام")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("http", "درخواست HTTP"),
+                            ("celery", "تسک Celery"),
+                            ("db", "کوئری پایگاه داده"),
+                            ("sms", "ارسال پیامک"),
+                            ("internal", "داخلی"),
+                        ],
+                        default="internal",
+                        max_length=10,
+                        verbose_name="نوع",
+                    ),
+                ),
+                ("start_time", models.DateTimeField(verbose_name="زمان شروع")),
+                (
+                    "duration",
+                    models.FloatField(
+                        help_text="زمان اجرا به ثانیه", verbose_name="مدت اجرا"
+                    ),
+                ),
+                ("is_error", models.BooleanField(default=False, verbose_name="خطا")),
+                (
+                    "attributes",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="جزئیات بازه",
+                        verbose_name="ویژگی\u200cها",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "بازه ردپا",
+                "verbose_name_plural": "بازه\u200cهای ردپا",
+                "ordering": ["-start_time"],
+                "indexes": [
+                    models.Index(
+                        fields=["trace_id", "start_time"],
+                        name="monitoring__trace_i_519f36_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.23 on 2026-10-19 01:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0007_codelog_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="codelog",
+            name="compressed_payload",
+            field=models.BinaryField(
+                help_text="زمینه یا traceback بزرگ که به صورت فشرده (zlib) ذخیره شده است",
+                null=True,
+                verbose_name="داده فشرده",
+            ),
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 4.2.23 on 2026-10-19 01:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0008_codelog_compressed_payload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SmsDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("receptor", models.CharField(max_length=20, verbose_name="گیرنده")),
+                (
+                    "template",
+                    models.CharField(
+                        help_text="نام قالب پیامک در سرویس\u200cدهنده",
+                        max_length=100,
+                        verbose_name="قالب",
+                    ),
+                ),
+                (
+                    "tokens",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="پس از ارسال یا شکست نهایی پاک می\u200cشوند",
+                        verbose_name="مقادیر قالب",
+                    ),
+                ),
+                (
+                    "purpose",
+                    models.CharField(
+                        blank=True,
+                        help_text="مثلاً otp یا notification",
+                        max_length=50,
+                        verbose_name="کاربرد",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "در صف"),
+                            ("sent", "ارسال شده"),
+                            ("failed", "ناموفق"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                        verbose_name="وضعیت",
+                    ),
+                ),
+                (
+                    "provider",
+                    models.CharField(
+                        blank=True, max_length=20, verbose_name="سرویس\u200cدهنده"
+                    ),
+                ),
+                (
+                    "provider_message_id",
+                    models.CharField(
+                        blank=True,
+                        max_length=50,
+                        verbose_name="شناسه پیام در سرویس\u200cدهنده",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="تعداد تلاش"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="آخرین خطا")),
+                (
+                    "latency",
+                    models.FloatField(
+                        blank=True,
+                        help_text="به ثانیه",
+                        null=True,
+                        verbose_name="زمان پاسخ",
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="زمان ارسال"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ارسال پیامک",
+                "verbose_name_plural": "ارسال\u200cهای پیامک",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="monitoring__status_686dfe_idx",
+                    ),
+                    models.Index(
+                        fields=["receptor"], name="monitoring__recepto_e85460_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
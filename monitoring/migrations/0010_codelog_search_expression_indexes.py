@@ -0,0 +1,64 @@
+# Trigram indexes matching the CodeLog admin search on PostgreSQL
+#
+# The admin searches with icontains, which Django emits as
+# UPPER("col"::text) LIKE UPPER(%s): only an index on that very expression
+# can serve it, so the plain column indexes of 0007 are replaced.
+
+from django.db import migrations
+
+OLD_INDEXES = {
+    "monitoring_codelog_message_trgm": "message",
+    "monitoring_codelog_request_path_trgm": "request_path",
+}
+
+SEARCH_INDEXES = {
+    "monitoring_codelog_module_upper_trgm": "module",
+    "monitoring_codelog_method_upper_trgm": "method",
+    "monitoring_codelog_message_upper_trgm": "message",
+    "monitoring_codelog_exc_message_upper_trgm": "exception_message",
+    "monitoring_codelog_request_path_upper_trgm": "request_path",
+    "monitoring_codelog_tags_upper_trgm": "tags",
+}
+
+
+def create_index(schema_editor, name, expression):
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+        f"ON monitoring_codelog USING gin ({expression} gin_trgm_ops)"
+    )
+
+
+def drop_index(schema_editor, name):
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in SEARCH_INDEXES.items():
+        create_index(schema_editor, name, f"(UPPER({column}::text))")
+    for name in OLD_INDEXES:
+        drop_index(schema_editor, name)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column in OLD_INDEXES.items():
+        create_index(schema_editor, name, column)
+    for name in SEARCH_INDEXES:
+        drop_index(schema_editor, name)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("monitoring", "0009_smsdelivery"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
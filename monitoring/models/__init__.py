@@ -1 +1,4 @@
 from .observability import *
+from .performance import *
+from .issues import *
+from .sms import *
@@ -0,0 +1,85 @@
+"""
+Issue Models grouping recurring exceptions
+"""
+from django.db import models
+from django.utils import timezone
+
+from common.models import BaseModel
+
+
+class IssueGroup(BaseModel):
+    """One row per distinct exception, counting its occurrences"""
+
+    fingerprint = models.CharField(
+        max_length=40,
+        unique=True,
+        verbose_name="اثر انگشت",
+        help_text="هش نوع استثنا و فریم‌های بالایی traceback",
+    )
+
+    level = models.CharField(
+        max_length=15,
+        default="EXCEPTION",
+        verbose_name="سطح لاگ",
+        help_text="سطح آخرین رخداد",
+    )
+
+    exception_type = models.CharField(max_length=100, verbose_name="نوع استثنا")
+
+    module = models.CharField(max_length=100, verbose_name="ماژول")
+
+    method = models.CharField(max_length=100, blank=True, verbose_name="متد")
+
+    title = models.CharField(
+        max_length=255, verbose_name="عنوان", help_text="پیام اولین رخداد"
+    )
+
+    last_message = models.TextField(
+        blank=True, verbose_name="آخرین پیام", help_text="پیام استثنای آخرین رخداد"
+    )
+
+    traceback_info = models.TextField(
+        blank=True,
+        verbose_name="جزئیات traceback",
+        help_text="traceback اولین رخداد",
+    )
+
+    occurrences = models.BigIntegerField(default=1, verbose_name="تعداد رخداد")
+
+    first_seen = models.DateTimeField(default=timezone.now, verbose_name="اولین رخداد")
+
+    last_seen = models.DateTimeField(default=timezone.now, verbose_name="آخرین رخداد")
+
+    samples = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="نمونه رخدادها",
+        help_text="حلقه محدود از آخرین رخدادهای نمونه‌برداری شده",
+    )
+
+    is_resolved = models.BooleanField(
+        default=False, verbose_name="حل شده", help_text="آیا این مسئله حل شده است؟"
+    )
+
+    resolved_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان حل")
+
+    resolution_note = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name="یادداشت حل مسئله",
+        help_text="توضیحات مربوط به حل مسئله",
+    )
+
+    class Meta:
+        verbose_name = "گروه استثنا"
+        verbose_name_plural = "گروه‌های استثنا"
+        indexes = [
+            models.Index(fields=["is_resolved", "-last_seen"]),
+            models.Index(fields=["exception_type"]),
+        ]
+        ordering = ["-last_seen"]
+
+    def __str__(self):
+        return (
+            f"{self.exception_type} - {self.module}.{self.method} ({self.occurrences})"
+        )
@@ -1,11 +1,14 @@
 import psutil
-import traceback
 import sys
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.contrib.auth import get_user_model
 
 from common.models import BaseModel
+from monitoring.context import current_request_id
+from monitoring.payloads import USER_AGENT_MAX_LENGTH, pack, unpack
 
 
 class CodeLog(BaseModel):
@@ -91,6 +94,13 @@ class CodeLog(BaseModel):
         help_text="اطلاعات کامل traceback",
     )
 
+    compressed_payload = models.BinaryField(
+        null=True,
+        editable=False,
+        verbose_name="داده فشرده",
+        help_text="زمینه یا traceback بزرگ که به صورت فشرده (zlib) ذخیره شده است",
+    )
+
     # Request information
     request_path = models.CharField(
         max_length=500,
@@ -119,6 +129,15 @@ class CodeLog(BaseModel):
         help_text="اطلاعات مرورگر کاربر",
     )
 
+    request_id = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        db_index=True,
+        verbose_name="شناسه درخواست",
+        help_text="شناسه همبستگی درخواست یا تسک؛ برای دنبال کردن ردپای آن",
+    )
+
     # Timing and performance
     timestamp = models.DateTimeField(
         auto_now_add=True, verbose_name="زمان ثبت", help_text="زمان ثبت لاگ"
@@ -209,6 +228,20 @@ class CodeLog(BaseModel):
         }
         return severity_map.get(self.level, 2)
 
+    @cached_property
+    def _overflow(self):
+        return unpack(self.compressed_payload)
+
+    @property
+    def full_context(self):
+        """Context including the part stored compressed"""
+        return self._overflow.get("context", self.context)
+
+    @property
+    def full_traceback(self):
+        """Traceback including the part stored compressed"""
+        return self._overflow.get("traceback_info", self.traceback_info)
+
     @classmethod
     def log_message(
         cls,
@@ -228,7 +261,30 @@ class CodeLog(BaseModel):
     ):
         """
         Enhanced utility method for comprehensive logging with exception handling.
+
+        Entries carrying an exception are counted on their IssueGroup, which is
+        returned, instead of creating one CodeLog per occurrence.
         """
+        if exception:
+            from monitoring.issues import record_exception
+
+            # Auto-set level to EXCEPTION if not already error-level
+            if level not in ["ERROR", "CRITICAL", "EXCEPTION"]:
+                level = "EXCEPTION"
+            if request and not user and hasattr(request, "user"):
+                if request.user.is_authenticated:
+                    user = request.user
+            return record_exception(
+                level,
+                module,
+                method,
+                message,
+                exception,
+                context=context,
+                request=request,
+                user=user,
+            )
+
         # Auto-detect system usage if not provided
         if cpu_usage is None or memory_usage is None:
             auto_cpu, auto_memory = cls._get_system_usage()
@@ -245,34 +301,18 @@ class CodeLog(BaseModel):
             request_path = request.path
             request_method = request.method
             ip_address = cls._get_client_ip(request)
-            user_agent = request.META.get("HTTP_USER_AGENT", "")
+            user_agent = request.META.get("HTTP_USER_AGENT", "")[:USER_AGENT_MAX_LENGTH]
             # Get user from request if not provided
             if not user and hasattr(request, "user") and request.user.is_authenticated:
                 user = request.user
 
-        # Handle exception information
-        exception_type = None
-        exception_message = None
-        traceback_info = None
-
-        if exception:
-            exception_type = type(exception).__name__
-            exception_message = str(exception)
-            traceback_info = traceback.format_exc()
-            # Auto-set level to EXCEPTION if not already error-level
-            if level not in ["ERROR", "CRITICAL", "EXCEPTION"]:
-                level = "EXCEPTION"
-            # Auto-set log_type
-            if log_type == "SYSTEM":
-                log_type = "EXCEPTION"
-
-        return cls.objects.create(
+        log = cls.objects.create(
+            request_id=current_request_id.get(),
             level=level,
             log_type=log_type,
             module=module,
             method=method,
             message=message,
-            context=context,
             user=user,
             duration=duration,
             cpu_usage=cpu_usage,
@@ -281,12 +321,15 @@ class CodeLog(BaseModel):
             request_method=request_method,
             ip_address=ip_address,
             user_agent=user_agent,
-            exception_type=exception_type,
-            exception_message=exception_message,
-            traceback_info=traceback_info,
             tags=tags,
+            **pack(context),
         )
 
+        from monitoring.facets import remember
+
+        remember([log])
+        return log
+
     @staticmethod
     def _get_client_ip(request):
         """Extract client IP address from request"""
@@ -444,7 +487,7 @@ class CodeLog(BaseModel):
         user=None,
         tags=None,
     ):
-        """Log exceptions with full traceback information"""
+        """Log exceptions, grouped by fingerprint into an IssueGroup"""
         return cls.log_message(
             "EXCEPTION",
             module,
@@ -643,8 +686,14 @@ class Notification(BaseModel):
             self.send_dashboard_notification()
 
     def send_sms(self):
-        # Logic to send SMS (e.g., through an API)
-        pass
+        from monitoring.sms import queue_sms
+
+        return queue_sms(
+            self.user.phone,
+            settings.NOTIFICATION_SMS_TEMPLATE,
+            {"token10": self.title},
+            purpose="notification",
+        )
 
     def send_dashboard_notification(self):
         # Logic to show notification in user dashboard
@@ -654,8 +703,14 @@ class Notification(BaseModel):
         """
         Marks the notification as read.
         """
+        from monitoring.fanout import adjust_unread
+
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True
+        )
         self.is_read = True
-        self.save()
+        if updated:
+            adjust_unread([self.user_id], -1)
 
     @property
     def is_expired(self):
@@ -0,0 +1,170 @@
+"""
+Performance Models for aggregated query statistics
+"""
+from django.db import models
+from django.utils import timezone
+
+from common.models import BaseModel
+
+
+class QueryStatistic(BaseModel):
+    """Aggregated timings of one normalized SQL statement per calling view"""
+
+    fingerprint = models.CharField(
+        max_length=16, verbose_name="شناسه کوئری", help_text="هش کوئری نرمال‌شده"
+    )
+
+    view = models.CharField(
+        max_length=200,
+        verbose_name="نمای فراخوان",
+        help_text="نام نما یا تسک Celery که کوئری را اجرا کرده است",
+    )
+
+    sql = models.TextField(
+        verbose_name="کوئری نرمال‌شده", help_text="متن کوئری بدون مقادیر ثابت"
+    )
+
+    calls = models.BigIntegerField(default=0, verbose_name="تعداد اجرا")
+
+    total_time = models.FloatField(
+        default=0.0, verbose_name="زمان کل", help_text="مجموع زمان اجرا به ثانیه"
+    )
+
+    p95_time = models.FloatField(
+        default=0.0,
+        verbose_name="صدک ۹۵ زمان",
+        help_text="تخمین صدک ۹۵ زمان اجرا به ثانیه",
+    )
+
+    rows = models.BigIntegerField(
+        default=0,
+        verbose_name="تعداد ردیف‌ها",
+        help_text="مجموع ردیف‌های برگشتی یا تغییر یافته",
+    )
+
+    histogram = models.JSONField(
+        default=list,
+        verbose_name="هیستوگرام زمان",
+        help_text="تعداد اجرا در هر بازه زمانی لگاریتمی",
+    )
+
+    last_seen = models.DateTimeField(default=timezone.now, verbose_name="آخرین اجرا")
+
+    class Meta:
+        verbose_name = "آمار کوئری"
+        verbose_name_plural = "آمار کوئری‌ها"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fingerprint", "view"], name="unique_query_statistic"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["-total_time"]),
+        ]
+        ordering = ["-total_time"]
+
+    def __str__(self):
+        return f"{self.view} - {self.fingerprint}"
+
+    @property
+    def mean_time(self):
+        """Average execution time in seconds"""
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class RequestProfile(BaseModel):
+    """Sampled stack profile of a slow request, in collapsed-stack format"""
+
+    log = models.OneToOneField(
+        "monitoring.CodeLog",
+        on_delete=models.CASCADE,
+        related_name="profile",
+        verbose_name="لاگ عملکرد",
+    )
+
+    view = models.CharField(max_length=200, blank=True, verbose_name="نما")
+
+    duration = models.FloatField(
+        verbose_name="مدت اجرا", help_text="زمان اجرا به ثانیه"
+    )
+
+    interval = models.FloatField(
+        verbose_name="فاصله نمونه‌برداری", help_text="فاصله نمونه‌ها به ثانیه"
+    )
+
+    sample_count = models.PositiveIntegerField(verbose_name="تعداد نمونه")
+
+    collapsed_stacks = models.TextField(
+        verbose_name="پشته‌های فشرده",
+        help_text="قالب collapsed قابل استفاده در flamegraph.pl و speedscope",
+    )
+
+    class Meta:
+        verbose_name = "پروفایل درخواست"
+        verbose_name_plural = "پروفایل‌های درخواست"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.view} - {self.duration:.2f}s"
+
+    def top_frames(self, limit=10):
+        """Innermost frames weighted by samples, hottest first"""
+        totals = {}
+        for line in self.collapsed_stacks.splitlines():
+            stack, _, count = line.rpartition(" ")
+            leaf = stack.rsplit(";", 1)[-1]
+            totals[leaf] = totals.get(leaf, 0) + int(count)
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class TraceSpan(BaseModel):
+    """Timed unit of work inside a request or task trace"""
+
+    KIND_CHOICES = [
+        ("http", "درخواست HTTP"),
+        ("celery", "تسک Celery"),
+        ("db", "کوئری پایگاه داده"),
+        ("sms", "ارسال پیامک"),
+        ("internal", "داخلی"),
+    ]
+
+    trace_id = models.CharField(
+        max_length=64,
+        verbose_name="شناسه ردپا",
+        help_text="همان شناسه درخواست ثبت شده روی لاگ‌ها",
+    )
+
+    span_id = models.CharField(max_length=16, verbose_name="شناسه بازه")
+
+    parent_id = models.CharField(
+        max_length=16, blank=True, null=True, verbose_name="شناسه بازه والد"
+    )
+
+    name = models.CharField(max_length=200, verbose_name="نام")
+
+    kind = models.CharField(
+        max_length=10, choices=KIND_CHOICES, default="internal", verbose_name="نوع"
+    )
+
+    start_time = models.DateTimeField(verbose_name="زمان شروع")
+
+    duration = models.FloatField(
+        verbose_name="مدت اجرا", help_text="زمان اجرا به ثانیه"
+    )
+
+    is_error = models.BooleanField(default=False, verbose_name="خطا")
+
+    attributes = models.JSONField(
+        default=dict, blank=True, verbose_name="ویژگی‌ها", help_text="جزئیات بازه"
+    )
+
+    class Meta:
+        verbose_name = "بازه ردپا"
+        verbose_name_plural = "بازه‌های ردپا"
+        indexes = [
+            models.Index(fields=["trace_id", "start_time"]),
+        ]
+        ordering = ["-start_time"]
+
+    def __str__(self):
+        return f"{self.name} - {self.duration * 1000:.1f}ms"
@@ -0,0 +1,86 @@
+"""
+SMS delivery records written by the asynchronous dispatch pipeline
+"""
+from django.db import models
+
+from common.models import BaseModel
+
+
+class SmsDelivery(BaseModel):
+    """One queued SMS and the outcome of sending it"""
+
+    QUEUED = "queued"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "در صف"),
+        (SENT, "ارسال شده"),
+        (FAILED, "ناموفق"),
+    ]
+
+    receptor = models.CharField(max_length=20, verbose_name="گیرنده")
+
+    template = models.CharField(
+        max_length=100, verbose_name="قالب", help_text="نام قالب پیامک در سرویس‌دهنده"
+    )
+
+    tokens = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="مقادیر قالب",
+        help_text="پس از ارسال یا شکست نهایی پاک می‌شوند",
+    )
+
+    purpose = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="کاربرد",
+        help_text="مثلاً otp یا notification",
+    )
+
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=QUEUED, verbose_name="وضعیت"
+    )
+
+    provider = models.CharField(max_length=20, blank=True, verbose_name="سرویس‌دهنده")
+
+    provider_message_id = models.CharField(
+        max_length=50, blank=True, verbose_name="شناسه پیام در سرویس‌دهنده"
+    )
+
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="تعداد تلاش")
+
+    error = models.TextField(blank=True, verbose_name="آخرین خطا")
+
+    latency = models.FloatField(
+        null=True, blank=True, verbose_name="زمان پاسخ", help_text="به ثانیه"
+    )
+
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="زمان ارسال")
+
+    class Meta:
+        verbose_name = "ارسال پیامک"
+        verbose_name_plural = "ارسال‌های پیامک"
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["receptor"]),
+        ]
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.template} - {self.receptor} ({self.get_status_display()})"
+
+    @property
+    def masked_tokens(self):
+        """Template tokens with their values hidden"""
+        return {key: "*" * len(str(value)) for key, value in self.tokens.items()}
+
+    @property
+    def params(self):
+        """Kavenegar verify_lookup parameters of this message"""
+        return {
+            "receptor": self.receptor,
+            "template": self.template,
+            "type": "sms",
+            **self.tokens,
+        }
@@ -0,0 +1,20 @@
+"""
+Notification URLs
+"""
+from django.urls import path
+
+from monitoring import views
+
+app_name = "notifications"
+
+urlpatterns = [
+    path("", views.NotificationListView.as_view(), name="list"),
+    path(
+        "unread-count/",
+        views.NotificationUnreadCountView.as_view(),
+        name="unread-count",
+    ),
+    path("read-all/", views.NotificationMarkAllReadView.as_view(), name="read-all"),
+    path("<int:pk>/read/", views.NotificationMarkReadView.as_view(), name="read"),
+    path("fan-out/", views.NotificationFanOutView.as_view(), name="fan-out"),
+]
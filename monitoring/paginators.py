@@ -0,0 +1,42 @@
+"""
+Paginator for very large tables in the admin
+"""
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator that never counts more than ``count_limit`` rows
+
+    An unfiltered queryset on PostgreSQL is sized from the planner statistics
+    (pg_class.reltuples); anything else is counted with a LIMIT so a broad
+    filter costs at most ``count_limit`` index entries. Pages past the limit
+    need a narrower filter.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        estimate = self._estimate(queryset)
+        if estimate is not None and estimate > self.count_limit:
+            return estimate
+        return queryset.order_by().values("pk")[: self.count_limit].count()
+
+    @staticmethod
+    def _estimate(queryset):
+        if queryset.query.where:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
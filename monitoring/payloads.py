@@ -0,0 +1,114 @@
+"""
+Size control for CodeLog payloads
+
+Every context stored on a log entry passes through ``sanitize``: values of
+sensitive keys are redacted, strings are truncated to LOG_PAYLOAD_MAX_STRING
+characters, lists and dicts to LOG_PAYLOAD_MAX_ITEMS entries and nesting to
+LOG_PAYLOAD_MAX_DEPTH levels. ``pack`` then moves a context or traceback
+larger than LOG_PAYLOAD_COMPRESS_THRESHOLD bytes into the zlib-compressed
+``compressed_payload`` column; CodeLog.full_context and full_traceback read
+it back transparently.
+"""
+import json
+import zlib
+
+from django.conf import settings
+
+from monitoring.metrics import LOG_PAYLOAD_BYTES
+
+REDACTED = "[REDACTED]"
+TRUNCATED = "…[truncated {} chars]"
+USER_AGENT_MAX_LENGTH = 512
+COMPRESSION_LEVEL = 6
+
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False, default=str).encode()
+
+
+def _is_sensitive(key):
+    key = str(key).lower()
+    return any(marker in key for marker in settings.LOG_PAYLOAD_REDACT_KEYS)
+
+
+def sanitize(value, depth=0):
+    """Return a redacted, size-bounded, JSON-friendly copy of ``value``"""
+    max_items = settings.LOG_PAYLOAD_MAX_ITEMS
+
+    if isinstance(value, str):
+        limit = settings.LOG_PAYLOAD_MAX_STRING
+        if len(value) > limit:
+            return value[:limit] + TRUNCATED.format(len(value) - limit)
+        return value
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if depth >= settings.LOG_PAYLOAD_MAX_DEPTH:
+        return sanitize(repr(value), depth)
+
+    if isinstance(value, dict):
+        result = {}
+        for index, (key, item) in enumerate(value.items()):
+            if index >= max_items:
+                result["…"] = f"{len(value) - max_items} more keys"
+                break
+            result[str(key)] = (
+                REDACTED if _is_sensitive(key) else sanitize(item, depth + 1)
+            )
+        return result
+    if isinstance(value, (list, tuple, set)):
+        items = [sanitize(item, depth + 1) for item in list(value)[:max_items]]
+        if len(value) > max_items:
+            items.append(f"… {len(value) - max_items} more items")
+        return items
+    return sanitize(str(value), depth)
+
+
+def pack(context=None, traceback_info=None):
+    """
+    Prepare payload fields for a CodeLog row.
+
+    Returns a dict with ``context``, ``traceback_info`` and
+    ``compressed_payload``; the parts larger than the threshold move into the
+    latter and the context keeps only the list of its top-level keys.
+    """
+    context = sanitize(context) if context is not None else None
+    threshold = settings.LOG_PAYLOAD_COMPRESS_THRESHOLD
+
+    context_bytes = _encode(context) if context else b""
+    traceback_bytes = traceback_info.encode() if traceback_info else b""
+    raw_size = len(context_bytes) + len(traceback_bytes)
+
+    overflow = {}
+    if len(context_bytes) > threshold:
+        overflow["context"] = context
+        context = {"compressed": True}
+        if isinstance(overflow["context"], dict):
+            context["keys"] = list(overflow["context"])[:20]
+    if len(traceback_bytes) > threshold:
+        overflow["traceback_info"] = traceback_info
+        traceback_info = None
+
+    compressed = None
+    stored_size = raw_size
+    if overflow:
+        compressed = zlib.compress(_encode(overflow), COMPRESSION_LEVEL)
+        stored_size = (
+            len(compressed)
+            + len(_encode(context) if context else b"")
+            + len(traceback_info.encode() if traceback_info else b"")
+        )
+
+    LOG_PAYLOAD_BYTES.labels(stage="raw").inc(raw_size)
+    LOG_PAYLOAD_BYTES.labels(stage="stored").inc(stored_size)
+    return {
+        "context": context,
+        "traceback_info": traceback_info,
+        "compressed_payload": compressed,
+    }
+
+
+def unpack(compressed_payload):
+    """Decompress the overflow dict written by ``pack``"""
+    if not compressed_payload:
+        return {}
+    return json.loads(zlib.decompress(bytes(compressed_payload)))
@@ -0,0 +1,202 @@
+"""
+Process-wide SQL statistics, an application level pg_stat_statements
+
+Every query executed in the process is normalized and aggregated per
+(fingerprint, calling view) in memory. Aggregates are flushed into
+QueryStatistic rows every SQL_STATS_FLUSH_INTERVAL seconds, at the end of a
+request or Celery task, so the hot path never writes to the database.
+"""
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from monitoring.context import current_view
+from monitoring.sql import fingerprint, normalize_sql
+
+# Log-spaced latency bucket upper bounds in seconds: 0.1ms .. ~29s
+BUCKET_BOUNDS = tuple(0.0001 * 1.5**i for i in range(32))
+
+# Indexes into an aggregate entry: [calls, total_time, rows, buckets]
+CALLS, TOTAL_TIME, ROWS, BUCKETS = range(4)
+
+
+@lru_cache(maxsize=4096)
+def _normalize(sql):
+    """Django emits parametrized SQL, so most statements hit this cache"""
+    normalized = normalize_sql(sql)
+    return fingerprint(normalized), normalized
+
+
+def percentile(buckets, fraction):
+    """Approximate percentile (upper bucket bound) from bucket counts"""
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    threshold = total * fraction
+    running = 0
+    for bound, count in zip(BUCKET_BOUNDS, buckets):
+        running += count
+        if running >= threshold:
+            return bound
+    return BUCKET_BOUNDS[-1]
+
+
+def merge_buckets(left, right):
+    return [a + b for a, b in zip(left, right)]
+
+
+class QueryStatsCollector:
+    """Thread-safe in-memory aggregate of query timings"""
+
+    def __init__(self, max_entries=None, flush_interval=None):
+        self.max_entries = max_entries or settings.SQL_STATS_MAX_FINGERPRINTS
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else settings.SQL_STATS_FLUSH_INTERVAL
+        )
+        self.entries = {}
+        self.statements = {}
+        self.dropped = 0
+        self.last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(self._local, "paused", False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            cursor = context.get("cursor")
+            rows = getattr(cursor, "rowcount", 0) or 0
+            self.record(sql, time.perf_counter() - start, max(rows, 0))
+
+    def record(self, sql, duration, rows=0, view=None):
+        key_fingerprint, normalized = _normalize(sql)
+        key = (key_fingerprint, view or current_view.get() or "-")
+        bucket = min(bisect_left(BUCKET_BOUNDS, duration), len(BUCKET_BOUNDS) - 1)
+
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                if len(self.entries) >= self.max_entries:
+                    self.dropped += 1
+                    return
+                entry = self.entries[key] = [0, 0.0, 0, [0] * len(BUCKET_BOUNDS)]
+                self.statements.setdefault(key_fingerprint, normalized)
+            entry[CALLS] += 1
+            entry[TOTAL_TIME] += duration
+            entry[ROWS] += rows
+            entry[BUCKETS][bucket] += 1
+
+    def drain(self):
+        """Take the pending aggregates, leaving the collector empty"""
+        with self._lock:
+            entries, statements = self.entries, self.statements
+            self.entries, self.statements = {}, {}
+            self.last_flush = time.monotonic()
+        return entries, statements
+
+    def flush_if_due(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Merge the pending aggregates into QueryStatistic rows"""
+        from monitoring.models import QueryStatistic
+
+        entries, statements = self.drain()
+        if not entries:
+            return 0
+
+        self._local.paused = True
+        try:
+            with transaction.atomic():
+                self._merge(QueryStatistic, entries, statements)
+        except IntegrityError:
+            # Another worker created one of the rows first; retry next time
+            self._requeue(entries, statements)
+            return 0
+        finally:
+            self._local.paused = False
+        return len(entries)
+
+    def _merge(self, model, entries, statements):
+        now = timezone.now()
+        existing = {
+            (stat.fingerprint, stat.view): stat
+            for stat in model.objects.select_for_update().filter(
+                fingerprint__in={key[0] for key in entries}
+            )
+        }
+
+        to_update, to_create = [], []
+        for key, entry in entries.items():
+            stat = existing.get(key)
+            if stat is None:
+                stat = model(
+                    fingerprint=key[0],
+                    view=key[1],
+                    sql=statements.get(key[0], ""),
+                    histogram=[0] * len(BUCKET_BOUNDS),
+                )
+                to_create.append(stat)
+            else:
+                to_update.append(stat)
+            stat.calls += entry[CALLS]
+            stat.total_time += entry[TOTAL_TIME]
+            stat.rows += entry[ROWS]
+            stat.histogram = merge_buckets(stat.histogram, entry[BUCKETS])
+            stat.p95_time = percentile(stat.histogram, 0.95)
+            stat.last_seen = now
+
+        model.objects.bulk_create(to_create)
+        model.objects.bulk_update(
+            to_update,
+            ["calls", "total_time", "rows", "histogram", "p95_time", "last_seen"],
+        )
+
+    def _requeue(self, entries, statements):
+        with self._lock:
+            for key, entry in entries.items():
+                current = self.entries.get(key)
+                if current is None:
+                    self.entries[key] = entry
+                    continue
+                current[CALLS] += entry[CALLS]
+                current[TOTAL_TIME] += entry[TOTAL_TIME]
+                current[ROWS] += entry[ROWS]
+                current[BUCKETS] = merge_buckets(current[BUCKETS], entry[BUCKETS])
+            for key, sql in statements.items():
+                self.statements.setdefault(key, sql)
+
+
+_collector = None
+
+
+def get_collector():
+    global _collector
+    if _collector is None:
+        _collector = QueryStatsCollector()
+    return _collector
+
+
+def install(connection, **kwargs):
+    """``connection_created`` receiver wrapping every new DB connection"""
+    collector = get_collector()
+    if collector not in connection.execute_wrappers:
+        connection.execute_wrappers.append(collector)
+
+
+def flush_if_due(**kwargs):
+    """``request_finished`` / ``task_postrun`` receiver"""
+    if _collector is not None:
+        _collector.flush_if_due()
@@ -0,0 +1,211 @@
+"""
+Retention engine deleting old rows in bounded batches
+
+Each policy names a model and a filter of the rows to purge. Matching rows
+are deleted by primary key ranges of at most ``batch_size`` rows, each batch
+in its own short transaction with a pause in between, so the database never
+holds long locks or loads a whole table into memory. Progress is
+checkpointed in the cache after every batch; an interrupted run resumes
+from the last checkpoint.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from monitoring.fanout import invalidate_unread_of
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Rows of ``model`` ("app_label.Model") matching ``condition`` expire.
+    ``before_delete`` is called with the queryset of each batch, inside its
+    transaction, just before the batch is deleted.
+    """
+
+    name: str
+    model: str
+    condition: Q
+    batch_size: int = None
+    before_delete: Callable = None
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def queryset(self):
+        return self.get_model()._base_manager.filter(self.condition)
+
+
+@dataclass
+class RetentionReport:
+    policy: str
+    rows: int = 0
+    batches: int = 0
+    bytes_estimate: int = None
+    resumed_from: int = None
+    duration: float = 0.0
+    details: dict = field(default_factory=dict)
+
+
+def default_policies(now=None):
+    """Policies configured by the *_RETENTION_DAYS settings"""
+    now = now or timezone.now()
+    policies = [
+        RetentionPolicy(
+            f"codelog-{level.lower()}",
+            "monitoring.CodeLog",
+            Q(level=level, timestamp__lt=now - timedelta(days=days)),
+        )
+        for level, days in settings.CODELOG_RETENTION_DAYS.items()
+    ]
+    policies.append(
+        RetentionPolicy(
+            "notification-expired",
+            "monitoring.Notification",
+            Q(expiration_date__lt=now),
+            before_delete=invalidate_unread_of,
+        )
+    )
+    policies.append(
+        RetentionPolicy(
+            "trace-span",
+            "monitoring.TraceSpan",
+            Q(created_at__lt=now - timedelta(days=settings.TRACE_SPAN_RETENTION_DAYS)),
+        )
+    )
+    policies.append(
+        RetentionPolicy(
+            "query-statistic",
+            "monitoring.QueryStatistic",
+            Q(
+                last_seen__lt=now
+                - timedelta(days=settings.QUERY_STATISTIC_RETENTION_DAYS)
+            ),
+        )
+    )
+    policies.append(
+        RetentionPolicy(
+            "request-profile",
+            "monitoring.RequestProfile",
+            Q(
+                created_at__lt=now
+                - timedelta(days=settings.REQUEST_PROFILE_RETENTION_DAYS)
+            ),
+        )
+    )
+    policies.append(
+        RetentionPolicy(
+            "issuegroup-resolved",
+            "monitoring.IssueGroup",
+            Q(
+                is_resolved=True,
+                last_seen__lt=now
+                - timedelta(days=settings.RESOLVED_ISSUE_RETENTION_DAYS),
+            ),
+        )
+    )
+    policies.append(
+        RetentionPolicy(
+            "sms-delivery",
+            "monitoring.SmsDelivery",
+            Q(
+                created_at__lt=now
+                - timedelta(days=settings.SMS_DELIVERY_RETENTION_DAYS)
+            ),
+        )
+    )
+    policies.append(
+        RetentionPolicy(
+            "contactus",
+            "info.ContactUs",
+            Q(created_at__lt=now - timedelta(days=settings.CONTACT_US_RETENTION_DAYS)),
+        )
+    )
+    return policies
+
+
+def _checkpoint_key(policy):
+    return f"monitoring:retention:{policy.name}"
+
+
+def average_row_bytes(model):
+    """Average on-disk row size from PostgreSQL statistics, else None"""
+    connection = connections["default"]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_total_relation_size(oid), reltuples FROM pg_class "
+            "WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if not row or row[1] <= 0:
+        return None
+    return int(row[0] / row[1])
+
+
+def apply_policy(policy, batch_size=None, sleep=None, max_batches=None):
+    """
+    Delete the rows expired by ``policy`` and return a RetentionReport.
+    ``max_batches`` stops early (leaving the checkpoint for the next run).
+    """
+    batch_size = batch_size or policy.batch_size or settings.RETENTION_BATCH_SIZE
+    sleep = settings.RETENTION_BATCH_SLEEP if sleep is None else sleep
+    queryset = policy.queryset()
+    key = _checkpoint_key(policy)
+
+    report = RetentionReport(policy=policy.name)
+    started = time.monotonic()
+    cursor = cache.get(key)
+    if cursor is not None:
+        report.resumed_from = cursor
+        queryset_from = queryset.filter(pk__gte=cursor)
+    else:
+        queryset_from = queryset
+
+    while True:
+        if max_batches is not None and report.batches >= max_batches:
+            break
+        pks = list(
+            queryset_from.order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            cache.delete(key)
+            break
+
+        with transaction.atomic():
+            batch = queryset.filter(pk__gte=pks[0], pk__lte=pks[-1])
+            if policy.before_delete is not None:
+                policy.before_delete(batch)
+            _, per_model = batch.delete()
+        report.rows += per_model.get(policy.get_model()._meta.label, 0)
+        report.batches += 1
+        for label, count in per_model.items():
+            report.details[label] = report.details.get(label, 0) + count
+
+        cache.set(key, pks[-1] + 1, timeout=None)
+        queryset_from = queryset.filter(pk__gt=pks[-1])
+        if sleep and len(pks) == batch_size:
+            time.sleep(sleep)
+
+    row_bytes = average_row_bytes(policy.get_model())
+    if row_bytes is not None:
+        report.bytes_estimate = row_bytes * report.rows
+    report.duration = time.monotonic() - started
+    return report
+
+
+def run_retention(policies=None, **options):
+    """Apply every policy (the defaults when none are given) in order"""
+    return [
+        apply_policy(policy, **options) for policy in policies or default_policies()
+    ]
@@ -0,0 +1,103 @@
+"""
+Low-overhead sampling stack profiler for requests
+
+A single daemon thread per process wakes up every STACK_SAMPLER_INTERVAL
+seconds while at least one request is being profiled, reads the stack of
+each registered worker thread through ``sys._current_frames()`` and counts
+it in collapsed form ("outer;...;inner"), the input format of flamegraph.pl
+and speedscope. The thread sleeps on an event when nothing is registered.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Deepest frames kept per sample; deeper stacks are cut at the root side
+MAX_STACK_DEPTH = 128
+
+
+class StackSampler:
+    """Process-wide sampler collecting stacks of registered threads"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._labels = {}
+        self._thread = None
+
+    def start(self, thread_id=None):
+        """Begin sampling ``thread_id`` (defaults to the calling thread)"""
+        thread_id = thread_id or threading.get_ident()
+        samples = Counter()
+        with self._lock:
+            self._targets[thread_id] = samples
+            self._ensure_thread()
+            self._wakeup.set()
+        return samples
+
+    def stop(self, thread_id=None):
+        """Stop sampling ``thread_id`` and return its collapsed stack counts"""
+        thread_id = thread_id or threading.get_ident()
+        with self._lock:
+            samples = self._targets.pop(thread_id, Counter())
+            if not self._targets:
+                self._wakeup.clear()
+        return samples
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="monitoring-stack-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            self.sample_once()
+
+    def sample_once(self):
+        with self._lock:
+            targets = dict(self._targets)
+        if not targets:
+            return
+
+        frames = sys._current_frames()
+        for thread_id, samples in targets.items():
+            frame = frames.get(thread_id)
+            if frame is not None:
+                samples[self._collapse(frame)] += 1
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            self._labels[code] = label
+        return label
+
+    def _collapse(self, frame):
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+
+def format_collapsed(samples):
+    """Render stack counts as flamegraph-compatible collapsed text"""
+    return "\n".join(f"{stack} {count}" for stack, count in samples.most_common())
+
+
+_sampler = None
+
+
+def get_sampler(interval):
+    global _sampler
+    if _sampler is None:
+        _sampler = StackSampler(interval)
+    return _sampler
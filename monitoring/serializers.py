@@ -0,0 +1,66 @@
+"""
+Monitoring Serializers
+"""
+from rest_framework import serializers
+
+from festival.models import FestivalFormat
+from monitoring.models import Notification
+from province.models import Province
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Notification of the authenticated user"""
+
+    class Meta:
+        model = Notification
+        fields = [
+            "id",
+            "title",
+            "message",
+            "channel",
+            "priority",
+            "is_read",
+            "timestamp",
+            "expiration_date",
+        ]
+        read_only_fields = fields
+
+
+class NotificationFanOutSerializer(serializers.Serializer):
+    """Notification sent to registrants of a festival format and/or province"""
+
+    title = serializers.CharField(max_length=100)
+    message = serializers.CharField()
+    channel = serializers.ChoiceField(
+        choices=Notification.CHANNEL_CHOICES, default="dashboard"
+    )
+    priority = serializers.ChoiceField(
+        choices=Notification.PRIORITY_CHOICES, default="low"
+    )
+    expiration_date = serializers.DateTimeField(required=False, allow_null=True)
+    festival_format = serializers.SlugRelatedField(
+        slug_field="code",
+        queryset=FestivalFormat.objects.all(),
+        required=False,
+        allow_null=True,
+    )
+    province = serializers.PrimaryKeyRelatedField(
+        queryset=Province.objects.all(), required=False, allow_null=True
+    )
+
+    def validate(self, attrs):
+        if not attrs.get("festival_format") and not attrs.get("province"):
+            raise serializers.ValidationError(
+                "حداقل یکی از قالب جشنواره یا استان باید مشخص شود"
+            )
+        return attrs
+
+    def task_options(self):
+        """Validated data in the JSON-friendly form the Celery task expects"""
+        data = dict(self.validated_data)
+        for field in ("festival_format", "province"):
+            if data.get(field) is not None:
+                data[field] = data[field].pk
+        if data.get("expiration_date"):
+            data["expiration_date"] = data["expiration_date"].isoformat()
+        return data
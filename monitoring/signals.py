@@ -0,0 +1,82 @@
+"""
+Monitoring signal receivers
+"""
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+
+from monitoring import query_stats, tracing
+from monitoring.context import (
+    current_request_id,
+    current_span_id,
+    current_trace,
+    current_view,
+)
+
+_task_view_tokens = {}
+_task_traces = {}
+
+
+@before_task_publish.connect(weak=False, dispatch_uid="monitoring_task_headers")
+def add_trace_headers(headers=None, **kwargs):
+    """Send the request id and current span along with every task"""
+    if headers is None:
+        return
+    request_id = current_request_id.get()
+    if request_id:
+        headers.setdefault("request_id", request_id)
+        headers.setdefault("parent_span_id", current_span_id.get())
+
+
+def _task_header(task, name):
+    value = getattr(task.request, name, None)
+    if value is None:
+        value = (getattr(task.request, "headers", None) or {}).get(name)
+    return value
+
+
+@task_prerun.connect(weak=False, dispatch_uid="monitoring_task_context")
+def set_task_context(task_id=None, task=None, **kwargs):
+    """Attribute work done inside a Celery task to that task"""
+    if task is None:
+        return
+    _task_view_tokens[task_id] = current_view.set(f"celery:{task.name}")
+
+    # Eager tasks run inside the caller's trace; others continue it by id
+    trace = trace_token = id_token = span_token = None
+    if current_trace.get() is None:
+        request_id = tracing.clean_request_id(_task_header(task, "request_id"))
+        request_id = request_id or tracing.new_request_id()
+        id_token = current_request_id.set(request_id)
+        trace, trace_token = tracing.start_trace(request_id)
+        span_token = current_span_id.set(_task_header(task, "parent_span_id"))
+    task_span = tracing.open_span(f"celery {task.name}", kind="celery", task_id=task_id)
+    _task_traces[task_id] = (task_span, trace, trace_token, id_token, span_token)
+
+
+@task_postrun.connect(weak=False, dispatch_uid="monitoring_task_context_reset")
+def reset_task_context(task_id=None, state=None, **kwargs):
+    token = _task_view_tokens.pop(task_id, None)
+    if token is not None:
+        current_view.reset(token)
+
+    traced = _task_traces.pop(task_id, None)
+    if traced is not None:
+        task_span, trace, trace_token, id_token, span_token = traced
+        duration = task_span.finish(error=state == "FAILURE")
+        if trace is not None:
+            current_span_id.reset(span_token)
+            tracing.finish_trace(trace, trace_token, duration)
+            current_request_id.reset(id_token)
+    if settings.SQL_STATS_ENABLED:
+        query_stats.flush_if_due()
+
+
+if settings.SQL_STATS_ENABLED:
+    connection_created.connect(
+        query_stats.install, weak=False, dispatch_uid="monitoring_query_stats"
+    )
+    request_finished.connect(
+        query_stats.flush_if_due, weak=False, dispatch_uid="monitoring_query_flush"
+    )
@@ -0,0 +1,175 @@
+"""
+Asynchronous SMS dispatch
+
+``queue_sms`` records an SmsDelivery row and, once the surrounding
+transaction commits, hands it to the ``monitoring.send_sms`` task on the
+SMS_QUEUE queue, so no request or transaction waits on the provider. Run a
+dedicated worker for that queue with ``--concurrency=1``; the task rate
+limit (SMS_RATE_LIMIT) then matches the provider throughput.
+
+Network failures are retried with exponential backoff and jitter, and a
+circuit breaker shared through the cache stops calling the provider for
+SMS_BREAKER_RESET_TIMEOUT seconds after SMS_BREAKER_THRESHOLD consecutive
+failures; one probe is let through afterwards. Errors reported by the
+provider itself (invalid receptor, no credit, ...) are final.
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from kavenegar import APIException, HTTPException
+
+from monitoring.metrics import SMS_DELIVERIES, SMS_SEND_DURATION
+from monitoring.models import SmsDelivery
+
+
+class CircuitOpen(Exception):
+    """The provider is failing; calls are suspended until ``retry_after``"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"circuit open for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker whose state lives in the shared cache"""
+
+    def __init__(self, name, threshold=None, reset_timeout=None):
+        self.name = name
+        self.threshold = threshold or settings.SMS_BREAKER_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.SMS_BREAKER_RESET_TIMEOUT
+
+    def _key(self, suffix):
+        return f"monitoring:sms:breaker:{self.name}:{suffix}"
+
+    def before_call(self):
+        """Raise CircuitOpen unless a call may go through"""
+        opened_until = cache.get(self._key("open_until"))
+        if opened_until is None:
+            return
+        remaining = opened_until - time.time()
+        if remaining > 0:
+            raise CircuitOpen(remaining)
+        # Half-open: a single probe decides whether the circuit closes
+        if not cache.add(self._key("probe"), 1, timeout=self.reset_timeout):
+            raise CircuitOpen(self.reset_timeout)
+
+    def record_success(self):
+        cache.delete_many(
+            [self._key("failures"), self._key("open_until"), self._key("probe")]
+        )
+
+    def record_failure(self):
+        key = self._key("failures")
+        cache.add(key, 0, timeout=self.reset_timeout * 10)
+        failures = cache.incr(key)
+        if failures >= self.threshold:
+            cache.set(
+                self._key("open_until"),
+                time.time() + self.reset_timeout,
+                timeout=self.reset_timeout * 10,
+            )
+            cache.delete(self._key("probe"))
+        return failures
+
+
+def retry_delay(retries):
+    """Exponential backoff with full jitter for the given retry number"""
+    ceiling = min(
+        settings.SMS_RETRY_BACKOFF_MAX, settings.SMS_RETRY_BACKOFF * 2**retries
+    )
+    return random.uniform(0, ceiling)
+
+
+def queue_sms(receptor, template, tokens, purpose=""):
+    """Record an SMS and send it in the background after commit"""
+    from monitoring.tasks import send_sms_task
+
+    delivery = SmsDelivery.objects.create(
+        receptor=receptor,
+        template=template,
+        tokens={key: str(value) for key, value in tokens.items()},
+        purpose=purpose,
+        provider=settings.SMS_PROVIDER,
+    )
+    transaction.on_commit(
+        lambda: send_sms_task.apply_async(args=[delivery.pk], queue=settings.SMS_QUEUE)
+    )
+    return delivery
+
+
+def _finish(delivery, status, error=""):
+    delivery.status = status
+    delivery.error = error
+    # Tokens may hold one-time codes; keep them only while a send is pending
+    delivery.tokens = {}
+    delivery.save()
+    SMS_DELIVERIES.labels(provider=delivery.provider, status=status).inc()
+
+
+def deliver_sms(delivery):
+    """
+    Send one queued SmsDelivery. Returns it once final (sent, or rejected
+    by the provider); raises CircuitOpen or HTTPException when the attempt
+    should be retried.
+    """
+    from notifications import KavenegarSMS
+
+    breaker = CircuitBreaker(delivery.provider or settings.SMS_PROVIDER)
+    breaker.before_call()
+
+    sms = KavenegarSMS()
+    sms.params = delivery.params
+    delivery.attempts += 1
+    started = time.perf_counter()
+    try:
+        entries, error = sms.deliver(), None
+    except (APIException, HTTPException) as e:
+        entries, error = None, e
+    delivery.latency = time.perf_counter() - started
+    SMS_SEND_DURATION.labels(provider=delivery.provider).observe(delivery.latency)
+
+    if isinstance(error, HTTPException):
+        breaker.record_failure()
+        delivery.error = str(error)
+        delivery.save(update_fields=["attempts", "error", "latency", "updated_at"])
+        raise error
+    if error is not None:
+        # The provider answered, so it is up; the message itself was refused
+        breaker.record_success()
+        _finish(delivery, SmsDelivery.FAILED, str(error))
+        return delivery
+
+    breaker.record_success()
+    entry = entries[0] if entries else {}
+    delivery.provider_message_id = str(entry.get("messageid", ""))
+    delivery.sent_at = timezone.now()
+    _finish(delivery, SmsDelivery.SENT)
+    return delivery
+
+
+def give_up(delivery, error):
+    """Mark a delivery failed after its last retry"""
+    _finish(delivery, SmsDelivery.FAILED, str(error))
+    return delivery
+
+
+def expire_stale_deliveries(max_age=None):
+    """
+    Fail deliveries queued for more than ``max_age`` seconds (a lost task,
+    a stopped worker) and erase their tokens; returns how many there were.
+    """
+    max_age = settings.SMS_TOKEN_MAX_AGE if max_age is None else max_age
+    return SmsDelivery.objects.filter(
+        status=SmsDelivery.QUEUED,
+        created_at__lt=timezone.now() - timedelta(seconds=max_age),
+    ).update(
+        status=SmsDelivery.FAILED,
+        tokens={},
+        error="ارسال نشد و منقضی شد",
+        updated_at=timezone.now(),
+    )
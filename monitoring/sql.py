@@ -0,0 +1,106 @@
+"""
+SQL normalization and per-request query profiling
+"""
+import hashlib
+import os
+import re
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%s|\?|\$\d+")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES\s*\(.*\)", re.IGNORECASE | re.DOTALL)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Frames from these paths are noise when locating the code behind a query
+_IGNORED_FRAME_PATHS = (
+    os.sep + "site-packages" + os.sep,
+    os.sep + "dist-packages" + os.sep,
+    os.path.join("monitoring", "sql.py"),
+    os.path.join("monitoring", "middleware.py"),
+)
+
+
+def normalize_sql(sql):
+    """
+    Strip literals and parameter placeholders so that queries differing only
+    in their values share the same text.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _VALUES_RE.sub("VALUES (...)", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql):
+    """Short stable identifier for a normalized statement"""
+    return hashlib.sha1(normalized_sql.encode("utf-8")).hexdigest()[:16]
+
+
+def application_stack(limit=8):
+    """Innermost project frames of the current stack, formatted for storage"""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-1]
+        if not any(path in frame.filename for path in _IGNORED_FRAME_PATHS)
+    ]
+    return traceback.format_list(frames[-limit:])
+
+
+class RequestSQLProfiler:
+    """
+    ``connection.execute_wrapper`` hook collecting query count, total time
+    and fingerprint repetitions for a single request.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = (
+            threshold
+            if threshold is not None
+            else settings.SQL_PROFILER_N_PLUS_ONE_THRESHOLD
+        )
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self._record(sql)
+
+    def _record(self, sql):
+        normalized = normalize_sql(sql)
+        key = fingerprint(normalized)
+        self.fingerprints[key] += 1
+        if key not in self.statements:
+            self.statements[key] = normalized
+        if self.fingerprints[key] == self.threshold + 1:
+            # Capture one stack per offender, only once it becomes suspicious;
+            # with a threshold of 0 that is on its first execution
+            self.stacks[key] = application_stack()
+
+    def n_plus_one_offenders(self):
+        """Fingerprints repeated more than the threshold, most frequent first"""
+        return [
+            {
+                "fingerprint": key,
+                "count": count,
+                "sql": self.statements[key],
+                "stack": self.stacks.get(key, []),
+            }
+            for key, count in self.fingerprints.most_common()
+            if count > self.threshold
+        ]
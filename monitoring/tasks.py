@@ -0,0 +1,154 @@
+"""
+Monitoring Celery Tasks
+"""
+import os
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from kavenegar import HTTPException
+
+from monitoring.archive import archive_logs
+from monitoring.exporters import export_logs
+from monitoring.fanout import fan_out
+from monitoring.metrics import SMS_DELIVERIES
+from monitoring.retention import run_retention
+from monitoring.models import CodeLog, Notification, SmsDelivery
+from monitoring.sms import (
+    CircuitOpen,
+    deliver_sms,
+    expire_stale_deliveries,
+    give_up,
+    retry_delay,
+)
+
+
+@shared_task(name="monitoring.export_logs")
+def export_logs_task(fmt="csv", compress=True, filters=None, user_id=None):
+    """
+    Export CodeLog rows in the background and record where the file was written.
+    ``filters`` is JSON-friendly: datetimes travel as ISO strings.
+    """
+    filters = dict(filters or {})
+    for key in ("since", "until"):
+        if filters.get(key):
+            filters[key] = parse_datetime(filters[key])
+
+    export_dir = settings.MONITORING_EXPORT_ROOT
+    os.makedirs(export_dir, exist_ok=True)
+
+    extension = f"{fmt}.gz" if compress else fmt
+    filename = os.path.join(
+        export_dir,
+        f"codelog_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+    )
+
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    if "changelist" in filters:
+        filters["user"] = user
+    count = export_logs(filename, fmt=fmt, compress=compress, **filters)
+
+    CodeLog.log_info(
+        module="monitoring.tasks",
+        method="export_logs_task",
+        message=f"{count} لاگ به فایل {filename} صادر شد.",
+        context={"filename": filename, "count": count, "format": fmt},
+        user=user,
+        tags="export,logs",
+    )
+
+    return {"filename": filename, "count": count}
+
+
+@shared_task(name="monitoring.archive_logs")
+def archive_logs_task(days=None):
+    """Move logs older than LOG_ARCHIVE_AFTER_DAYS to the cold archive"""
+    archived, segments = archive_logs(days=days)
+    if archived:
+        CodeLog.log_info(
+            module="monitoring.tasks",
+            method="archive_logs_task",
+            message=f"{archived} لاگ در {segments} بخش بایگانی شد.",
+            context={"archived": archived, "segments": segments},
+            tags="archive,logs",
+        )
+    return {"archived": archived, "segments": segments}
+
+
+@shared_task(name="monitoring.run_retention")
+def run_retention_task():
+    """Purge expired rows of every retention policy in small batches"""
+    reports = run_retention()
+    summary = {report.policy: report.rows for report in reports}
+    summary["sms-stale-tokens"] = expire_stale_deliveries()
+    total = sum(summary.values())
+    if total:
+        CodeLog.log_info(
+            module="monitoring.tasks",
+            method="run_retention_task",
+            message=f"{total} ردیف منقضی پاک شد.",
+            context={
+                "rows": summary,
+                "bytes_estimate": sum(r.bytes_estimate or 0 for r in reports),
+            },
+            tags="retention",
+        )
+    return summary
+
+
+def _deliver(notification_ids):
+    notifications = Notification.objects.filter(pk__in=notification_ids)
+    for notification in notifications.select_related("user"):
+        notification.send_notification()
+    return len(notification_ids)
+
+
+@shared_task(
+    name="monitoring.deliver_sms_notifications",
+    rate_limit=settings.NOTIFICATION_SMS_RATE_LIMIT,
+)
+def deliver_sms_notifications(notification_ids):
+    """Send a batch of SMS notifications; the rate limit paces the provider"""
+    return _deliver(notification_ids)
+
+
+# Channels whose notifications need an external delivery step
+DELIVERY_TASKS = {"sms": deliver_sms_notifications}
+
+
+@shared_task(name="monitoring.fan_out_notifications")
+def fan_out_notifications_task(title, message, channel="dashboard", **options):
+    """Create and queue the notifications of an audience in the background"""
+    if options.get("expiration_date"):
+        options["expiration_date"] = parse_datetime(options["expiration_date"])
+    return fan_out(title, message, channel, **options)
+
+
+@shared_task(
+    bind=True,
+    name="monitoring.send_sms",
+    rate_limit=settings.SMS_RATE_LIMIT,
+    max_retries=settings.SMS_MAX_RETRIES,
+    acks_late=True,
+)
+def send_sms_task(self, delivery_id):
+    """Send one queued SmsDelivery, retrying transient failures with backoff"""
+    delivery = SmsDelivery.objects.filter(
+        pk=delivery_id, status=SmsDelivery.QUEUED
+    ).first()
+    if delivery is None:
+        # Already final, e.g. a redelivered message after a worker restart
+        return None
+
+    try:
+        return deliver_sms(delivery).status
+    except (CircuitOpen, HTTPException) as exc:
+        if self.request.retries >= self.max_retries:
+            return give_up(delivery, exc).status
+        SMS_DELIVERIES.labels(provider=delivery.provider, status="retry").inc()
+        countdown = retry_delay(self.request.retries)
+        if isinstance(exc, CircuitOpen):
+            countdown = max(countdown, exc.retry_after)
+        raise self.retry(exc=exc, countdown=countdown)
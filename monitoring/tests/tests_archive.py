@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..archive import (
+    EXPANDED_FIELDS,
+    SKIPPED_FIELDS,
+    archive_logs,
+    iter_segment_indexes,
+    search_archive,
+)
+from ..models import CodeLog
+from ..payloads import pack
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(MONITORING_ARCHIVE_ROOT=self.root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.old = timezone.now() - timedelta(days=120)
+        for index, level in enumerate(["INFO", "ERROR", "INFO"]):
+            log = CodeLog.log_message(
+                level, "account.services", "generate_otp", f"OTP sent {index}"
+            )
+            CodeLog.objects.filter(pk=log.pk).update(
+                timestamp=self.old + timedelta(hours=index)
+            )
+        self.recent = CodeLog.log_info("festival.views", "create", "Recent entry")
+
+    def test_old_rows_move_to_indexed_segments(self):
+        """
+        Test that only old rows leave the table and the index describes them.
+        """
+        archived, segments = archive_logs(days=90)
+
+        self.assertEqual(archived, 3)
+        self.assertEqual(list(CodeLog.objects.all()), [self.recent])
+        indexes = [index for _, index in iter_segment_indexes()]
+        self.assertEqual(sum(index["count"] for index in indexes), 3)
+        self.assertEqual(sum(index["levels"].get("ERROR", 0) for index in indexes), 1)
+
+    def test_rerun_after_partial_failure_does_not_duplicate(self):
+        """
+        Test that segments written before a failed delete are overwritten.
+        """
+        with mock.patch(
+            "monitoring.archive.transaction.atomic", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                archive_logs(days=90)
+        self.assertEqual(CodeLog.objects.count(), 4)
+
+        archive_logs(days=90)
+
+        indexes = [index for _, index in iter_segment_indexes()]
+        self.assertEqual(sum(index["count"] for index in indexes), 3)
+
+    @override_settings(LOG_PAYLOAD_COMPRESS_THRESHOLD=64)
+    def test_every_field_survives_the_round_trip(self):
+        """
+        Test that an archived row keeps every column, overflow included.
+        """
+        user = get_user_model().objects.create_user(
+            phone="09121111111", fullName="Tester"
+        )
+        context = {"step": "send", "payload": "x" * 200}
+        traceback_info = "Traceback (most recent call last):\n" + "  frame\n" * 50
+        log = CodeLog.objects.create(
+            level="ERROR",
+            log_type="API",
+            module="account.services",
+            method="generate_otp",
+            message="Gateway failed",
+            exception_type="TimeoutError",
+            exception_message="gateway timeout",
+            request_path="/api/account/otp/",
+            request_method="POST",
+            ip_address="10.0.0.5",
+            user_agent="Mozilla/5.0",
+            request_id="a" * 32,
+            duration=1.5,
+            cpu_usage=42.0,
+            memory_usage=63.5,
+            user=user,
+            is_resolved=True,
+            resolution_note="Provider switched",
+            tags="sms,otp",
+            **pack(context, traceback_info),
+        )
+        CodeLog.objects.filter(pk=log.pk).update(timestamp=self.old)
+        log.refresh_from_db()
+        self.assertIsNotNone(log.compressed_payload)
+
+        archive_logs(days=90)
+
+        (row,) = [row for row in search_archive() if row["id"] == log.pk]
+        for field in CodeLog._meta.concrete_fields:
+            if field.attname in SKIPPED_FIELDS:
+                continue
+            expected = getattr(log, EXPANDED_FIELDS.get(field.attname, field.attname))
+            if hasattr(expected, "isoformat"):
+                expected = expected.isoformat()
+            self.assertEqual(row[field.attname], expected, field.attname)
+        self.assertEqual(row["context"], context)
+        self.assertEqual(row["traceback_info"], traceback_info)
+
+    def test_search_filters_by_window_level_and_text(self):
+        """
+        Test that archived rows can be searched sequentially or in parallel.
+        """
+        archive_logs(days=90, segment_rows=1)
+
+        for workers in (1, 2):
+            rows = search_archive(
+                since=self.old, until=self.old + timedelta(hours=3), workers=workers
+            )
+            self.assertEqual([row["message"] for row in rows][0], "OTP sent 0")
+            self.assertEqual(len(rows), 3)
+
+        errors = search_archive(levels=["ERROR"])
+        self.assertEqual([row["message"] for row in errors], ["OTP sent 1"])
+        self.assertEqual(len(search_archive(contains="OTP sent 2")), 1)
+        self.assertEqual(search_archive(since=timezone.now()), [])
+
+    def test_command_prints_matches_as_ndjson(self):
+        call_command("log_manager", "--archive", "--days", "90", stdout=StringIO())
+
+        out = StringIO()
+        call_command(
+            "log_manager",
+            "--search-archive",
+            "--level",
+            "ERROR",
+            "--workers",
+            "1",
+            stdout=out,
+            stderr=StringIO(),
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([row["message"] for row in rows], ["OTP sent 1"])
+        self.assertTrue(os.path.isdir(os.path.join(self.root, "codelog")))
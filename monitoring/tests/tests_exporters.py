@@ -0,0 +1,109 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from ..exporters import build_export_queryset, export_logs, write_logs
+from ..models import CodeLog
+from ..tasks import export_logs_task
+
+
+class CodeLogExportTest(TestCase):
+    def setUp(self):
+        self.user = baker.make("account.User", phone="09151498722", fullName="Tester")
+        CodeLog.log_info("festival.views", "create", "Info log.", user=self.user)
+        CodeLog.log_error("account.services", "generate_otp", "Error log.")
+        CodeLog.log_warning("festival.views", "list", "Warning log.")
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_filters(self):
+        """
+        Test that level, module and time filters narrow the exported rows.
+        """
+        self.assertEqual(build_export_queryset(levels=["ERROR"]).count(), 1)
+        self.assertEqual(build_export_queryset(modules=["festival.views"]).count(), 2)
+        self.assertEqual(
+            build_export_queryset(since=timezone.now() + timedelta(hours=1)).count(), 0
+        )
+
+    def test_csv_export_has_no_per_row_user_query(self):
+        """
+        Test that users are joined instead of fetched lazily for every row.
+        """
+        stream = io.StringIO()
+        with self.assertNumQueries(1):
+            count = write_logs(build_export_queryset(), stream, fmt="csv")
+
+        rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+        self.assertEqual(count, 3)
+        self.assertEqual(len(rows), 3)
+        self.assertIn("Tester", [row["user"] for row in rows])
+
+    def test_gzip_ndjson_export(self):
+        """
+        Test that a .gz filename produces a compressed NDJSON file.
+        """
+        filename = os.path.join(self.tmpdir.name, "logs.ndjson.gz")
+        count = export_logs(filename, fmt="ndjson", levels=["ERROR", "WARNING"])
+
+        with gzip.open(filename, "rt", encoding="utf-8") as stream:
+            documents = [json.loads(line) for line in stream]
+
+        self.assertEqual(count, 2)
+        self.assertEqual({doc["level"] for doc in documents}, {"ERROR", "WARNING"})
+
+    def test_log_manager_export_command(self):
+        """
+        Test the log_manager --export option with filters.
+        """
+        filename = os.path.join(self.tmpdir.name, "logs.csv")
+        call_command(
+            "log_manager",
+            export=filename,
+            level="INFO,ERROR",
+            stdout=io.StringIO(),
+        )
+
+        with open(filename, encoding="utf-8") as stream:
+            rows = list(csv.DictReader(stream))
+        self.assertEqual(len(rows), 2)
+
+    def test_admin_export_of_whole_changelist_keeps_its_filters(self):
+        """
+        Test that "select all" exports exactly the filtered, searched changelist.
+        """
+        admin_user = get_user_model().objects.create_superuser(
+            phone="09120000000", password="secret"
+        )
+        self.client.force_login(admin_user)
+        url = reverse("admin:monitoring_codelog_changelist")
+        query = "?q=Info&module__exact=festival.views"
+
+        with mock.patch("monitoring.tasks.export_logs_task.delay") as delay:
+            self.client.post(
+                url + query,
+                {
+                    "action": "export_logs_ndjson",
+                    "select_across": "1",
+                    "index": "0",
+                    "_selected_action": CodeLog.objects.values_list("pk", flat=True),
+                },
+            )
+
+        with self.settings(MONITORING_EXPORT_ROOT=self.tmpdir.name):
+            result = export_logs_task(**delay.call_args.kwargs)
+        self.assertEqual(result["count"], 1)
@@ -0,0 +1,130 @@
+from django.contrib.admin import site
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import facets
+from ..models import CodeLog
+from ..paginators import ApproximateCountPaginator
+
+
+class FacetTest(TestCase):
+    def setUp(self):
+        facets._known.clear()
+        connection_ = facets._connection()
+        connection_.delete(*(facets.facet_key(f) for f in facets.FACET_FIELDS))
+
+    def test_new_logs_extend_the_facets(self):
+        CodeLog.log_info("festival.views", "create", "Registration saved")
+        self.assertIn("festival.views", facets.get_values("module"))
+
+    def test_values_are_built_once_from_the_table(self):
+        """
+        Test that a missing set is rebuilt and then served from Redis.
+        """
+        CodeLog.objects.bulk_create(
+            [
+                CodeLog(module="account.views", message="a", request_method="POST"),
+                CodeLog(module="content.views", message="b", request_method="GET"),
+            ]
+        )
+
+        self.assertEqual(
+            facets.get_values("module"), ["account.views", "content.views"]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(facets.get_values("request_method"), ["GET", "POST"])
+            self.assertEqual(
+                facets.get_values("module"), ["account.views", "content.views"]
+            )
+        self.assertEqual(len(queries), 1)
+
+    def test_changelist_filters_without_distinct_queries(self):
+        """
+        Test that the log admin filters by facet without SELECT DISTINCT.
+        """
+        admin_user = get_user_model().objects.create_superuser(
+            phone="09120000000", password="secret"
+        )
+        self.client.force_login(admin_user)
+        CodeLog.log_info("festival.views", "create", "Registration saved")
+        CodeLog.log_info("account.views", "login", "Logged in")
+
+        url = reverse("admin:monitoring_codelog_changelist")
+        # The first load builds the facet sets
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"module__exact": "festival.views"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 1)
+        distinct = [
+            q["sql"] for q in queries.captured_queries if "DISTINCT" in q["sql"]
+        ]
+        self.assertEqual(distinct, [])
+
+
+class CodeLogSearchTest(TestCase):
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser(
+            phone="09120000000", password="secret"
+        )
+        self.client.force_login(admin_user)
+        self.user = get_user_model().objects.create_user(
+            phone="09121111111", fullName="Reza Tester"
+        )
+        CodeLog.objects.bulk_create(
+            [
+                CodeLog(module="festival.views", method="create", message="saved"),
+                CodeLog(
+                    module="account.services",
+                    method="generate_otp",
+                    message="failed",
+                    exception_message="gateway timeout",
+                    tags="sms,otp",
+                ),
+                CodeLog(module="content.views", message="listed", user=self.user),
+            ]
+        )
+        self.url = reverse("admin:monitoring_codelog_changelist")
+
+    def search(self, term):
+        response = self.client.get(self.url, {"q": term})
+        return sorted(log.module for log in response.context["cl"].result_list)
+
+    def test_text_fields_match_substrings(self):
+        """
+        Test that module, method, exception message and tags match partially.
+        """
+        self.assertEqual(self.search("festival"), ["festival.views"])
+        self.assertEqual(self.search("generate"), ["account.services"])
+        self.assertEqual(self.search("timeout"), ["account.services"])
+        self.assertEqual(self.search("otp"), ["account.services"])
+
+    def test_users_match_by_name_and_phone_without_a_join(self):
+        """
+        Test that user name and phone searches resolve to user ids first.
+        """
+        self.assertEqual(self.search("Reza"), ["content.views"])
+        self.assertEqual(self.search("09121111111"), ["content.views"])
+
+        model_admin = site._registry[CodeLog]
+        results, _ = model_admin.get_search_results(
+            RequestFactory().get(self.url), CodeLog.objects.all(), "Reza"
+        )
+        self.assertNotIn("account_user", str(results.query))
+
+
+class ApproximateCountPaginatorTest(TestCase):
+    def test_count_is_capped(self):
+        CodeLog.objects.bulk_create(
+            CodeLog(module="m", message=str(index)) for index in range(5)
+        )
+        paginator = ApproximateCountPaginator(CodeLog.objects.all(), 2)
+        paginator.count_limit = 3
+
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
@@ -0,0 +1,171 @@
+import logging
+import threading
+
+from django.test import RequestFactory, TestCase
+
+from ..context import current_request
+from ..handlers import BatchingSink, CodeLogHandler, LoggerLevelFilter, map_level
+from ..models import CodeLog, IssueGroup
+
+
+def emit_from_service(logger):
+    logger.warning("Capacity reached for %s", "festival")
+
+
+class CodeLogHandlerTest(TestCase):
+    def setUp(self):
+        self.handler = CodeLogHandler(asynchronous=False)
+        self.logger = logging.getLogger("festival.tests.handler")
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def test_record_is_stored_with_its_origin(self):
+        """
+        Test that module and method come from the log record.
+        """
+        emit_from_service(self.logger)
+
+        log = CodeLog.objects.get()
+        self.assertEqual(log.level, "WARNING")
+        self.assertEqual(log.module, "festival.tests.handler")
+        self.assertEqual(log.method, "emit_from_service")
+        self.assertEqual(log.message, "Capacity reached for festival")
+        self.assertIn("lineno", log.context)
+
+    def test_request_context_is_attached(self):
+        """
+        Test that the request published by the middleware is recorded.
+        """
+        request = RequestFactory().post("/api/festival/registrations/")
+        token = current_request.set(request)
+        try:
+            self.logger.info("Registration received", extra={"tags": "festival"})
+        finally:
+            current_request.reset(token)
+
+        log = CodeLog.objects.get()
+        self.assertEqual(log.request_path, "/api/festival/registrations/")
+        self.assertEqual(log.request_method, "POST")
+        self.assertEqual(log.tags, "festival")
+
+    def test_exceptions_are_grouped(self):
+        """
+        Test that records carrying an exception go to an IssueGroup.
+        """
+        try:
+            {}["missing"]
+        except KeyError:
+            self.logger.exception("Lookup failed")
+
+        self.assertEqual(IssueGroup.objects.get().level, "EXCEPTION")
+        self.assertFalse(CodeLog.objects.exists())
+
+    def test_project_loggers_are_routed_by_settings(self):
+        """
+        Test that LOGGING sends project loggers to CodeLog.
+        """
+        logging.getLogger("account.services").warning("OTP resend limit reached")
+        self.assertTrue(
+            CodeLog.objects.filter(
+                module="account.services", message="OTP resend limit reached"
+            ).exists()
+        )
+
+    def test_root_keeps_a_stream_next_to_codelog(self):
+        """
+        Test that CodeLog is an additional sink and container logs still work.
+        """
+        handlers = logging.getLogger().handlers
+        self.assertTrue(any(isinstance(h, CodeLogHandler) for h in handlers))
+        self.assertTrue(
+            any(type(handler) is logging.StreamHandler for handler in handlers)
+        )
+
+    def test_celery_info_lines_stay_out_of_codelog(self):
+        """
+        Test that Celery INFO records are filtered from CodeLog, not warnings.
+        """
+        self.handler.addFilter(LoggerLevelFilter("celery", "WARNING"))
+        celery_logger = logging.getLogger("celery.app.trace")
+
+        self.assertFalse(
+            self.handler.filter(
+                celery_logger.makeRecord(
+                    "celery.app.trace",
+                    logging.INFO,
+                    __file__,
+                    1,
+                    "Task succeeded",
+                    (),
+                    None,
+                )
+            )
+        )
+        self.assertTrue(
+            self.handler.filter(
+                celery_logger.makeRecord(
+                    "celery.app.trace",
+                    logging.ERROR,
+                    __file__,
+                    1,
+                    "Task failed",
+                    (),
+                    None,
+                )
+            )
+        )
+        self.assertTrue(
+            self.handler.filter(
+                self.logger.makeRecord(
+                    self.logger.name, logging.INFO, __file__, 1, "Saved", (), None
+                )
+            )
+        )
+
+    def test_level_mapping(self):
+        self.assertEqual(map_level(logging.DEBUG), "DEBUG")
+        self.assertEqual(map_level(logging.WARNING + 5), "WARNING")
+        self.assertEqual(map_level(logging.CRITICAL), "CRITICAL")
+
+
+class BatchingSinkTest(TestCase):
+    def test_worker_writes_in_batches(self):
+        """
+        Test that queued items are written by the worker in bounded batches.
+        """
+        batches = []
+        done = threading.Event()
+
+        def write(batch):
+            batches.append(batch)
+            if sum(len(b) for b in batches) == 5:
+                done.set()
+
+        sink = BatchingSink(write, batch_size=2, flush_interval=0.01)
+        for item in range(5):
+            sink.put(item)
+
+        self.assertTrue(done.wait(2))
+        self.assertEqual(sum(batches, []), [0, 1, 2, 3, 4])
+        self.assertLessEqual(max(len(batch) for batch in batches), 2)
+
+    def test_full_queue_drops_items(self):
+        """
+        Test that a stalled writer makes the sink drop instead of block.
+        """
+        started, release = threading.Event(), threading.Event()
+
+        def write(batch):
+            started.set()
+            release.wait(2)
+
+        sink = BatchingSink(write, batch_size=1, flush_interval=0, max_queue=1)
+        self.addCleanup(release.set)
+        sink.put("first")
+        self.assertTrue(started.wait(2))
+
+        sink.put("queued")
+        sink.put("overflow")
+
+        self.assertEqual(sink.dropped, 1)
@@ -0,0 +1,101 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..issues import _last_sampled, exception_fingerprint
+from ..models import CodeLog, IssueGroup
+
+
+def failing_lookup(key):
+    return {}[key]
+
+
+def raise_and_catch(key="missing"):
+    try:
+        failing_lookup(key)
+    except KeyError as exc:
+        return exc
+
+
+@override_settings(ISSUE_SAMPLE_INTERVAL=300, ISSUE_SAMPLE_LIMIT=3)
+class IssueGroupingTest(TestCase):
+    def setUp(self):
+        _last_sampled.clear()
+
+    def test_fingerprint_ignores_exception_values(self):
+        """
+        Test that the same bug with different values shares a fingerprint.
+        """
+        self.assertEqual(
+            exception_fingerprint(raise_and_catch("a")),
+            exception_fingerprint(raise_and_catch("b")),
+        )
+        self.assertNotEqual(
+            exception_fingerprint(raise_and_catch()),
+            exception_fingerprint(ValueError("boom")),
+        )
+
+    def test_repeated_exception_updates_one_group(self):
+        """
+        Test that occurrences are counted on one group instead of new CodeLogs.
+        """
+        for index in range(5):
+            CodeLog.log_exception(
+                "festival.views", "create", "Lookup failed", raise_and_catch(index)
+            )
+
+        group = IssueGroup.objects.get()
+        self.assertEqual(group.occurrences, 5)
+        self.assertEqual(group.exception_type, "KeyError")
+        self.assertIn("failing_lookup", group.traceback_info)
+        self.assertEqual(len(group.samples), 1)
+        self.assertFalse(CodeLog.objects.exists())
+
+    def test_repeat_costs_a_single_update(self):
+        """
+        Test that an unsampled repeat issues exactly one UPDATE.
+        """
+        CodeLog.log_exception("m", "f", "Lookup failed", raise_and_catch())
+
+        with CaptureQueriesContext(connection) as queries:
+            CodeLog.log_exception("m", "f", "Lookup failed", raise_and_catch())
+
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]["sql"].startswith("UPDATE"))
+
+    def test_log_exception_returns_the_group(self):
+        """
+        Test that logging an exception returns its IssueGroup, first and repeat.
+        """
+        first = CodeLog.log_exception("m", "f", "Lookup failed", raise_and_catch())
+        repeat = CodeLog.log_exception("m", "f", "Lookup failed", raise_and_catch())
+
+        self.assertIsInstance(first, IssueGroup)
+        self.assertIsInstance(repeat, IssueGroup)
+        self.assertEqual(repeat.pk, first.pk)
+        self.assertEqual(repeat.occurrences, 2)
+
+    @override_settings(ISSUE_SAMPLE_INTERVAL=0)
+    def test_samples_are_a_capped_ring(self):
+        """
+        Test that only the latest ISSUE_SAMPLE_LIMIT samples are kept.
+        """
+        for index in range(5):
+            CodeLog.log_exception("m", "f", f"Failure {index}", raise_and_catch())
+
+        group = IssueGroup.objects.get()
+        self.assertEqual(
+            [sample["message"] for sample in group.samples],
+            ["Failure 2", "Failure 3", "Failure 4"],
+        )
+
+    def test_recurrence_reopens_resolved_group(self):
+        """
+        Test that a resolved issue happening again is marked unresolved.
+        """
+        CodeLog.log_exception("m", "f", "Lookup failed", raise_and_catch())
+        IssueGroup.objects.update(is_resolved=True)
+
+        CodeLog.log_exception("m", "f", "Lookup failed", raise_and_catch())
+
+        self.assertFalse(IssueGroup.objects.get().is_resolved)
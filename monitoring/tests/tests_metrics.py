@@ -0,0 +1,143 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from ..metrics import start_worker_metrics_server
+
+
+class MetricsEndpointTest(TestCase):
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_request_latency_is_labelled_by_view(self):
+        """
+        Test that a request is observed under its resolved view name.
+        """
+        labels = {"view": "festival:format-list", "method": "GET", "status": "200"}
+        before = self.sample("django_http_request_duration_seconds_count", **labels)
+
+        self.client.get(reverse("festival:format-list"))
+
+        after = self.sample("django_http_request_duration_seconds_count", **labels)
+        self.assertEqual(after, before + 1)
+        self.assertGreater(
+            self.sample(
+                "django_db_queries_per_request_count", view="festival:format-list"
+            ),
+            0,
+        )
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        """
+        Test that /metrics exposes the request and cache metrics.
+        """
+        self.client.get(reverse("festival:format-list"))
+        cache.get("metrics-test-missing-key")
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn("django_http_request_duration_seconds_bucket", body)
+        self.assertIn('django_cache_requests_total{result="miss"}', body)
+
+    @override_settings(METRICS_AUTH_TOKEN="secret")
+    def test_metrics_endpoint_requires_token_when_configured(self):
+        """
+        Test that a configured token protects the endpoint.
+        """
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DEBUG=False, METRICS_AUTH_TOKEN=None)
+    def test_metrics_endpoint_is_internal_without_token(self):
+        """
+        Test that without a token only internal networks may scrape outside DEBUG.
+        """
+        response = self.client.get("/metrics", REMOTE_ADDR="203.0.113.7")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get("/metrics", REMOTE_ADDR="127.0.0.1")
+        self.assertEqual(response.status_code, 200)
+
+    def test_worker_metrics_server_serves_all_pool_processes(self):
+        """
+        Test that a worker serves the multiprocess samples, minus stale ones.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            stale = os.path.join(directory, "histogram_4242.db")
+            open(stale, "wb").close()
+            with mock.patch.dict(os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}):
+                with mock.patch("monitoring.metrics.start_http_server") as server:
+                    start_worker_metrics_server(9808)
+
+            self.assertFalse(os.path.exists(stale))
+        port = server.call_args.args[0]
+        registry = server.call_args.kwargs["registry"]
+        self.assertEqual(port, 9808)
+        self.assertIsNot(registry, REGISTRY)
+
+    def test_gunicorn_config_enables_multiprocess_values(self):
+        """
+        Test that loading gunicorn.conf.py makes workers write shared samples.
+        """
+        script = (
+            "import runpy; runpy.run_path('gunicorn.conf.py'); "
+            "from prometheus_client import values; "
+            "print(values.ValueClass.__name__)"
+        )
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key != "PROMETHEUS_MULTIPROC_DIR"
+        }
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "MmapedValue")
+
+    def test_persistent_connection_reuse_is_counted(self):
+        """
+        Test that a connection kept from an earlier request counts as reused.
+        """
+        connection.ensure_connection()
+        before = self.sample(
+            "django_db_connections_total", alias="default", state="reused"
+        )
+
+        self.client.get(reverse("festival:format-list"))
+
+        after = self.sample(
+            "django_db_connections_total", alias="default", state="reused"
+        )
+        self.assertEqual(after, before + 1)
+
+    def test_new_connection_is_counted(self):
+        """
+        Test that opening a connection is counted as opened.
+        """
+        wrapper = connections.create_connection("default")
+        self.addCleanup(wrapper.close)
+        before = self.sample(
+            "django_db_connections_total", alias="default", state="opened"
+        )
+
+        wrapper.ensure_connection()
+
+        after = self.sample(
+            "django_db_connections_total", alias="default", state="opened"
+        )
+        self.assertEqual(after, before + 1)
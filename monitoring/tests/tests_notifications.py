@@ -0,0 +1,303 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from festival.models import FestivalFormat, FestivalRegistration, FestivalTopic
+from province.models import City, Province
+
+from ..fanout import (
+    _connection,
+    audience,
+    fan_out,
+    mark_all_read,
+    unread_count,
+    unread_key,
+)
+from ..models import Notification, SmsDelivery
+from ..retention import apply_policy, default_policies
+
+User = get_user_model()
+
+UNREAD_COUNT_URL = reverse("notifications:unread-count")
+READ_ALL_URL = reverse("notifications:read-all")
+FAN_OUT_URL = reverse("notifications:fan-out")
+
+
+class FanOutTestMixin:
+    def setUp(self):
+        self.province = Province.objects.create(name="استان آزمایشی", slug="test-p")
+        self.other_province = Province.objects.create(name="استان دیگر", slug="test-o")
+        self.news = FestivalFormat.objects.get(code="news_report")
+        self.documentary = FestivalFormat.objects.get(code="documentary")
+        self.topic = FestivalTopic.objects.first()
+        self.users = [
+            self.register("09120000001", self.news, self.province),
+            self.register("09120000002", self.news, self.other_province),
+            self.register("09120000003", self.documentary, self.province),
+        ]
+        # A second registration must not produce a second notification
+        self.register("09120000001", self.documentary, self.province)
+        self.addCleanup(self.clear_counters)
+
+    def register(self, phone, festival_format, province):
+        user, _ = User.objects.get_or_create(phone=phone)
+        city, _ = City.objects.get_or_create(
+            name="شهر", slug=f"{province.slug}-city", province=province
+        )
+        FestivalRegistration.objects.create(
+            user=user,
+            full_name="کاربر آزمایشی",
+            father_name="پدر",
+            national_id="1234567890",
+            gender="male",
+            education="کارشناسی",
+            phone_number=phone,
+            province=province,
+            city=city,
+            media_name="رسانه",
+            festival_format=festival_format,
+            festival_topic=self.topic,
+        )
+        return user
+
+    def clear_counters(self):
+        _connection().delete(*[unread_key(user.pk) for user in self.users])
+
+
+class FanOutTest(FanOutTestMixin, TestCase):
+    def test_audience_combines_filters(self):
+        """
+        Test that format and province filters target their registrants once.
+        """
+        self.assertEqual(
+            list(audience(festival_format=self.news)),
+            [self.users[0].pk, self.users[1].pk],
+        )
+        self.assertEqual(
+            list(audience(province=self.province)),
+            [self.users[0].pk, self.users[2].pk],
+        )
+        self.assertEqual(
+            list(audience(festival_format=self.news, province=self.province)),
+            [self.users[0].pk],
+        )
+
+    def test_fan_out_creates_in_chunks(self):
+        """
+        Test that notifications are bulk created chunk by chunk.
+        """
+        with mock.patch.object(
+            Notification.objects, "bulk_create", wraps=Notification.objects.bulk_create
+        ) as bulk_create:
+            created = fan_out(
+                "اطلاعیه", "متن اطلاعیه", province=self.province, chunk_size=1
+            )
+
+        self.assertEqual(created, 2)
+        self.assertEqual(bulk_create.call_count, 2)
+        self.assertEqual(
+            set(Notification.objects.values_list("user_id", flat=True)),
+            {self.users[0].pk, self.users[2].pk},
+        )
+
+    @override_settings(NOTIFICATION_DELIVERY_BATCH_SIZE=1)
+    def test_sms_delivery_is_queued_per_batch(self):
+        """
+        Test that SMS notifications are handed to the delivery task in batches.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            fan_out("اطلاعیه", "متن", channel="sms", festival_format=self.news)
+
+        deliveries = SmsDelivery.objects.filter(purpose="notification")
+        self.assertEqual(deliveries.count(), 2)
+        self.assertFalse(deliveries.exclude(status=SmsDelivery.SENT).exists())
+
+    def test_dashboard_notifications_are_not_queued(self):
+        """
+        Test that dashboard notifications need no delivery task.
+        """
+        with mock.patch("monitoring.tasks.deliver_sms_notifications.delay") as delay:
+            fan_out("اطلاعیه", "متن", festival_format=self.news)
+
+        delay.assert_not_called()
+
+
+class UnreadCounterTest(FanOutTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.users[0]
+
+    def test_counter_is_served_without_queries(self):
+        """
+        Test that a warm unread counter costs no database query.
+        """
+        fan_out("اطلاعیه", "متن", festival_format=self.news)
+        self.assertEqual(unread_count(self.user.pk), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user.pk), 1)
+
+    def test_fan_out_increments_warm_counters(self):
+        """
+        Test that new notifications bump counters that are already cached.
+        """
+        self.assertEqual(unread_count(self.user.pk), 0)
+
+        fan_out("اطلاعیه", "متن", festival_format=self.news)
+        fan_out("اطلاعیه", "متن", province=self.province)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user.pk), 2)
+
+    def test_expired_notifications_are_not_counted(self):
+        """
+        Test that a cold counter ignores expired notifications.
+        """
+        fan_out(
+            "اطلاعیه",
+            "متن",
+            festival_format=self.news,
+            expiration_date=timezone.now() - timedelta(days=1),
+        )
+
+        self.assertEqual(unread_count(self.user.pk), 0)
+
+    def test_counter_expires_with_its_first_notification(self):
+        """
+        Test that a cached counter lives no longer than its notifications.
+        """
+        fan_out(
+            "اطلاعیه",
+            "متن",
+            festival_format=self.news,
+            expiration_date=timezone.now() + timedelta(minutes=5),
+        )
+        self.assertEqual(unread_count(self.user.pk), 1)
+        self.assertLessEqual(_connection().ttl(unread_key(self.user.pk)), 300)
+
+        fan_out(
+            "اطلاعیه",
+            "متن",
+            province=self.province,
+            expiration_date=timezone.now() + timedelta(minutes=1),
+        )
+        self.assertLessEqual(_connection().ttl(unread_key(self.user.pk)), 60)
+
+    @override_settings(RETENTION_BATCH_SLEEP=0)
+    def test_retention_purge_drops_counters(self):
+        """
+        Test that purging expired notifications invalidates their counters.
+        """
+        fan_out("اطلاعیه", "متن", festival_format=self.news)
+        self.assertEqual(unread_count(self.user.pk), 1)
+        Notification.objects.update(expiration_date=timezone.now() - timedelta(days=1))
+
+        policy = {policy.name: policy for policy in default_policies()}
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_policy(policy["notification-expired"])
+
+        self.assertIsNone(_connection().get(unread_key(self.user.pk)))
+        self.assertEqual(unread_count(self.user.pk), 0)
+
+    def test_mark_as_read_decrements(self):
+        """
+        Test that reading one notification decrements the counter once.
+        """
+        fan_out("اطلاعیه", "متن", festival_format=self.news)
+        unread_count(self.user.pk)
+        notification = Notification.objects.get(user=self.user)
+
+        notification.mark_as_read()
+        notification.mark_as_read()
+
+        self.assertTrue(Notification.objects.get(pk=notification.pk).is_read)
+        self.assertEqual(unread_count(self.user.pk), 0)
+
+    def test_mark_all_read_runs_one_query(self):
+        """
+        Test that marking everything as read is a single UPDATE.
+        """
+        fan_out("اطلاعیه", "متن", festival_format=self.news)
+        fan_out("اطلاعیه", "متن", province=self.province)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(mark_all_read(self.user.pk), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user.pk), 0)
+
+
+class NotificationApiTest(FanOutTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = self.users[0]
+
+    def test_mark_all_read_endpoint(self):
+        """
+        Test that the read-all endpoint marks everything and resets the badge.
+        """
+        fan_out("اطلاعیه", "متن", festival_format=self.news)
+        fan_out("اطلاعیه", "متن", province=self.province)
+        self.client.force_authenticate(self.user)
+
+        res = self.client.post(READ_ALL_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["updated"], 2)
+
+        res = self.client.get(UNREAD_COUNT_URL)
+        self.assertEqual(res.data, {"unread": 0})
+        self.assertFalse(Notification.objects.filter(is_read=False, user=self.user))
+
+    def test_list_hides_expired_and_foreign(self):
+        """
+        Test that users only see their unexpired notifications.
+        """
+        fan_out("جاری", "متن", festival_format=self.news)
+        fan_out(
+            "منقضی",
+            "متن",
+            festival_format=self.news,
+            expiration_date=timezone.now() - timedelta(days=1),
+        )
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(reverse("notifications:list"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["title"] for item in res.data["results"]], ["جاری"])
+
+    def test_fan_out_requires_staff(self):
+        """
+        Test that only staff can send notifications to an audience.
+        """
+        self.client.force_authenticate(self.user)
+        payload = {
+            "title": "اطلاعیه",
+            "message": "متن",
+            "festival_format": "news_report",
+        }
+
+        res = self.client.post(FAN_OUT_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.post(FAN_OUT_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_fan_out_requires_an_audience(self):
+        """
+        Test that a fan-out without a format or province is rejected.
+        """
+        self.client.force_authenticate(User.objects.create_superuser("09129999999"))
+
+        res = self.client.post(FAN_OUT_URL, {"title": "اطلاعیه", "message": "متن"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,161 @@
+import logging
+
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase, override_settings
+
+from ..admin import CodeLogAdmin
+from ..exporters import _ndjson_row
+from ..handlers import CodeLogHandler
+from ..metrics import LOG_PAYLOAD_BYTES
+from ..models import CodeLog
+from ..payloads import REDACTED, USER_AGENT_MAX_LENGTH, pack, sanitize
+
+
+@override_settings(LOG_PAYLOAD_MAX_STRING=10, LOG_PAYLOAD_MAX_ITEMS=3)
+class SanitizeTest(TestCase):
+    def test_sensitive_keys_are_redacted(self):
+        """
+        Test that values of sensitive keys are masked at any depth.
+        """
+        payload = {
+            "phone": "09120000000",
+            "password": "123456",
+            "post_data": {"new_password": "x", "Authorization": "Bearer y"},
+        }
+
+        result = sanitize(payload)
+
+        self.assertEqual(result["phone"], "0912000000…[truncated 1 chars]")
+        self.assertEqual(result["password"], REDACTED)
+        self.assertEqual(
+            result["post_data"], {"new_password": REDACTED, "Authorization": REDACTED}
+        )
+
+    def test_collections_are_capped(self):
+        """
+        Test that lists and dicts keep only the configured number of items.
+        """
+        result = sanitize(
+            {"ids": list(range(10)), "extra": {str(i): i for i in "abcde"}}
+        )
+
+        self.assertEqual(result["ids"], [0, 1, 2, "… 7 more items"])
+        self.assertEqual(len(result["extra"]), 4)
+        self.assertEqual(result["extra"]["…"], "2 more keys")
+
+    @override_settings(LOG_PAYLOAD_MAX_DEPTH=2)
+    def test_deep_nesting_is_flattened(self):
+        """
+        Test that values nested beyond the depth limit become strings.
+        """
+        result = sanitize({"a": {"b": {"c": 1}}})
+
+        self.assertIsInstance(result["a"]["b"], str)
+
+    def test_non_json_values_become_strings(self):
+        """
+        Test that arbitrary objects are stored as their string form.
+        """
+        self.assertEqual(sanitize({"value": 3j}), {"value": "3j"})
+
+
+@override_settings(LOG_PAYLOAD_COMPRESS_THRESHOLD=200, LOG_PAYLOAD_MAX_STRING=5000)
+class CompressionTest(TestCase):
+    def test_small_payload_is_stored_inline(self):
+        """
+        Test that payloads below the threshold are not compressed.
+        """
+        fields = pack({"view": "festival"}, "short traceback")
+
+        self.assertEqual(fields["context"], {"view": "festival"})
+        self.assertEqual(fields["traceback_info"], "short traceback")
+        self.assertIsNone(fields["compressed_payload"])
+
+    def test_large_payload_round_trips(self):
+        """
+        Test that a large context is compressed and read back transparently.
+        """
+        context = {"body": "festival " * 200, "page": 1}
+        log = CodeLog.log_info("festival.views", "create", "Large body", context)
+        log = CodeLog.objects.get(pk=log.pk)
+
+        self.assertEqual(log.context, {"compressed": True, "keys": ["body", "page"]})
+        self.assertIsNotNone(log.compressed_payload)
+        self.assertEqual(log.full_context, context)
+        self.assertEqual(_ndjson_row(log)["context"], context)
+
+    def test_large_traceback_round_trips(self):
+        """
+        Test that a long traceback moves into the compressed column.
+        """
+        traceback_info = 'File "festival/views.py", line 1\n' * 50
+        fields = pack(None, traceback_info)
+        log = CodeLog.objects.create(module="festival", message="boom", **fields)
+        log = CodeLog.objects.get(pk=log.pk)
+
+        self.assertIsNone(log.traceback_info)
+        self.assertEqual(log.full_traceback, traceback_info)
+
+    def test_bytes_saved_are_counted(self):
+        """
+        Test that raw and stored sizes are exported as metrics.
+        """
+        raw = LOG_PAYLOAD_BYTES.labels(stage="raw")._value.get()
+        stored = LOG_PAYLOAD_BYTES.labels(stage="stored")._value.get()
+
+        pack({"body": "x" * 5000})
+
+        raw_delta = LOG_PAYLOAD_BYTES.labels(stage="raw")._value.get() - raw
+        stored_delta = LOG_PAYLOAD_BYTES.labels(stage="stored")._value.get() - stored
+        self.assertGreater(raw_delta, 5000)
+        self.assertLess(stored_delta, raw_delta / 10)
+
+    def test_admin_shows_decompressed_context(self):
+        """
+        Test that the admin detail view renders the full context.
+        """
+        log = CodeLog.log_info(
+            "festival.views", "create", "Large body", {"body": "festival " * 200}
+        )
+
+        rendered = CodeLogAdmin(CodeLog, site).context_display(
+            CodeLog.objects.get(pk=log.pk)
+        )
+
+        self.assertIn("festival festival", rendered)
+        self.assertNotIn("compressed", rendered)
+
+
+class LogWritePathTest(TestCase):
+    def test_log_message_redacts_and_caps_user_agent(self):
+        """
+        Test that request data logged through CodeLog is sanitized.
+        """
+        request = RequestFactory().post(
+            "/api/account/login/", HTTP_USER_AGENT="a" * 2000
+        )
+
+        log = CodeLog.log_info(
+            "account.views",
+            "login",
+            "Login attempt",
+            {"post_data": {"phone": "0912", "password": "secret"}},
+            request=request,
+        )
+
+        self.assertEqual(log.context["post_data"]["password"], REDACTED)
+        self.assertEqual(len(log.user_agent), USER_AGENT_MAX_LENGTH)
+
+    def test_logging_handler_applies_the_same_rules(self):
+        """
+        Test that records stored by the logging handler are sanitized too.
+        """
+        handler = CodeLogHandler(asynchronous=False)
+        logger = logging.getLogger("account.tests.payloads")
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+
+        logger.warning("Token refresh", extra={"context": {"refresh_token": "abc"}})
+
+        self.assertEqual(CodeLog.objects.get().context["refresh_token"], REDACTED)
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from ..models import CodeLog
+from ..utils import log_performance, track_performance
+
+
+def sample(name, suffix="_count", **labels):
+    value = REGISTRY.get_sample_value(f"function_duration_seconds{suffix}", labels)
+    return value or 0
+
+
+def calls(name, outcome):
+    value = REGISTRY.get_sample_value(
+        "function_calls_total", {"function": name, "outcome": outcome}
+    )
+    return value or 0
+
+
+@log_performance(threshold=60)
+def quick_service(value):
+    return value * 2
+
+
+@log_performance(threshold=0, name="tests.failing_service")
+def failing_service():
+    raise ValueError("boom")
+
+
+class FunctionLatencyTest(TestCase):
+    name = f"{__name__}.quick_service"
+
+    def test_decorator_records_every_call(self):
+        """
+        Test that fast calls are observed in the histogram without logging.
+        """
+        before = sample(self.name, function=self.name)
+        before_success = calls(self.name, "success")
+
+        for value in range(3):
+            self.assertEqual(quick_service(value), value * 2)
+
+        self.assertEqual(sample(self.name, function=self.name) - before, 3)
+        self.assertEqual(calls(self.name, "success") - before_success, 3)
+        self.assertFalse(CodeLog.objects.filter(level="PERFORMANCE").exists())
+
+    def test_decorator_counts_errors(self):
+        """
+        Test that failures are counted by outcome and still reraised.
+        """
+        before = calls("tests.failing_service", "error")
+
+        with self.assertRaises(ValueError):
+            failing_service()
+
+        self.assertEqual(calls("tests.failing_service", "error") - before, 1)
+
+    def test_context_manager_logs_threshold_breach(self):
+        """
+        Test that a slow block is observed and logged as a performance issue.
+        """
+        name = "tests.slow_block"
+        before = sample(name, function=name)
+
+        with track_performance(name, threshold=0) as timer:
+            sum(range(1000))
+
+        self.assertEqual(sample(name, function=name) - before, 1)
+        self.assertGreater(timer.duration, 0)
+        log = CodeLog.objects.get(level="PERFORMANCE")
+        self.assertEqual(log.module, "tests")
+        self.assertEqual(log.method, "slow_block")
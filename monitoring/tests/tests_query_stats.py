@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from ..context import current_view
+from ..models import QueryStatistic
+from ..query_stats import BUCKET_BOUNDS, QueryStatsCollector, percentile
+
+
+class QueryStatsCollectorTest(TestCase):
+    def setUp(self):
+        self.collector = QueryStatsCollector(max_entries=10, flush_interval=60)
+
+    def test_queries_are_aggregated_per_fingerprint_and_view(self):
+        """
+        Test that statements differing only in literals share one entry.
+        """
+        self.collector.record("SELECT * FROM t WHERE id = 1", 0.002, view="a")
+        self.collector.record("SELECT * FROM t WHERE id = 2", 0.004, view="a")
+        self.collector.record("SELECT * FROM t WHERE id = 3", 0.001, view="b")
+
+        self.assertEqual(len(self.collector.entries), 2)
+        calls = sorted(entry[0] for entry in self.collector.entries.values())
+        self.assertEqual(calls, [1, 2])
+
+    def test_flush_merges_into_existing_rows(self):
+        """
+        Test that consecutive flushes accumulate into one QueryStatistic row.
+        """
+        self.collector.record("SELECT 1", 0.01, rows=3, view="festival:format-list")
+        self.collector.flush()
+        self.collector.record("SELECT 2", 0.03, rows=1, view="festival:format-list")
+        self.collector.flush()
+
+        stat = QueryStatistic.objects.get()
+        self.assertEqual(stat.calls, 2)
+        self.assertEqual(stat.rows, 4)
+        self.assertAlmostEqual(stat.total_time, 0.04)
+        self.assertAlmostEqual(stat.mean_time, 0.02)
+        self.assertEqual(sum(stat.histogram), 2)
+        self.assertGreaterEqual(stat.p95_time, 0.03)
+
+    def test_execute_wrapper_uses_current_view(self):
+        """
+        Test that wrapped queries are attributed to the current view.
+        """
+        token = current_view.set("account:me")
+        try:
+            with connection.execute_wrapper(self.collector):
+                get_user_model().objects.filter(pk=1).exists()
+        finally:
+            current_view.reset(token)
+
+        self.assertEqual({key[1] for key in self.collector.entries}, {"account:me"})
+
+    def test_entry_cap_drops_new_fingerprints(self):
+        """
+        Test that the in-memory structure stays bounded.
+        """
+        for index in range(15):
+            self.collector.record(f"SELECT * FROM t{index}", 0.001, view="a")
+
+        self.assertEqual(len(self.collector.entries), 10)
+        self.assertEqual(self.collector.dropped, 5)
+
+    def test_percentile(self):
+        buckets = [0] * len(BUCKET_BOUNDS)
+        buckets[0] = 95
+        buckets[10] = 5
+        self.assertEqual(percentile(buckets, 0.95), BUCKET_BOUNDS[0])
+        self.assertEqual(percentile(buckets, 0.99), BUCKET_BOUNDS[10])
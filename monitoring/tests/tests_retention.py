@@ -0,0 +1,180 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from info.models import ContactUs
+
+from ..models import (
+    CodeLog,
+    IssueGroup,
+    Notification,
+    QueryStatistic,
+    RequestProfile,
+    TraceSpan,
+)
+from ..retention import apply_policy, default_policies
+
+
+def make_log(level, days_ago):
+    log = CodeLog.log_message(level, "festival.views", "list", f"{level} entry")
+    CodeLog.objects.filter(pk=log.pk).update(
+        timestamp=timezone.now() - timedelta(days=days_ago)
+    )
+    return log
+
+
+@override_settings(
+    CODELOG_RETENTION_DAYS={"DEBUG": 7},
+    CONTACT_US_RETENTION_DAYS=365,
+    RETENTION_BATCH_SLEEP=0,
+)
+class RetentionTest(TestCase):
+    def setUp(self):
+        self.policies = {policy.name: policy for policy in default_policies()}
+        for policy in self.policies.values():
+            cache.delete(f"monitoring:retention:{policy.name}")
+
+    def test_codelog_policy_deletes_in_batches(self):
+        """
+        Test that only expired rows of the policy level are deleted, in batches.
+        """
+        for _ in range(5):
+            make_log("DEBUG", 10)
+        recent = make_log("DEBUG", 1)
+        error = make_log("ERROR", 10)
+
+        report = apply_policy(self.policies["codelog-debug"], batch_size=2)
+
+        self.assertEqual(report.rows, 5)
+        self.assertEqual(report.batches, 3)
+        self.assertCountEqual(CodeLog.objects.all(), [recent, error])
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        """
+        Test that a run stopped early continues where it left off.
+        """
+        for _ in range(4):
+            make_log("DEBUG", 10)
+        policy = self.policies["codelog-debug"]
+
+        first = apply_policy(policy, batch_size=2, max_batches=1)
+        second = apply_policy(policy, batch_size=2)
+
+        self.assertEqual(first.rows, 2)
+        self.assertIsNotNone(second.resumed_from)
+        self.assertEqual(second.rows, 2)
+        self.assertFalse(CodeLog.objects.exists())
+        self.assertIsNone(cache.get(f"monitoring:retention:{policy.name}"))
+
+    def test_related_rows_are_reported(self):
+        log = make_log("DEBUG", 10)
+        RequestProfile.objects.create(
+            log=log, duration=3, interval=0.01, sample_count=1, collapsed_stacks="a 1"
+        )
+
+        report = apply_policy(self.policies["codelog-debug"])
+
+        self.assertEqual(report.details["monitoring.RequestProfile"], 1)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_expired_notifications_and_old_messages_are_purged(self):
+        user = get_user_model().objects.create_user(phone="09121111111")
+        now = timezone.now()
+        Notification.objects.create(
+            user=user,
+            title="old",
+            message="m",
+            channel="dashboard",
+            expiration_date=now - timedelta(days=1),
+        )
+        kept = Notification.objects.create(
+            user=user, title="new", message="m", channel="dashboard"
+        )
+        message = ContactUs.objects.create(
+            full_name="Ali", phone="09121111111", email="a@b.com", message="hi"
+        )
+        ContactUs.objects.filter(pk=message.pk).update(
+            created_at=now - timedelta(days=400)
+        )
+
+        apply_policy(self.policies["notification-expired"])
+        apply_policy(self.policies["contactus"])
+
+        self.assertEqual(list(Notification.objects.all()), [kept])
+        self.assertFalse(ContactUs.objects.exists())
+
+    @override_settings(
+        TRACE_SPAN_RETENTION_DAYS=7,
+        QUERY_STATISTIC_RETENTION_DAYS=30,
+        REQUEST_PROFILE_RETENTION_DAYS=30,
+        RESOLVED_ISSUE_RETENTION_DAYS=90,
+    )
+    def test_observability_rows_are_purged(self):
+        """
+        Test that old spans, statistics, profiles and resolved issues expire.
+        """
+        now = timezone.now()
+        for days in (10, 1):
+            TraceSpan.objects.create(
+                trace_id=f"t{days}",
+                span_id="s",
+                name="GET /",
+                start_time=now,
+                duration=0.1,
+                created_at=now - timedelta(days=days),
+            )
+            QueryStatistic.objects.create(
+                fingerprint=f"f{days}",
+                view="v",
+                sql="SELECT 1",
+                last_seen=now - timedelta(days=days * 4),
+            )
+            RequestProfile.objects.create(
+                log=make_log("ERROR", 0),
+                duration=3,
+                interval=0.01,
+                sample_count=1,
+                collapsed_stacks="a 1",
+                created_at=now - timedelta(days=days * 4),
+            )
+        for fingerprint, resolved, days in (
+            ("old-resolved", True, 100),
+            ("new-resolved", True, 10),
+            ("old-open", False, 100),
+        ):
+            IssueGroup.objects.create(
+                fingerprint=fingerprint,
+                exception_type="KeyError",
+                is_resolved=resolved,
+                last_seen=now - timedelta(days=days),
+            )
+
+        self.policies = {policy.name: policy for policy in default_policies()}
+        for name in (
+            "trace-span",
+            "query-statistic",
+            "request-profile",
+            "issuegroup-resolved",
+        ):
+            self.assertEqual(apply_policy(self.policies[name]).rows, 1)
+
+        self.assertEqual(TraceSpan.objects.get().trace_id, "t1")
+        self.assertEqual(QueryStatistic.objects.get().fingerprint, "f1")
+        self.assertEqual(RequestProfile.objects.count(), 1)
+        self.assertCountEqual(
+            IssueGroup.objects.values_list("fingerprint", flat=True),
+            ["new-resolved", "old-open"],
+        )
+
+    def test_log_manager_cleanup_keeps_unresolved_critical_logs(self):
+        make_log("INFO", 40)
+        critical = make_log("CRITICAL", 40)
+
+        call_command("log_manager", "--cleanup", stdout=StringIO())
+
+        self.assertEqual(list(CodeLog.objects.all()), [critical])
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import RequestProfile
+from ..sampler import MAX_STACK_DEPTH, StackSampler, format_collapsed, get_sampler
+
+
+def busy_wait(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class StackSamplerTest(TestCase):
+    def test_samples_registered_thread(self):
+        """
+        Test that the sampler collects collapsed stacks of a busy thread.
+        """
+        sampler = StackSampler(interval=0.001)
+        stop_event = threading.Event()
+        worker = threading.Thread(target=busy_wait, args=(stop_event,))
+        worker.start()
+
+        sampler.start(worker.ident)
+        time.sleep(0.1)
+        samples = sampler.stop(worker.ident)
+        stop_event.set()
+        worker.join()
+
+        self.assertGreater(sum(samples.values()), 0)
+        self.assertTrue(any("busy_wait" in stack for stack in samples))
+
+    def test_unregistered_threads_are_discarded(self):
+        """
+        Test that stopping returns the samples and forgets the thread.
+        """
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        sampler.stop()
+        sampler.sample_once()
+
+        self.assertEqual(sampler._targets, {})
+
+    def test_idle_sampler_does_not_walk_frames(self):
+        """
+        Test that sampling without a registered thread skips the frame walk.
+        """
+        sampler = StackSampler(interval=0.01)
+
+        with mock.patch("monitoring.sampler.sys._current_frames") as frames:
+            sampler.sample_once()
+
+        frames.assert_not_called()
+        self.assertFalse(sampler._wakeup.is_set())
+
+    def test_frame_labels_are_cached_per_code_object(self):
+        """
+        Test that repeated samples of one stack reuse the cached frame labels.
+        """
+        sampler = StackSampler(interval=0.01)
+        sampler._targets[threading.get_ident()] = Counter()
+        sampler.sample_once()
+        labels = dict(sampler._labels)
+
+        with mock.patch("monitoring.sampler.os.path.basename") as basename:
+            sampler.sample_once()
+
+        basename.assert_not_called()
+        self.assertEqual(sampler._labels, labels)
+
+    def test_stack_walk_is_capped(self):
+        """
+        Test that a sample walks at most MAX_STACK_DEPTH frames of a deep stack.
+        """
+        sampler = StackSampler(interval=0.01)
+        samples = sampler._targets[threading.get_ident()] = Counter()
+
+        def recurse(depth):
+            if depth:
+                return recurse(depth - 1)
+            sampler.sample_once()
+
+        recurse(MAX_STACK_DEPTH * 2)
+        (stack,) = samples
+
+        self.assertEqual(len(stack.split(";")), MAX_STACK_DEPTH)
+
+    def test_format_collapsed(self):
+        samples = Counter({"a.py:main;b.py:work": 3, "a.py:main": 1})
+        self.assertEqual(
+            format_collapsed(samples), "a.py:main;b.py:work 3\na.py:main 1"
+        )
+
+
+class StackSamplerMiddlewareTest(TestCase):
+    @override_settings(STACK_SAMPLER_ENABLED=True, SLOW_REQUEST_THRESHOLD=0)
+    def test_slow_request_profile_is_linked_to_performance_log(self):
+        """
+        Test that a slow request stores its profile with a performance log.
+        """
+        samples = Counter({"views.py:get;serializers.py:to_representation": 4})
+        # The patched stop() leaves this thread registered; really stop it
+        self.addCleanup(get_sampler(settings.STACK_SAMPLER_INTERVAL).stop)
+        with mock.patch.object(StackSampler, "stop", return_value=samples):
+            self.client.get(reverse("festival:format-list"))
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual(profile.view, "festival:format-list")
+        self.assertEqual(profile.sample_count, 4)
+        self.assertEqual(profile.log.level, "PERFORMANCE")
+        self.assertEqual(
+            profile.top_frames(), [("serializers.py:to_representation", 4)]
+        )
+
+    @override_settings(STACK_SAMPLER_ENABLED=True, SLOW_REQUEST_THRESHOLD=60)
+    def test_fast_request_discards_samples(self):
+        """
+        Test that requests under the threshold keep nothing.
+        """
+        self.client.get(reverse("festival:format-list"))
+        self.assertFalse(RequestProfile.objects.exists())
@@ -0,0 +1,251 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from kavenegar import APIException, HTTPException
+
+from account.services import generate_otp
+from notifications import FakeSMSAPI, SessionKavenegarAPI, get_sms_api
+
+from ..models import SmsDelivery
+from ..sms import CircuitBreaker, CircuitOpen, expire_stale_deliveries, queue_sms
+from ..tasks import send_sms_task
+
+
+def clear_breaker(name):
+    breaker = CircuitBreaker(name)
+    cache.delete_many(
+        [breaker._key(suffix) for suffix in ("failures", "open_until", "probe")]
+    )
+
+
+@mock.patch("monitoring.tasks.retry_delay", return_value=0)
+class SmsPipelineTest(TestCase):
+    def setUp(self):
+        clear_breaker("fake")
+        self.addCleanup(clear_breaker, "fake")
+        # Eager tasks only run their retries inline when errors do not propagate
+        conf = send_sms_task.app.conf
+        conf["CELERY_TASK_EAGER_PROPAGATES"] = False
+        self.addCleanup(conf.__setitem__, "CELERY_TASK_EAGER_PROPAGATES", True)
+
+    def queue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            delivery = queue_sms("09123456789", "otp", {"token": 123456}, "otp")
+        delivery.refresh_from_db()
+        return delivery
+
+    def test_sms_is_sent_after_commit(self, _):
+        """
+        Test that a queued SMS is only sent once the transaction commits.
+        """
+        with self.captureOnCommitCallbacks() as callbacks:
+            delivery = queue_sms("09123456789", "otp", {"token": 123456}, "otp")
+        self.assertEqual(delivery.status, SmsDelivery.QUEUED)
+        self.assertEqual(delivery.tokens, {"token": "123456"})
+
+        for callback in callbacks:
+            callback()
+        delivery.refresh_from_db()
+
+        self.assertEqual(delivery.status, SmsDelivery.SENT)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertTrue(delivery.provider_message_id)
+        self.assertIsNotNone(delivery.latency)
+        self.assertEqual(delivery.tokens, {})
+
+    @override_settings(DEBUG=False)
+    def test_generate_otp_does_not_wait_on_the_provider(self, _):
+        """
+        Test that generating an OTP only queues the SMS.
+        """
+        with mock.patch.object(get_sms_api(), "verify_lookup") as verify_lookup:
+            otp = generate_otp("09123456789")
+
+        verify_lookup.assert_not_called()
+        delivery = SmsDelivery.objects.get(purpose="otp")
+        self.assertEqual(delivery.status, SmsDelivery.QUEUED)
+        self.assertEqual(delivery.tokens, {"token": str(otp)})
+
+    def test_transient_failure_is_retried(self, _):
+        """
+        Test that a network failure is retried until the send succeeds.
+        """
+        side_effect = [HTTPException("timeout"), [{"messageid": 42}]]
+        with mock.patch.object(get_sms_api(), "verify_lookup", side_effect=side_effect):
+            delivery = self.queue()
+
+        self.assertEqual(delivery.status, SmsDelivery.SENT)
+        self.assertEqual(delivery.attempts, 2)
+        self.assertEqual(delivery.provider_message_id, "42")
+
+    def test_exhausted_retries_mark_the_delivery_failed(self, _):
+        """
+        Test that a delivery fails once its retries are used up.
+        """
+        with mock.patch.object(send_sms_task, "max_retries", 1), mock.patch.object(
+            get_sms_api(), "verify_lookup", side_effect=HTTPException("down")
+        ):
+            delivery = self.queue()
+
+        self.assertEqual(delivery.status, SmsDelivery.FAILED)
+        self.assertEqual(delivery.attempts, 2)
+        self.assertIn("down", delivery.error)
+        self.assertEqual(delivery.tokens, {})
+
+    def test_provider_rejection_is_final(self, _):
+        """
+        Test that an error reported by the provider is not retried.
+        """
+        with mock.patch.object(
+            get_sms_api(), "verify_lookup", side_effect=APIException("411")
+        ) as verify_lookup:
+            delivery = self.queue()
+
+        self.assertEqual(verify_lookup.call_count, 1)
+        self.assertEqual(delivery.status, SmsDelivery.FAILED)
+
+    @override_settings(SMS_BREAKER_THRESHOLD=2)
+    def test_open_circuit_stops_provider_calls(self, _):
+        """
+        Test that after repeated failures the provider is no longer called.
+        """
+        with mock.patch.object(send_sms_task, "max_retries", 3), mock.patch.object(
+            get_sms_api(), "verify_lookup", side_effect=HTTPException("down")
+        ) as verify_lookup:
+            delivery = self.queue()
+
+        self.assertEqual(verify_lookup.call_count, 2)
+        self.assertEqual(delivery.status, SmsDelivery.FAILED)
+        self.assertIn("circuit open", delivery.error)
+
+
+class SmsTokenTest(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.delivery = queue_sms("09123456789", "otp", {"token": 480913}, "otp")
+
+    def test_stale_queued_tokens_are_erased(self):
+        """
+        Test that deliveries stuck in the queue are failed and lose their tokens.
+        """
+        SmsDelivery.objects.filter(pk=self.delivery.pk).update(
+            created_at=timezone.now() - timedelta(hours=2)
+        )
+        fresh = queue_sms("09123456780", "otp", {"token": 654321}, "otp")
+
+        self.assertEqual(expire_stale_deliveries(max_age=3600), 1)
+
+        self.delivery.refresh_from_db()
+        self.assertEqual(self.delivery.status, SmsDelivery.FAILED)
+        self.assertEqual(self.delivery.tokens, {})
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.tokens, {"token": "654321"})
+
+    def test_admin_masks_pending_tokens(self):
+        """
+        Test that the admin shows token keys but never their values.
+        """
+        admin_user = get_user_model().objects.create_superuser(
+            phone="09120000000", password="secret"
+        )
+        self.client.force_login(admin_user)
+
+        response = self.client.get(
+            reverse("admin:monitoring_smsdelivery_change", args=[self.delivery.pk])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "******")
+        self.assertNotContains(response, "480913")
+
+
+class CircuitBreakerTest(TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker("tests", threshold=2, reset_timeout=30)
+        clear_breaker("tests")
+        self.addCleanup(clear_breaker, "tests")
+
+    def test_breaker_half_opens_after_timeout(self):
+        """
+        Test that one probe is let through once the reset timeout elapsed.
+        """
+        with mock.patch("monitoring.sms.time.time", return_value=1000.0):
+            self.breaker.record_failure()
+            self.breaker.before_call()
+            self.breaker.record_failure()
+            with self.assertRaises(CircuitOpen):
+                self.breaker.before_call()
+
+        with mock.patch("monitoring.sms.time.time", return_value=1031.0):
+            self.breaker.before_call()
+            with self.assertRaises(CircuitOpen):
+                self.breaker.before_call()
+            self.breaker.record_success()
+            self.breaker.before_call()
+
+
+class ProviderTest(TestCase):
+    def test_kavenegar_client_reuses_its_session(self):
+        """
+        Test that the Kavenegar client keeps one HTTP session and timeout.
+        """
+        api = SessionKavenegarAPI("key", timeout=3)
+        ok = mock.Mock(
+            content=json.dumps(
+                {
+                    "return": {"status": 200, "message": "تایید شد"},
+                    "entries": [{"messageid": 1}],
+                }
+            ).encode()
+        )
+        rejected = mock.Mock(
+            content=json.dumps(
+                {
+                    "return": {"status": 411, "message": "گیرنده نامعتبر"},
+                    "entries": None,
+                }
+            ).encode()
+        )
+
+        with mock.patch.object(api.session, "post", side_effect=[ok, rejected]) as post:
+            self.assertEqual(
+                api.verify_lookup({"receptor": "0912"}), [{"messageid": 1}]
+            )
+            with self.assertRaises(APIException) as error:
+                api.verify_lookup({"receptor": "0912"})
+
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(post.call_args.kwargs["timeout"], 3)
+        self.assertEqual(error.exception.status, 411)
+
+    def test_fake_provider_failure_rate(self):
+        """
+        Test that the fake provider fails at the configured rate.
+        """
+        with self.assertRaises(HTTPException):
+            FakeSMSAPI(failure_rate=1.0).verify_lookup({"receptor": "0912"})
+        self.assertEqual(
+            FakeSMSAPI().verify_lookup({"receptor": "0912"})[0]["receptor"], "0912"
+        )
+
+
+class SmsLoadTestCommandTest(TransactionTestCase):
+    def test_load_test_reports_throughput(self):
+        """
+        Test that the load test command sends through the whole pipeline.
+        """
+        clear_breaker("fake")
+        out = StringIO()
+
+        call_command("sms_load_test", count=5, stdout=out)
+
+        self.assertEqual(SmsDelivery.objects.filter(status="sent").count(), 5)
+        self.assertIn("ارسال شده: 5", out.getvalue())
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import CodeLog
+from ..sql import RequestSQLProfiler, fingerprint, normalize_sql
+
+
+class NormalizeSQLTest(TestCase):
+    def test_literals_and_placeholders_are_stripped(self):
+        """
+        Test that queries differing only in values share a fingerprint.
+        """
+        first = normalize_sql("SELECT * FROM t WHERE id = 1 AND name = 'ali'")
+        second = normalize_sql("SELECT  *  FROM t WHERE id = 42 AND name = 'reza'")
+
+        self.assertEqual(first, "SELECT * FROM t WHERE id = ? AND name = ?")
+        self.assertEqual(fingerprint(first), fingerprint(second))
+
+    def test_in_lists_collapse(self):
+        """
+        Test that IN lists of any length normalize identically.
+        """
+        self.assertEqual(
+            normalize_sql('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s)'),
+            normalize_sql('SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s)'),
+        )
+
+
+class RequestSQLProfilerTest(TestCase):
+    def test_repeated_query_is_flagged(self):
+        """
+        Test that a statement repeated more than the threshold is an offender.
+        """
+        profiler = RequestSQLProfiler(threshold=3)
+        with connection.execute_wrapper(profiler):
+            for pk in range(5):
+                get_user_model().objects.filter(pk=pk).first()
+
+        offenders = profiler.n_plus_one_offenders()
+        self.assertEqual(profiler.count, 5)
+        self.assertEqual(len(offenders), 1)
+        self.assertEqual(offenders[0]["count"], 5)
+        self.assertTrue(offenders[0]["stack"])
+
+    def test_zero_threshold_captures_every_stack(self):
+        """
+        Test that a threshold of 0 flags every statement, each with its stack.
+        """
+        profiler = RequestSQLProfiler(threshold=0)
+        with connection.execute_wrapper(profiler):
+            get_user_model().objects.filter(pk=1).first()
+
+        offenders = profiler.n_plus_one_offenders()
+        self.assertEqual(len(offenders), 1)
+        self.assertTrue(offenders[0]["stack"])
+
+    @override_settings(SQL_PROFILER_N_PLUS_ONE_THRESHOLD=0)
+    def test_middleware_records_offenders_with_view_name(self):
+        """
+        Test that the middleware stores offenders under the resolved view.
+        """
+        self.client.get(reverse("festival:format-list"))
+
+        log = CodeLog.objects.get(tags__contains="n_plus_one")
+        self.assertEqual(log.method, "festival:format-list")
+        self.assertEqual(log.context["view"], "festival:format-list")
+        self.assertGreaterEqual(log.context["query_count"], 1)
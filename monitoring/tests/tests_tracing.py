@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib import admin
+from django.test import TestCase
+from django.urls import reverse
+from kavenegar import APIException
+
+from notifications import KavenegarSMS
+
+from ..context import current_request_id
+from ..models import CodeLog, TraceSpan
+from ..signals import add_trace_headers, reset_task_context, set_task_context
+from ..tracing import finish_trace, span, start_trace
+
+
+class RequestIDTest(TestCase):
+    def test_request_id_is_generated_and_returned(self):
+        response = self.client.get(reverse("festival:format-list"))
+        self.assertEqual(len(response["X-Request-ID"]), 32)
+
+    def test_valid_incoming_request_id_is_kept(self):
+        """
+        Test that a safe client supplied id is reused and a malformed one is not.
+        """
+        response = self.client.get(
+            reverse("festival:format-list"), HTTP_X_REQUEST_ID="edge-1234abcd"
+        )
+        self.assertEqual(response["X-Request-ID"], "edge-1234abcd")
+
+        response = self.client.get(
+            reverse("festival:format-list"), HTTP_X_REQUEST_ID="<script>"
+        )
+        self.assertNotEqual(response["X-Request-ID"], "<script>")
+
+    def test_codelog_records_request_id(self):
+        token = current_request_id.set("req-12345678")
+        try:
+            log = CodeLog.log_info("festival.views", "create", "Registration saved")
+        finally:
+            current_request_id.reset(token)
+
+        self.assertEqual(log.request_id, "req-12345678")
+
+
+class TracingTest(TestCase):
+    def test_request_is_stored_as_a_trace(self):
+        """
+        Test that a request yields an http root span with db child spans.
+        """
+        response = self.client.get(reverse("festival:format-list"))
+
+        spans = TraceSpan.objects.filter(trace_id=response["X-Request-ID"])
+        root = spans.get(kind="http")
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(root.attributes["view"], "festival:format-list")
+        self.assertTrue(spans.filter(kind="db", parent_id=root.span_id).exists())
+
+    def test_span_outside_a_trace_is_a_noop(self):
+        with span("standalone") as current:
+            self.assertIsNone(current)
+        self.assertFalse(TraceSpan.objects.exists())
+
+    def test_sms_failure_is_recorded_as_error_span(self):
+        """
+        Test that a failed Kavenegar call shows up as an sms error span.
+        """
+        sms = KavenegarSMS()
+        sms.register(receptor="09123456789", code="1234")
+
+        trace, token = start_trace("trace-12345678", sampled=True)
+        with mock.patch.object(
+            sms.api, "verify_lookup", side_effect=APIException("quota")
+        ):
+            sms.send()
+        finish_trace(trace, token, 0)
+
+        sms_span = TraceSpan.objects.get(kind="sms")
+        self.assertTrue(sms_span.is_error)
+        self.assertEqual(sms_span.attributes["template"], "otp")
+
+    def test_waterfall_lists_every_span(self):
+        trace, token = start_trace("trace-waterfall", sampled=True)
+        with span("outer"):
+            with span("inner"):
+                pass
+        finish_trace(trace, token, 0)
+
+        outer = TraceSpan.objects.get(name="outer")
+        html = admin.site._registry[TraceSpan].waterfall_display(outer)
+        self.assertIn("outer", html)
+        self.assertIn("inner", html)
+
+
+class CeleryPropagationTest(TestCase):
+    def test_publish_adds_request_id_header(self):
+        headers = {}
+        token = current_request_id.set("req-12345678")
+        try:
+            add_trace_headers(headers=headers)
+        finally:
+            current_request_id.reset(token)
+
+        self.assertEqual(headers["request_id"], "req-12345678")
+
+    def test_worker_continues_the_request_trace(self):
+        """
+        Test that a task span is stored under the request id from its headers.
+        """
+        task = SimpleNamespace(
+            name="monitoring.export_logs",
+            request=SimpleNamespace(
+                request_id="req-12345678", parent_span_id="0123456789abcdef"
+            ),
+        )
+
+        set_task_context(task_id="task-1", task=task)
+        self.assertEqual(current_request_id.get(), "req-12345678")
+        reset_task_context(task_id="task-1", state="SUCCESS")
+
+        task_span = TraceSpan.objects.get(trace_id="req-12345678")
+        self.assertEqual(task_span.kind, "celery")
+        self.assertEqual(task_span.parent_id, "0123456789abcdef")
+        self.assertIsNone(current_request_id.get())
@@ -0,0 +1,156 @@
+"""
+Minimal in-process tracing
+
+A trace collects the spans of one request or Celery task in memory and is
+stored as TraceSpan rows in a single bulk insert when it finishes, only when
+it was sampled (TRACE_SAMPLE_RATE), slow (SLOW_REQUEST_THRESHOLD) or failed.
+The trace id is the request id, so spans, CodeLog rows and Celery work of a
+request share one identifier.
+
+Usage:
+    from monitoring.tracing import span
+
+    with span("festival.create_registration", kind="internal", user=user.pk):
+        ...
+"""
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+from monitoring.context import current_span_id, current_trace
+
+REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9\-]{8,64}$")
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+
+def clean_request_id(value):
+    """Accept a client supplied request id only if it is short and safe"""
+    if value and REQUEST_ID_RE.match(value):
+        return value
+    return None
+
+
+class Trace:
+    """Spans of one unit of work, kept in memory until finished"""
+
+    def __init__(self, trace_id, sampled=None):
+        self.trace_id = trace_id
+        if sampled is None:
+            sampled = random.random() < settings.TRACE_SAMPLE_RATE
+        self.sampled = sampled
+        self.failed = False
+        self.spans = []
+        # Wall clock anchor so spans can be timed with perf_counter
+        self._wall = time.time()
+        self._perf = time.perf_counter()
+
+    def wall_time(self, perf):
+        return datetime.fromtimestamp(
+            self._wall + perf - self._perf, tz=dt_timezone.utc
+        )
+
+    def should_keep(self, duration):
+        return (
+            self.sampled or self.failed or duration >= settings.SLOW_REQUEST_THRESHOLD
+        )
+
+    def save(self):
+        from monitoring.models import TraceSpan
+
+        TraceSpan.objects.bulk_create(
+            TraceSpan(trace_id=self.trace_id, **record) for record in self.spans
+        )
+
+
+class Span:
+    """An open span; finish it exactly once"""
+
+    def __init__(self, trace, name, kind, attributes):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = current_span_id.get()
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.duration = None
+        # Set by callers that handle a failure without raising
+        self.error = False
+        self._token = current_span_id.set(self.span_id)
+        self._start = time.perf_counter()
+
+    def finish(self, error=False):
+        self.duration = time.perf_counter() - self._start
+        current_span_id.reset(self._token)
+        error = error or self.error
+        if error:
+            self.trace.failed = True
+        if len(self.trace.spans) < settings.TRACE_MAX_SPANS:
+            self.trace.spans.append(
+                {
+                    "span_id": self.span_id,
+                    "parent_id": self.parent_id,
+                    "name": self.name[:200],
+                    "kind": self.kind,
+                    "start_time": self.trace.wall_time(self._start),
+                    "duration": self.duration,
+                    "is_error": error,
+                    "attributes": self.attributes,
+                }
+            )
+        return self.duration
+
+
+def start_trace(trace_id, sampled=None):
+    """Make a new trace current; returns (trace, token) for finish_trace"""
+    trace = Trace(trace_id, sampled)
+    return trace, current_trace.set(trace)
+
+
+def finish_trace(trace, token, duration):
+    """Restore the previous trace and persist this one if it is worth keeping"""
+    current_trace.reset(token)
+    if trace.spans and trace.should_keep(duration):
+        trace.save()
+
+
+def open_span(name, kind="internal", **attributes):
+    """Open a span in the current trace, or return None outside any trace"""
+    trace = current_trace.get()
+    if trace is None:
+        return None
+    return Span(trace, name, kind, attributes)
+
+
+@contextmanager
+def span(name, kind="internal", **attributes):
+    """Time the enclosed block as a child of the innermost open span"""
+    current = open_span(name, kind, **attributes)
+    if current is None:
+        yield None
+        return
+    try:
+        yield current
+    except BaseException:
+        current.finish(error=True)
+        raise
+    current.finish()
+
+
+class QuerySpanWrapper:
+    """``connection.execute_wrapper`` hook recording each query as a span"""
+
+    def __call__(self, execute, sql, params, many, context):
+        from monitoring.query_stats import _normalize
+
+        # Literals are stripped so no parameter values end up in the span
+        _, normalized = _normalize(sql)
+        with span("db.query", kind="db", sql=normalized[:500], many=many):
+            return execute(sql, params, many, context)
@@ -0,0 +1,12 @@
+"""
+Monitoring URLs
+"""
+from django.urls import path
+
+from monitoring.views import metrics_view
+
+app_name = "monitoring"
+
+urlpatterns = [
+    path("", metrics_view, name="metrics"),
+]
@@ -4,6 +4,7 @@ Easy-to-use logging utilities for the entire project
 import functools
 import time
 from django.http import HttpRequest
+from monitoring.metrics import FUNCTION_CALLS, FUNCTION_LATENCY
 from monitoring.models import CodeLog
 
 
@@ -221,9 +222,88 @@ def log_exceptions(func=None, *, logger=None, level="ERROR", reraise=True):
         return decorator(func)
 
 
-def log_performance(threshold=1.0):
+# Metric children per instrumented name, so a timed call skips label lookups
+_metrics_cache = {}
+
+
+def _function_metrics(name):
+    """Labelled histogram and counter children of ``name``, resolved once"""
+    children = _metrics_cache.get(name)
+    if children is None:
+        children = (
+            FUNCTION_LATENCY.labels(function=name),
+            FUNCTION_CALLS.labels(function=name, outcome="success"),
+            FUNCTION_CALLS.labels(function=name, outcome="error"),
+        )
+        _metrics_cache[name] = children
+    return children
+
+
+def _observe(children, duration, failed):
+    latency, succeeded_calls, failed_calls = children
+    latency.observe(duration)
+    (failed_calls if failed else succeeded_calls).inc()
+
+
+def _log_if_slow(duration, threshold, module, method, request=None):
+    if threshold is None or duration <= threshold:
+        return
+    Logger.performance(
+        f"تابع کند: {method} - {duration:.2f} ثانیه",
+        duration=duration,
+        module=module,
+        method=method,
+        request=request,
+        context={"threshold": threshold, "actual_time": duration},
+    )
+
+
+class track_performance:
     """
-    Decorator to log slow-performing functions
+    Context manager timing a block into the function latency histogram
+
+    Every run is observed in ``function_duration_seconds`` and counted in
+    ``function_calls_total`` by outcome, so p50/p95/p99 and the error rate
+    come from /metrics. Runs slower than ``threshold`` are also logged.
+
+    Usage:
+        with track_performance("festival.export_works", threshold=2.0):
+            export_works()
+    """
+
+    def __init__(self, name, threshold=None, module=None, method=None, request=None):
+        self.name = name
+        self.threshold = threshold
+        self.module = module or name.rpartition(".")[0]
+        self.method = method or name.rpartition(".")[2]
+        self.request = request
+        self.duration = None
+        self._metrics = _function_metrics(name)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._start
+        _observe(self._metrics, self.duration, failed=exc_type is not None)
+        if exc_type is None:
+            _log_if_slow(
+                self.duration,
+                self.threshold,
+                self.module,
+                self.method,
+                self.request,
+            )
+        return False
+
+
+def log_performance(threshold=1.0, name=None):
+    """
+    Decorator to time functions and log slow-performing ones
+
+    Every call is recorded in the function latency histogram (see
+    track_performance); calls slower than ``threshold`` are also logged.
 
     Usage:
         @log_performance(threshold=2.0)  # Log if takes > 2 seconds
@@ -232,42 +312,39 @@ def log_performance(threshold=1.0):
     """
 
     def decorator(func):
+        metrics = _function_metrics(name or f"{func.__module__}.{func.__qualname__}")
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_time = time.perf_counter()
             try:
                 result = func(*args, **kwargs)
-                duration = time.time() - start_time
-
-                if duration > threshold:
-                    # Extract request from args if available
-                    request = None
-                    for arg in args:
-                        if isinstance(arg, HttpRequest):
-                            request = arg
-                            break
-
-                    Logger.performance(
-                        f"تابع کند: {func.__name__} - {duration:.2f} ثانیه",
-                        duration=duration,
-                        module=func.__module__,
-                        method=func.__name__,
-                        request=request,
-                        context={"threshold": threshold, "actual_time": duration},
-                    )
-
-                return result
             except Exception as e:
-                duration = time.time() - start_time
+                duration = time.perf_counter() - start_time
+                _observe(metrics, duration, failed=True)
                 Logger.exception(
                     f"استثنا در تابع {func.__name__} پس از {duration:.2f} ثانیه",
                     exception=e,
                     module=func.__module__,
                     method=func.__name__,
-                    duration=duration,
+                    context={"duration": duration},
                 )
                 raise
 
+            duration = time.perf_counter() - start_time
+            _observe(metrics, duration, failed=False)
+            if duration > threshold:
+                # Extract request from args if available
+                request = None
+                for arg in args:
+                    if isinstance(arg, HttpRequest):
+                        request = arg
+                        break
+                _log_if_slow(
+                    duration, threshold, func.__module__, func.__name__, request
+                )
+            return result
+
         return wrapper
 
     return decorator
@@ -0,0 +1,142 @@
+"""
+Monitoring Views
+"""
+import ipaddress
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.pagination import StandardPagination
+from monitoring.fanout import mark_all_read, unread_count
+from monitoring.metrics import render_metrics
+from monitoring.models import Notification
+from monitoring.serializers import NotificationFanOutSerializer, NotificationSerializer
+from monitoring.tasks import fan_out_notifications_task
+
+
+def is_internal_address(address):
+    """Whether ``address`` belongs to one of METRICS_ALLOWED_NETWORKS"""
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.METRICS_ALLOWED_NETWORKS
+    )
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Expose Prometheus metrics to holders of METRICS_AUTH_TOKEN or, when no
+    token is configured, only to internal networks outside DEBUG
+    """
+    token = settings.METRICS_AUTH_TOKEN
+    if token:
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        if not constant_time_compare(header, f"Bearer {token}"):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG and not is_internal_address(
+        request.META.get("REMOTE_ADDR", "")
+    ):
+        return HttpResponseForbidden()
+
+    payload, content_type = render_metrics()
+    return HttpResponse(payload, content_type=content_type)
+
+
+class NotificationListView(generics.ListAPIView):
+    """Unexpired notifications of the authenticated user"""
+
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardPagination
+
+    @extend_schema(
+        summary="اعلان‌های من",
+        description="لیست اعلان‌های منقضی نشده کاربر جاری",
+        tags=["Notifications"],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return Notification.objects.filter(user=self.request.user).filter(
+            Q(expiration_date__isnull=True) | Q(expiration_date__gt=timezone.now())
+        )
+
+
+class NotificationUnreadCountView(APIView):
+    """Unread badge of the authenticated user, served from Redis"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="تعداد اعلان‌های خوانده نشده",
+        tags=["Notifications"],
+        responses={200: dict},
+    )
+    def get(self, request):
+        return Response({"unread": unread_count(request.user.pk)})
+
+
+class NotificationMarkReadView(APIView):
+    """Mark one notification of the authenticated user as read"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="خواندن اعلان", tags=["Notifications"], request=None, responses=None
+    )
+    def post(self, request, pk):
+        notification = generics.get_object_or_404(
+            Notification, pk=pk, user=request.user
+        )
+        notification.mark_as_read()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class NotificationMarkAllReadView(APIView):
+    """Mark every notification of the authenticated user as read"""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(
+        summary="خواندن همه اعلان‌ها",
+        tags=["Notifications"],
+        request=None,
+        responses={200: dict},
+    )
+    def post(self, request):
+        return Response({"updated": mark_all_read(request.user.pk)})
+
+
+class NotificationFanOutView(APIView):
+    """Queue a notification for the registrants of a format and/or province"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(
+        summary="ارسال اعلان گروهی",
+        description="اعلان برای همه ثبت‌نام‌کنندگان یک قالب جشنواره و/یا یک استان در صف ارسال قرار می‌گیرد.",
+        tags=["Notifications"],
+        request=NotificationFanOutSerializer,
+        responses={202: dict},
+    )
+    def post(self, request):
+        serializer = NotificationFanOutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        fan_out_notifications_task.delay(**serializer.task_options())
+        return Response(
+            {"message": "اعلان در صف ارسال قرار گرفت"},
+            status=status.HTTP_202_ACCEPTED,
+        )
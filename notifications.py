@@ -1,6 +1,14 @@
+import itertools
+import json
+import random
+import time
+
+import requests
+from django.conf import settings
 from kavenegar import APIException, HTTPException, KavenegarAPI
+from requests.adapters import HTTPAdapter
 
-from config import settings
+from monitoring.tracing import span
 
 # class Email:
 #     @staticmethod
@@ -52,9 +60,86 @@ from config import settings
 #         messaging.send(message)
 
 
+class SessionKavenegarAPI(KavenegarAPI):
+    """KavenegarAPI reusing one keep-alive HTTP session, with a timeout"""
+
+    def __init__(self, apikey, timeout=None, pool_size=10):
+        super().__init__(apikey)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=pool_size))
+
+    def _request(self, action, method, params={}):
+        url = f"https://{self.host}/{self.version}/{self.apikey}/{action}/{method}.json"
+        try:
+            content = self.session.post(
+                url, headers=self.headers, data=params, timeout=self.timeout
+            ).content
+            response = json.loads(content.decode("utf-8"))
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise HTTPException(e)
+
+        status = response["return"]["status"]
+        if status != 200:
+            error = APIException(
+                f"APIException[{status}] {response['return']['message']}".encode()
+            )
+            error.status = status
+            raise error
+        return response["entries"]
+
+
+class FakeSMSAPI:
+    """
+    Offline stand-in for the Kavenegar API (SMS_PROVIDER = "fake") for
+    development and load tests. Every call waits ``latency`` seconds and
+    fails with an HTTPException at ``failure_rate``.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._message_ids = itertools.count(1)
+
+    def verify_lookup(self, params):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise HTTPException("fake provider failure")
+        return [
+            {
+                "messageid": next(self._message_ids),
+                "receptor": params["receptor"],
+                "status": 5,
+                "statustext": "ارسال به مخابرات",
+                "cost": 0,
+            }
+        ]
+
+
+_apis = {}
+
+
+def get_sms_api():
+    """Provider client of SMS_PROVIDER, built once per process"""
+    provider = settings.SMS_PROVIDER
+    if provider not in _apis:
+        if provider == "fake":
+            _apis[provider] = FakeSMSAPI(
+                settings.SMS_FAKE_LATENCY, settings.SMS_FAKE_FAILURE_RATE
+            )
+        else:
+            _apis[provider] = SessionKavenegarAPI(
+                settings.KAVENEGAR_API_KEY,
+                timeout=settings.SMS_HTTP_TIMEOUT,
+                pool_size=settings.SMS_HTTP_POOL_SIZE,
+            )
+    return _apis[provider]
+
+
 class KavenegarSMS:
     def __init__(self):
-        self.api = KavenegarAPI(settings.KAVENEGAR_API_KEY)
+        self.api = get_sms_api()
 
     def register(self, receptor=None, code=None):
         self.params = {
@@ -163,17 +248,25 @@ class KavenegarSMS:
             "type": "sms",
         }
 
-    def send(self):
-        flag = True
-        for i, j in self.params.items():
-            if j is None:
-                flag = False
-        if flag:
+    def deliver(self):
+        """Send through the provider, raising APIException or HTTPException"""
+        if any(value is None for value in self.params.values()):
+            raise APIException
+        with span(
+            "kavenegar.verify_lookup", kind="sms", template=self.params["template"]
+        ) as sms_span:
             try:
                 return self.api.verify_lookup(self.params)
-            except APIException as e:
-                return e
-            except HTTPException as e:
-                return e
-        else:
+            except (APIException, HTTPException) as e:
+                if sms_span is not None:
+                    sms_span.error = True
+                    sms_span.attributes["error"] = type(e).__name__
+                raise
+
+    def send(self):
+        if any(value is None for value in self.params.values()):
             raise APIException
+        try:
+            return self.deliver()
+        except (APIException, HTTPException) as e:
+            return e
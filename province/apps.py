@@ -6,3 +6,6 @@ class ProvinceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "province"
     verbose_name = _("استان")
+
+    def ready(self):
+        import province.signals
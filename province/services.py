@@ -0,0 +1,24 @@
+"""
+Province Module Services
+"""
+from common.cache import cached
+from province.models import City, Province
+
+# Provinces and cities only change through the admin or fixtures
+TTL = 24 * 3600
+# Plain rows cache far smaller than model instances and serialize as msgpack
+FIELDS = ("id", "name")
+
+
+@cached(key="all", ttl=TTL, tags=["province"])
+def province_list():
+    """All provinces ordered by name"""
+    return list(Province.objects.order_by("name").values(*FIELDS))
+
+
+@cached(key="{province_id}", ttl=TTL, tags=["province"])
+def city_list(province_id):
+    """Cities of a province ordered by name"""
+    return list(
+        City.objects.filter(province_id=province_id).order_by("name").values(*FIELDS)
+    )
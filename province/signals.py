@@ -0,0 +1,14 @@
+"""
+Province Module Signals
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.cache import invalidate
+from province.models import City, Province
+
+
+@receiver([post_save, post_delete], sender=Province)
+@receiver([post_save, post_delete], sender=City)
+def invalidate_province_cache(**kwargs):
+    invalidate("province")